@@ -4,7 +4,7 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 10/7/2025
+Last Modified: 10/19/2026
 
 File Purpose: Application factory for the project.
 """
@@ -19,9 +19,11 @@ from dotenv import load_dotenv
 from flask import Flask, render_template, abort, redirect, url_for
 from flask_login import current_user
 from flask_wtf import CSRFProtect
+from sqlalchemy import event
 
 # Local application imports.
-from .extensions import db, login_manager, migrate
+from .cache import TemplateBytecodeCache
+from .extensions import db, login_manager, cache
 
 csrf = CSRFProtect()
 
@@ -54,6 +56,35 @@ def configure_logging():
         ]
 )
 
+def configure_sqlite(app, engine):
+    """ Apply foreign key enforcement and the tuning pragmas to new SQLite connections. """
+    pragmas = [
+        # SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked to.
+        ("foreign_keys", "ON"),
+        # Wait for a competing writer instead of failing with "database is locked".
+        ("busy_timeout", app.config["SQLITE_BUSY_TIMEOUT"]),
+        ("synchronous", app.config["SQLITE_SYNCHRONOUS"]),
+        ("cache_size", -app.config["SQLITE_CACHE_SIZE_KB"]),
+        ("mmap_size", app.config["SQLITE_MMAP_SIZE"]),
+    ]
+    if engine.url.database not in (None, "", ":memory:"):
+        # Readers and the writer no longer block each other in WAL mode.
+        pragmas.insert(1, ("journal_mode", app.config["SQLITE_JOURNAL_MODE"]))
+
+    def set_pragmas(dbapi_connection, connection_record): # pylint: disable=unused-argument
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    event.listen(engine, "connect", set_pragmas)
+
+def configure_templates(app):
+    """ Add the custom Jinja filters and load compiled templates from the shared bytecode cache. """
+    app.jinja_env.filters['datetime_format'] = datetime_format
+    if app.config["TEMPLATE_CACHE_DIR"]:
+        os.makedirs(app.config["TEMPLATE_CACHE_DIR"], exist_ok = True)
+        app.jinja_env.bytecode_cache = TemplateBytecodeCache(app.config["TEMPLATE_CACHE_DIR"])
+
 def register_error_handlers(app):
     """ Register Flask Error Handling. """
     @app.errorhandler(401)
@@ -96,6 +127,98 @@ def register_error_handlers(app):
             error_message = "Request method not allowed."
         ), 405
 
+    @app.errorhandler(413)
+    def content_too_large(e):
+        """ Handle HTTP 413. """
+        app.logger.error(e)
+        return render_template(
+            "error.html",
+            page_title = "413 Error",
+            error_message = "Request rejected because the upload is too large."
+        ), 413
+
+def env_flag(value):
+    """ Parse a "true"/"false" environment setting. """
+    return value.lower() == "true"
+
+# Performance tuning settings: config key -> (environment variable, default, parser).
+TUNING_CONFIG = {
+    # Seconds a user who wrote keeps reading from the primary to see their own changes.
+    "REPLICA_STICKY_SECONDS": ("REPLICA_STICKY_SECONDS", "5", int),
+    # Directory of precompiled template bytecode ("" disables the cache).
+    "TEMPLATE_CACHE_DIR": ("TEMPLATE_CACHE_DIR", "", str),
+    # SQLite connection tuning (ignored for other databases): journal mode,
+    # fsync level, lock wait in milliseconds, page cache and memory map sizes.
+    "SQLITE_JOURNAL_MODE": ("SQLITE_JOURNAL_MODE", "WAL", str.upper),
+    "SQLITE_SYNCHRONOUS": ("SQLITE_SYNCHRONOUS", "NORMAL", str.upper),
+    "SQLITE_BUSY_TIMEOUT": ("SQLITE_BUSY_TIMEOUT", "5000", int),
+    "SQLITE_CACHE_SIZE_KB": ("SQLITE_CACHE_SIZE_KB", "65536", int),
+    "SQLITE_MMAP_SIZE": ("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024), int),
+    # Browser cache lifetimes for /static files and content-addressed /uploads files.
+    "SEND_FILE_MAX_AGE_DEFAULT": ("STATIC_MAX_AGE", "3600", int),
+    "UPLOAD_MAX_AGE": ("UPLOAD_MAX_AGE", "31536000", int),
+    # Hand upload transfers to the front proxy: "", "x-accel-redirect" or "x-sendfile".
+    "UPLOAD_SENDFILE": ("UPLOAD_SENDFILE", "", str.lower),
+    "UPLOAD_ACCEL_PREFIX": ("UPLOAD_ACCEL_PREFIX", "/protected-uploads/", str),
+    # Seconds to cache each logged-in user's principal per worker (0 disables).
+    "USER_CACHE_TTL": ("USER_CACHE_TTL", "0", int),
+    # Seconds each worker keeps a rendered poll results panel; panels are
+    # rendered again as soon as the poll's version changes.
+    "POLL_RESULTS_CACHE_TTL": ("POLL_RESULTS_CACHE_TTL", "3600", int),
+    # Longest time each worker caches the ids of open polls (0 disables); the
+    # cache also expires when the next open poll does.
+    "ACTIVE_POLLS_CACHE_TTL": ("ACTIVE_POLLS_CACHE_TTL", "60", int),
+    # Seconds a poll submission's idempotency key is remembered so retries
+    # (double taps, resent requests) replay the stored outcome.
+    "POLL_IDEMPOTENCY_TTL": ("POLL_IDEMPOTENCY_TTL", "600", int),
+    # Seconds between folds of new votes into the option totals by the jobs worker.
+    "POLL_VOTE_COMPACT_INTERVAL": ("POLL_VOTE_COMPACT_INTERVAL", "10", int),
+    # Free responses per page of the admin polls page's response viewer.
+    "POLL_RESPONSES_PAGE_SIZE": ("POLL_RESPONSES_PAGE_SIZE", "50", int),
+    # Whether closing a poll also deletes the per-voter records of its
+    # private-vote questions, keeping only their frozen totals.
+    "POLL_ARCHIVE_PRIVATE_VOTERS": ("POLL_ARCHIVE_PRIVATE_VOTERS", "false", env_flag),
+    # Live poll result streams: seconds between result checks (at most one
+    # event per interval), and seconds before a stream ends and the browser
+    # reconnects, which must stay below the web server's worker timeout.
+    "POLL_STREAM_INTERVAL": ("POLL_STREAM_INTERVAL", "0.5", float),
+    "POLL_STREAM_TIMEOUT": ("POLL_STREAM_TIMEOUT", "25", int),
+    # Background jobs: worker threads, retry attempts and backoff, and the
+    # seconds after which a running job from a crashed worker is retried.
+    "JOB_WORKER_CONCURRENCY": ("JOB_WORKER_CONCURRENCY", "1", int),
+    "JOB_MAX_ATTEMPTS": ("JOB_MAX_ATTEMPTS", "5", int),
+    "JOB_RETRY_DELAY": ("JOB_RETRY_DELAY", "30", int),
+    "JOB_LEASE_SECONDS": ("JOB_LEASE_SECONDS", "600", int),
+    "JOB_RETENTION_HOURS": ("JOB_RETENTION_HOURS", "168", float),
+}
+
+def load_tuning_config(app):
+    """ Read the performance tuning settings from the environment into the app config. """
+    for key, (variable, default, parse) in TUNING_CONFIG.items():
+        app.config[key] = parse(os.getenv(variable, default))
+    # Optional read replica for GET requests.
+    if os.getenv("SQLALCHEMY_REPLICA_URI"):
+        app.config["SQLALCHEMY_BINDS"] = {"replica": os.getenv("SQLALCHEMY_REPLICA_URI")}
+    # Whether templates are checked for changes on every render (default: debug only).
+    if os.getenv("TEMPLATES_AUTO_RELOAD"):
+        app.config["TEMPLATES_AUTO_RELOAD"] = env_flag(os.getenv("TEMPLATES_AUTO_RELOAD"))
+
+def init_extensions(app):
+    """ Initialize the Flask extensions for the app. """
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                configure_sqlite(app, engine)
+    if os.getenv("FLASK_RUN_FROM_CLI") == "true":
+        # Flask-Migrate pulls in Alembic, which is only needed by the `flask db`
+        # commands, so web workers skip importing it.
+        from flask_migrate import Migrate # pylint: disable=import-outside-toplevel
+        Migrate(app, db)
+    login_manager.init_app(app)
+    csrf.init_app(app)
+    cache.init_app(app)
+
 test_config = {
     'TESTING': True,
     'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', # Use in-memory database for tests.
@@ -126,21 +249,24 @@ def create_app(use_test_config=False):
     app.config["RECAPTCHA_PUBLIC_KEY"] = os.getenv("RECAPTCHA_SITE_KEY")
     app.config["RECAPTCHA_PRIVATE_KEY"] = os.getenv("RECAPTCHA_SECRET_KEY")
     app.config['RECAPTCHA_SKIP_IP_CHECK'] = True
+    load_tuning_config(app)
+    # Largest accepted attachment; Werkzeug rejects bigger request bodies up front.
+    app.config["MAX_ATTACHMENT_SIZE"] = int(os.getenv("MAX_ATTACHMENT_SIZE_MB", "50")) * 1024 * 1024
+    app.config["MAX_CONTENT_LENGTH"] = app.config["MAX_ATTACHMENT_SIZE"] + 1024 * 1024
 
     if use_test_config:
         app.config.update(test_config)
 
     # Initialize the app extensions.
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login_manager.init_app(app)
-    csrf.init_app(app)
+    init_extensions(app)
 
     # Configure Flask-Login.
-    from .models import Users  # pylint: disable=import-outside-toplevel
+    from .models import Users, UserPrincipal  # pylint: disable=import-outside-toplevel
     @login_manager.user_loader
     def loader_user(user_id):
         """ Flask-Login login manager in combination with Flask-SQL-Alchemy. """
+        if app.config["USER_CACHE_TTL"] > 0:
+            return UserPrincipal.load(user_id, app.config["USER_CACHE_TTL"])
         return db.session.get(Users, user_id)
 
     # Define the app variables.
@@ -184,12 +310,20 @@ def create_app(use_test_config=False):
                         )
         return context
 
-    # Add custom Jinja filters.
-    app.jinja_env.filters['datetime_format'] = datetime_format
+    # Add custom Jinja filters and the template bytecode cache.
+    configure_templates(app)
 
     # Register the error handlers.
     register_error_handlers(app)
 
+    # Keep users who just wrote on the primary database.
+    from .replica import remember_writes # pylint: disable=import-outside-toplevel
+    app.after_request(remember_writes)
+
+    # Register the CLI commands.
+    from .commands import register_commands # pylint: disable=import-outside-toplevel
+    register_commands(app)
+
     # Register the blueprints.
     from .blueprints.admin import admin_bp # pylint: disable=import-outside-toplevel
     from .blueprints.auth import auth_bp # pylint: disable=import-outside-toplevel
@@ -4,14 +4,13 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 10/7/2025
+Last Modified: 10/19/2026
 
 File Purpose: Admin routes for the project.
 """
 
 # Standard library imports.
 import datetime
-import os
 
 # Third-party imports.
 from flask import (
@@ -26,12 +25,15 @@ from flask import (
     current_app
 )
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
+from sqlalchemy.orm import selectinload
 
 # Local application imports.
 from app.extensions import db
 from app.forms import AdminAttendeeAddForm, CreateMeetingForm
-from app.models import Users, Meetings, Attendees, Minutes, Attachments
+from app.models import Users, UserPrincipal, Meetings, Attendees, Minutes, Attachments
+from app.cleanup import queue_release
+from app.previews import queue_preview
+from app.storage import store_upload, UploadTooLargeError
 from app.utils import generate_meeting_code, sha_hash
 from app.__init__ import admin_required
 
@@ -43,7 +45,7 @@ def get_last_attended_date(user):
     # Query the Meetings table
     last_meeting = db.session.query(Meetings.event_start)\
         .join(Attendees, Meetings.id == Attendees.meeting)\
-        .filter(Attendees.username == user.username)\
+        .filter(Attendees.user_id == user.id)\
         .filter(Meetings.event_start != None)\
         .order_by(Meetings.event_start.desc())\
         .first()
@@ -55,10 +57,11 @@ def get_last_attended_date(user):
 @admin_required
 def admin_dashboard(meeting_id):
     """ Show the administrator dashboard page for a single meeting. """
-    meeting = Meetings.query.filter_by(id = meeting_id).first_or_404()
-    attendees = Attendees.query.filter_by(meeting = meeting_id).all()
-    minutes = Minutes.query.filter_by(meeting = meeting_id).all()
-    attachments = Attachments.query.filter_by(meeting = meeting_id).all()
+    meeting = Meetings.query.options(
+        selectinload(Meetings.attendees),
+        selectinload(Meetings.minutes),
+        selectinload(Meetings.attachments)
+    ).filter_by(id = meeting_id).first_or_404()
 
     add_attendee_form = AdminAttendeeAddForm()
 
@@ -66,9 +69,9 @@ def admin_dashboard(meeting_id):
         "admin/dashboard.html",
         page_title = f"Meeting - {meeting.title}",
         meeting = meeting,
-        attendees = attendees,
-        minutes = minutes,
-        attachments = attachments,
+        attendees = meeting.attendees,
+        minutes = meeting.minutes,
+        attachments = meeting.attachments,
         add_attendee_form = add_attendee_form
     ), 200
 
@@ -113,7 +116,11 @@ def event_start(meeting_id):
             meeting.state = "active"
             meeting.event_start = datetime.datetime.now()
             # Add the user (officer) as an attendee.
-            attendance = Attendees(username = current_user.username, meeting = meeting_id)
+            attendance = Attendees(
+                username = current_user.username,
+                user_id = current_user.id,
+                meeting = meeting_id
+            )
             db.session.add(attendance)
             db.session.commit()
             return_data = {
@@ -212,12 +219,17 @@ def event_attendees(meeting_id):
         # Handle minutes submission.
         if form.validate_on_submit():
             attendee_username = form.username.data
-            if Users.query.filter_by(username = attendee_username).first() is not None:
+            attendee_user = Users.query.filter_by(username = attendee_username).first()
+            if attendee_user is not None:
                 if Attendees.query.filter_by(
                     meeting = meeting_id,
-                    username = attendee_username
+                    user_id = attendee_user.id
                 ).first() is None:
-                    attendee = Attendees(meeting = meeting_id, username = attendee_username)
+                    attendee = Attendees(
+                        meeting = meeting_id,
+                        username = attendee_username,
+                        user_id = attendee_user.id
+                    )
                     db.session.add(attendee)
                     db.session.commit()
                     return_data = {
@@ -379,20 +391,42 @@ def event_add_attachment(meeting_id):
             # Only permit certain file types.
             allowed_extensions = ['pptx', 'pdf', 'docx', 'txt', 'png', 'jpg', 'jpeg', 'gif']
             if file.filename.lower().split('.')[-1] in allowed_extensions:
-                # Save the file to the docker volume directory and database.
-                filename = secure_filename(f"meeting-{meeting_id}-{file.filename}")
-                if Attachments.query.filter_by(
+                # Stream the file into the content-addressed store, then record it.
+                try:
+                    _, content_hash, filepath = store_upload(
+                        file,
+                        current_app.config['UPLOAD_FOLDER'],
+                        max_size = current_app.config["MAX_ATTACHMENT_SIZE"]
+                    )
+                except UploadTooLargeError:
+                    return_data = {
+                        "success": False,
+                        "meeting_id": meeting_id,
+                        "message": "File is too large."
+                    }
+                    return jsonify(return_data), 413
+                attachment = Attachments.query.filter_by(
                     meeting = meeting_id,
                     filename = file.filename
-                ).first() is None:
+                ).first()
+                replaced_filepath = None
+                if attachment is None:
                     attachment = Attachments(
                         meeting = meeting_id,
                         filename = file.filename,
-                        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename),
+                        filepath = filepath,
                     )
                     db.session.add(attachment)
-                    db.session.commit()
-                file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+                elif attachment.filepath != filepath:
+                    replaced_filepath = attachment.filepath
+                attachment.filepath = filepath
+                attachment.content_hash = content_hash
+                # Previews and file cleanup are handled by the jobs worker, not in this request.
+                db.session.flush()
+                queue_preview(attachment)
+                if replaced_filepath is not None:
+                    queue_release(replaced_filepath)
+                db.session.commit()
                 return_data = {
                     "success": True,
                     "meeting_id": meeting_id,
@@ -427,9 +461,8 @@ def event_remove_attachment(meeting_id, attachment_id):
             meeting = meeting_id
         ).first()
         if attachment is not None:
-            # Delete the file from the filesystem first.
-            if os.path.exists(attachment.filepath):
-                os.remove(attachment.filepath)
+            # The worker deletes the file once no other attachment shares its content.
+            queue_release(attachment.filepath)
             db.session.delete(attachment)
             db.session.commit()
             return_data = {
@@ -461,13 +494,14 @@ def event_delete(meeting_id):
     """ Delete a single meeting from the administrator dashboard. """
     meeting = Meetings.query.filter_by(id = meeting_id).first_or_404()
 
-    # Delete all associated attendees, minutes, and attachments first.
-    Attendees.query.filter_by(meeting = meeting_id).delete()
-    Minutes.query.filter_by(meeting = meeting_id).delete()
-    for attachment in Attachments.query.filter_by(meeting = meeting_id).all():
-        if os.path.exists(attachment.filepath):
-            os.remove(attachment.filepath)
-    Attachments.query.filter_by(meeting = meeting_id).delete()
+    # Queue removal of the stored files with the deletion; the jobs worker
+    # removes those no longer referenced by other meetings after the commit.
+    filepaths = db.session.query(Attachments.filepath)\
+        .filter_by(meeting = meeting_id).distinct().all()
+    for (filepath,) in filepaths:
+        queue_release(filepath)
+
+    # Attendees, minutes, and attachments are removed by ON DELETE CASCADE.
     db.session.delete(meeting)
     db.session.commit()
     return redirect(url_for("main.events_list"))
@@ -478,15 +512,19 @@ def event_delete(meeting_id):
 def users_list():
     """ Show the users index page."""
     all_users = Users.query.order_by(Users.id).all()
+    # Count meetings attended and find the last check-in for every user in one query.
+    attendance = dict(
+        (user_id, (meetings_attended, last_checkin)) for user_id, meetings_attended, last_checkin in
+        db.session.query(
+            Attendees.user_id,
+            db.func.count(Attendees.id),
+            db.func.max(Meetings.event_start)
+        ).join(Meetings, Meetings.id == Attendees.meeting)
+        .filter(Attendees.user_id.isnot(None))
+        .group_by(Attendees.user_id)
+    )
     for user in all_users:
-        # Get the number of meetings attended by each user.
-        user.meetings_attended = Attendees.query.filter_by(username = user.username).count()
-        # Get the date of the last meeting attended by each user.
-        last_attended_meeting = get_last_attended_date(user)
-        if last_attended_meeting is not None:
-            user.last_checkin = last_attended_meeting
-        else:
-            user.last_checkin = None
+        user.meetings_attended, user.last_checkin = attendance.get(user.id, (0, None))
 
     # Total meetings, optionally filtered by start date.
     since_param = request.args.get("since")
@@ -549,6 +587,7 @@ def promote_user(user_id):
     if user.role != "admin":
         user.role = "admin"
         db.session.commit()
+        UserPrincipal.invalidate(user.id)
         flash(f"User {user.username} promoted to admin successfully.", "success")
         return redirect(url_for("admin.users_list"))
     else:
@@ -567,6 +606,7 @@ def demote_user(user_id):
     if user.role != "user":
         user.role = "user"
         db.session.commit()
+        UserPrincipal.invalidate(user.id)
         flash(f"User {user.username} demoted to user successfully.", "success")
         return redirect(url_for("admin.users_list"))
     else:
@@ -584,6 +624,7 @@ def disable_user_mfa(user_id):
         user.totp_active = False
         user.totp_secret = None
         db.session.commit()
+        UserPrincipal.invalidate(user.id)
         flash(f"Two-factor authentication for user {user.username} disabled successfully.")
         return redirect(url_for("admin.users_list"))
     else:
@@ -599,6 +640,7 @@ def disable_user_account(user_id):
     if user.activated:
         user.activated = False
         db.session.commit()
+        UserPrincipal.invalidate(user.id)
         flash(f"Account for user {user.username} disabled successfully.")
         return redirect(url_for("admin.users_list"))
     else:
@@ -614,6 +656,7 @@ def enable_user_account(user_id):
     if not user.activated:
         user.activated = True
         db.session.commit()
+        UserPrincipal.invalidate(user.id)
         flash(f"Account for user {user.username} enabled successfully.")
         return redirect(url_for("admin.users_list"))
     else:
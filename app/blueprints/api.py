@@ -14,8 +14,11 @@ from flask import Blueprint, jsonify
 
 # Local application imports.
 from app.models import Meetings, Attendees, Minutes, Attachments
+from app.replica import route_reads_to_replica
 
 api_bp = Blueprint('api', __name__, template_folder='templates')
+# GET requests may read from the replica database when one is configured.
+api_bp.before_request(route_reads_to_replica)
 
 # API Routing.
 @api_bp.route("/event/attendees/<int:meeting_id>/")
@@ -4,7 +4,7 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 2/14/2026
+Last Modified: 10/19/2026
 
 File Purpose: Authentication routes for the project.
 """
@@ -25,7 +25,7 @@ from flask_login import login_user, logout_user, login_required, current_user
 # Local application imports.
 from app.extensions import db
 from app.forms import LoginForm, SignUpFormEmail, SignUpFormUsername, AccountUpdateForm
-from app.models import Users, RecoveryCodes
+from app.models import Users, UserPrincipal, RecoveryCodes
 
 auth_bp = Blueprint('auth', __name__, template_folder='templates')
 
@@ -191,6 +191,7 @@ def update_account():
 
         # Update database and redirect.
         db.session.commit()
+        UserPrincipal.invalidate(update_user.id)
         flash("Account updated successfully.", "success")
     else:
         for field, errors in form.errors.items():
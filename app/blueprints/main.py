@@ -4,13 +4,17 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz), Thomas Crossman (github.com/crossmant1)
-Last Modified: 3/22/2026
+Last Modified: 10/19/2026
 
 File Purpose: Primary routes for the project.
 """
 
 # Standard library imports.
 from datetime import datetime
+import mimetypes
+import os
+import secrets
+from urllib.parse import quote
 
 # Third-party imports.
 from flask import (
@@ -21,26 +25,40 @@ from flask import (
     url_for,
     flash,
     current_app,
-    send_from_directory
+    send_from_directory,
+    abort,
+    get_flashed_messages,
+    jsonify,
+    session
 )
 from flask_login import current_user, login_required, logout_user
 from sqlalchemy import desc
+from sqlalchemy.orm import selectinload
+from werkzeug.security import safe_join
 
 # Local application imports.
 from app.forms import CreateMeetingForm, MeetingCheckinForm, PollVoteForm
 from app.models import (Meetings,
-    Attendees,
-    Minutes,
     Attachments,
+    Attendees,
     Poll,
+    PollQuestion,
     PollOption,
     PollVoter,
     PollFreeResponse
 )
 from app.extensions import db
+from app.polling import active_poll_ids
+from app.previews import thumbnail_folder
+from app.replica import route_reads_to_replica
+from app.storage import is_blob_path
+from app.submissions import claim_submission, complete_submission
 from app.utils import sha_hash
+from app.votes import bump_poll_version, record_vote, schedule_vote_compaction
 
 main_bp = Blueprint('main', __name__, template_folder='templates')
+# GET requests may read from the replica database when one is configured.
+main_bp.before_request(route_reads_to_replica)
 
 # Poll submission helper functions.
 def handle_frq(question):
@@ -65,7 +83,7 @@ def handle_frq(question):
 
             # Process the updated text
             existing_response.response_text = response_text
-            existing_response.created_at = db.func.now()
+            existing_response.created_at = datetime.now()
             return True, True
         else:
             new_response = PollFreeResponse(
@@ -110,9 +128,7 @@ def handle_multiple_response_mcq(selected_option_ids, question):
     # Decrement vote counts for removed options
     for vote in existing_votes:
         if vote.option_id not in new_option_ids:
-            option = PollOption.query.get(vote.option_id)
-            if option and option.votes > 0:
-                option.votes -= 1
+            record_vote(question.poll_id, vote.option_id, -1)
             db.session.delete(vote)
             changes_made = True
 
@@ -121,7 +137,7 @@ def handle_multiple_response_mcq(selected_option_ids, question):
         if option_id not in existing_option_ids:
             option = PollOption.query.get(option_id)
             if option:
-                option.votes += 1
+                record_vote(question.poll_id, option_id, 1)
                 new_vote = PollVoter(
                     user_id=current_user.id,
                     question_id=question.id,
@@ -157,21 +173,19 @@ def handle_single_mcq(selected_option_ids, question):
             return False, True
 
         # Process the changed vote
-        old_option = PollOption.query.get(existing_vote.option_id)
-        if old_option and old_option.votes > 0:
-            old_option.votes -= 1
-
         new_option = PollOption.query.get(option_id)
         if new_option:
-            new_option.votes += 1
+            record_vote(question.poll_id, existing_vote.option_id, -1)
+            record_vote(question.poll_id, option_id, 1)
             existing_vote.option_id = option_id
+            existing_vote.voted_at = datetime.now()
         return True, True
         
     else:
         # New vote
         option = PollOption.query.get(option_id)
         if option:
-            option.votes += 1
+            record_vote(question.poll_id, option_id, 1)
             new_vote = PollVoter(
                 user_id=current_user.id,
                 question_id=question.id,
@@ -217,22 +231,32 @@ def home():
     else:
         featured_meeting = None
 
-    all_polls = Poll.query.filter(
-        Poll.poll_expires.is_(None) |
-        (Poll.poll_expires > datetime.now())
-    ).all()
+    poll_ids = active_poll_ids()
+    all_polls = Poll.query.filter(Poll.id.in_(poll_ids)).order_by(Poll.id).options(
+        selectinload(Poll.questions).selectinload(PollQuestion.options)
+    ).all() if poll_ids else []
 
     voted_questions = set()
     voted_options = set()
     user_frq_responses = {}
 
-    if current_user.is_authenticated:
-        voter_records = PollVoter.query.filter_by(user_id=current_user.id).all()
-        voted_questions = {voter.question_id for voter in voter_records}
-        voted_options = {voter.option_id for voter in voter_records}
-
-        frq_records = PollFreeResponse.query.filter_by(user_id=current_user.id).all()
-        user_frq_responses = {frq.question_id: frq.response_text for frq in frq_records}
+    # Only look up the user's answers to the questions shown on the page.
+    question_ids = [question.id for poll in all_polls for question in poll.questions]
+    if current_user.is_authenticated and question_ids:
+        voter_records = db.session.query(PollVoter.question_id, PollVoter.option_id).filter(
+            PollVoter.user_id == current_user.id,
+            PollVoter.question_id.in_(question_ids)
+        ).all()
+        voted_questions = {question_id for question_id, _ in voter_records}
+        voted_options = {option_id for _, option_id in voter_records}
+
+        user_frq_responses = dict(db.session.query(
+            PollFreeResponse.question_id,
+            PollFreeResponse.response_text
+        ).filter(
+            PollFreeResponse.user_id == current_user.id,
+            PollFreeResponse.question_id.in_(question_ids)
+        ).all())
         voted_questions.update(user_frq_responses.keys())
 
     return render_template(
@@ -244,6 +268,7 @@ def home():
         voted_questions=voted_questions,
         voted_options=voted_options,
         user_frq_responses=user_frq_responses,
+        submission_key = secrets.token_urlsafe(16),
         form = form,
         poll_form = poll_form
     )
@@ -272,17 +297,18 @@ def events_list():
 def user_event(meeting_id):
     """ Show a page with the details of a single meeting. """
     form = MeetingCheckinForm()
-    meeting = Meetings.query.filter_by(id = meeting_id).first_or_404()
-    attendees = Attendees.query.filter_by(meeting = meeting_id).all()
-    minutes = Minutes.query.filter_by(meeting = meeting_id).all()
-    attachments = Attachments.query.filter_by(meeting = meeting_id).all()
+    meeting = Meetings.query.options(
+        selectinload(Meetings.attendees),
+        selectinload(Meetings.minutes),
+        selectinload(Meetings.attachments)
+    ).filter_by(id = meeting_id).first_or_404()
     return render_template(
         "event.html",
         page_title = f"Meeting - {meeting.title}",
         meeting = meeting,
-        all_minutes = minutes,
-        all_attendees = attendees,
-        all_attachments = attachments,
+        all_minutes = meeting.minutes,
+        all_attendees = meeting.attendees,
+        all_attachments = meeting.attachments,
         form = form
     )
 
@@ -298,7 +324,7 @@ def event_check_in(meeting_id):
             if meeting.state == "active":
                 if Attendees.query.filter_by(
                 meeting = meeting_id,
-                username = current_user.username
+                user_id = current_user.id
                 ).first() is None:
                     if sha_hash(code) == meeting.code_hash:
                         # Check for admin-only meeting status.
@@ -316,6 +342,7 @@ def event_check_in(meeting_id):
                             # Meeting active, add the user as an attendee.
                             attendance = Attendees(
                                 username = current_user.username,
+                                user_id = current_user.id,
                                 meeting = meeting_id)
                             db.session.add(attendance)
                             db.session.commit()
@@ -337,57 +364,245 @@ def event_check_in(meeting_id):
         flash("Check-in failed. Specified meeting does not exist.", "danger")
     return redirect(url_for("main.home"))
 
+def upload_mimetype(filename):
+    """ Get the (mimetype, inline) a stored file named filename is served with.
+
+    Only raster images and PDFs are shown in the browser; anything else,
+    including SVG and HTML that could run scripts on this origin, downloads.
+    """
+    mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    inline = mimetype == "application/pdf" or \
+        (mimetype.startswith("image/") and mimetype != "image/svg+xml")
+    return mimetype, inline
+
+def send_upload(name, download_name=None):
+    """ Serve a file from the upload folder with caching headers.
+
+    Content-addressed files never change, so they get a strong ETag (their
+    digest) and a long immutable lifetime; other files must be revalidated.
+    When UPLOAD_SENDFILE is set, the transfer itself is handed to the front
+    proxy with an X-Accel-Redirect or X-Sendfile header. The content type
+    comes from download_name, which must be a stored filename, never one
+    taken from the request.
+    """
+    folder = current_app.config["UPLOAD_FOLDER"]
+    content_addressed = is_blob_path(name)
+    sendfile_mode = current_app.config["UPLOAD_SENDFILE"]
+    mimetype, inline = upload_mimetype(download_name or name)
+
+    if sendfile_mode:
+        path = safe_join(folder, name)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = current_app.response_class(mimetype=mimetype)
+        if sendfile_mode == "x-accel-redirect":
+            accel_prefix = current_app.config["UPLOAD_ACCEL_PREFIX"].rstrip("/")
+            response.headers["X-Accel-Redirect"] = f"{accel_prefix}/{quote(name)}"
+        else:
+            response.headers["X-Sendfile"] = os.path.abspath(path)
+        response.headers.set("Content-Disposition", "inline" if inline else "attachment",
+                             filename=download_name or name)
+        if content_addressed:
+            response.set_etag(name)
+        # The proxy handles ranges itself; only answer If-None-Match here.
+        response.make_conditional(request)
+    else:
+        response = send_from_directory(
+            folder,
+            name,
+            mimetype=mimetype,
+            as_attachment=not inline,
+            download_name=download_name or name,
+            etag=name if content_addressed else True
+        )
+
+    # Browsers must not guess a more dangerous type from the file contents.
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    if content_addressed:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config["UPLOAD_MAX_AGE"]
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+    return response
+
 @main_bp.route('/uploads/<name>')
 def download_file(name):
     """ Serve an uploaded file. """
-    return send_from_directory(current_app.config["UPLOAD_FOLDER"], name)
-
-@main_bp.route('/submit-poll/<int:poll_id>', methods=['POST'])
-@login_required
-def submit_poll(poll_id):
-    """Handle bulk submission of all questions in a poll."""
+    return send_upload(name)
+
+@main_bp.route('/uploads/<name>/<filename>')
+def download_attachment(name, filename):
+    """ Serve a stored attachment file under its original filename.
+
+    The filename in the URL only picks between attachments sharing the file;
+    the name served (and so the content type) is always the stored one.
+    """
+    attachments = [attachment for attachment in
+                   Attachments.query.filter(Attachments.filepath.endswith(name)).all()
+                   if os.path.basename(attachment.filepath) == name]
+    if not attachments:
+        abort(404)
+    attachment = next((attachment for attachment in attachments if attachment.filename == filename),
+                      attachments[0])
+    return send_upload(name, download_name=attachment.filename)
+
+@main_bp.route('/thumbnails/<name>')
+def attachment_thumbnail(name):
+    """ Serve a generated attachment preview image. """
+    response = send_from_directory(
+        thumbnail_folder(),
+        name,
+        max_age=current_app.config["UPLOAD_MAX_AGE"]
+    )
+    # Previews are named by content digest, so they never change.
+    response.cache_control.immutable = True
+    return response
+
+def save_poll_responses(poll, before_commit=None):
+    """ Save the current user's answers to every question of a poll from the request form.
+
+    Outcome messages are flashed; returns whether every answer was accepted,
+    or None if saving failed and nothing was committed. before_commit, if
+    given, is called with the success flag and the outcome messages just
+    before the answers are committed, so anything it adds to the session is
+    saved with them.
+    """
     submission_successful = True
     changes_made = False
+    responses_changed = False
+    votes_changed = False
     successes = 0
     failures = 0
-    poll = Poll.query.get_or_404(poll_id)
-    if poll.poll_expires and poll.poll_expires <= datetime.now():
-        flash("Poll has expired. You cannot submit responses.", "danger")
-        return redirect(url_for('main.home'))
 
     try:
         for question in poll.questions:
             if question.is_free_response:
                 # Handle FRQ
                 status, changes = handle_frq(question)
-                changes_made = changes_made or changes
-                submission_successful = submission_successful and status
-                if status:
-                    successes += 1
-                else:
-                    failures += 1
+                responses_changed = responses_changed or changes
             else:
                 # Handle MCQ (both single and multiple response)
                 status, changes = handle_mcq(question)
-                changes_made = changes_made or changes
-                submission_successful = submission_successful and status
-                if status:
-                    successes += 1
-                else:
-                    failures += 1
+                votes_changed = votes_changed or changes
+            changes_made = changes_made or changes
+            submission_successful = submission_successful and status
+            if status:
+                successes += 1
+            else:
+                failures += 1
 
-        db.session.commit()
+        if responses_changed:
+            bump_poll_version(poll.id)
+        if votes_changed:
+            # Votes only add vote events; fold them into the option totals soon.
+            schedule_vote_compaction()
         if submission_successful and changes_made:
-            flash("All responses submitted successfully!", "success")
+            summary = ("success", "All responses submitted successfully!")
         elif submission_successful and not changes_made:
             # No changes were made, but no failures either (e.g. all responses were the same as before).
-            flash("No changes were made to any responses.", "success")
+            summary = ("success", "No changes were made to any responses.")
         else:
-            flash(f"Some responses were not submitted successfully. Successes: {successes}, Failures: {failures}", "danger")
+            summary = ("danger", "Some responses were not submitted successfully. "
+                                 f"Successes: {successes}, Failures: {failures}")
+        if before_commit is not None:
+            # The messages flashed so far, followed by the summary flashed after committing.
+            messages = [list(message) for message in session.get("_flashes", [])]
+            before_commit(submission_successful, messages + [list(summary)])
+        db.session.commit()
+        flash(summary[1], summary[0])
 
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error submitting poll: {str(e)}")
         flash("An error occurred while saving your responses. Please try again.", "danger")
+        return None
+
+    return submission_successful
+
+def poll_state(poll):
+    """ Get a poll's public vote tallies and the current user's recorded answers. """
+    question_ids = [question_id for question_id, in
+                    db.session.query(PollQuestion.id).filter_by(poll_id = poll.id)]
+    tallies = {}
+    # Vote counts of private-vote questions are never shown to members.
+    options = db.session.query(PollOption.question_id, PollOption.id, PollOption.current_votes)\
+        .join(PollQuestion, PollQuestion.id == PollOption.question_id)\
+        .filter(PollQuestion.poll_id == poll.id, PollQuestion.private_vote == False)
+    for question_id, option_id, votes in options:
+        tallies.setdefault(question_id, {})[option_id] = votes
+
+    selected = db.session.query(PollVoter.option_id).filter(
+        PollVoter.user_id == current_user.id,
+        PollVoter.question_id.in_(question_ids)
+    )
+    responses = db.session.query(PollFreeResponse.question_id, PollFreeResponse.response_text)\
+        .filter(PollFreeResponse.user_id == current_user.id,
+                PollFreeResponse.question_id.in_(question_ids))
+    return {
+        "tallies": tallies,
+        "selected_options": sorted(option_id for option_id, in selected),
+        "responses": dict(responses.all()),
+    }
+
+def submission_key():
+    """ Get the client's idempotency key for this poll submission, if it sent one. """
+    key = request.headers.get("Idempotency-Key") or request.form.get("idempotency_key")
+    return key if key and len(key) <= 64 else None
+
+@main_bp.route('/submit-poll/<int:poll_id>', methods=['POST'])
+@login_required
+def submit_poll(poll_id):
+    """Handle bulk submission of all questions in a poll."""
+    poll = Poll.query.get_or_404(poll_id)
+    submission, replay = claim_submission(current_user.id, poll.id, submission_key())
+    if replay is not None:
+        # A retry of a submission that was already saved: show its outcome again.
+        for category, message in replay[0]["messages"]:
+            flash(message, category)
+        return redirect(url_for('main.home'))
+
+    if poll.poll_expires and poll.poll_expires <= datetime.now():
+        # Release the claimed key.
+        db.session.rollback()
+        flash("Poll has expired. You cannot submit responses.", "danger")
+        return redirect(url_for('main.home'))
+
+    def store_outcome(success, messages):
+        complete_submission(submission, {"success": success, "messages": messages})
 
+    save_poll_responses(poll, before_commit = store_outcome)
     return redirect(url_for('main.home'))
+
+@main_bp.route('/submit-poll/<int:poll_id>/json', methods=['POST'])
+@login_required
+def submit_poll_json(poll_id):
+    """ Submit a poll from the page and return the updated tallies as JSON. """
+    poll = Poll.query.get_or_404(poll_id)
+    submission, replay = claim_submission(current_user.id, poll.id, submission_key())
+    if replay is not None:
+        outcome, status_code = replay
+        return jsonify(outcome), status_code
+
+    if poll.poll_expires and poll.poll_expires <= datetime.now():
+        # Release the claimed key.
+        db.session.rollback()
+        return jsonify({
+            "success": False,
+            "messages": [["danger", "Poll has expired. You cannot submit responses."]],
+        }), 403
+
+    saved = {}
+    def store_outcome(success, messages):
+        saved.update(success = success, messages = messages, **poll_state(poll))
+        complete_submission(submission, saved)
+
+    success = save_poll_responses(poll, before_commit = store_outcome)
+    # Hand the outcome to the page instead of showing it on the next full page load.
+    messages = get_flashed_messages(with_categories = True)
+    if success is None:
+        # The outcome stored before committing was rolled back with the answers.
+        return jsonify({"success": False, "messages": messages}), 500
+    outcome = saved or {"success": success, "messages": messages, **poll_state(poll)}
+    return jsonify(outcome), 200
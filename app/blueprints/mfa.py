@@ -4,7 +4,7 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 2/14/2026
+Last Modified: 10/19/2026
 
 File Purpose: Multi-factor authentication routes for the project.
 """
@@ -14,7 +14,6 @@ import base64
 from io import BytesIO
 
 # Third-party imports.
-import qrcode
 import pyotp
 from flask import (
     Blueprint,
@@ -30,12 +29,28 @@ from flask_login import login_user, login_required, current_user
 
 # Local application imports.
 from app.forms import TotpVerifyForm, TotpSetupForm, RecoveryCodeVerifyForm
-from app.extensions import db
-from app.models import Users, RecoveryCodes
+from app.extensions import db, cache
+from app.models import Users, UserPrincipal, RecoveryCodes
 
 
 mfa_bp = Blueprint('mfa', __name__, template_folder='templates')
 
+# Seconds to keep a rendered setup QR code for page reloads during enrollment.
+QR_CACHE_TTL = 600
+
+
+def render_totp_qr(user):
+    """ Render (or reuse) the base64-encoded PNG setup QR code for a user's secret. """
+    qr_data = cache.get("totp_qr", user.totp_secret)
+    if qr_data is None:
+        # Imported here so workers that never show the setup page skip loading qrcode.
+        import qrcode # pylint: disable=import-outside-toplevel
+        stream = BytesIO()
+        qrcode.make(user.get_totp_uri()).save(stream, format='PNG')
+        qr_data = base64.b64encode(stream.getvalue()).decode('utf-8')
+        cache.set("totp_qr", user.totp_secret, qr_data, QR_CACHE_TTL)
+    return qr_data
+
 
 @mfa_bp.route('/reset-recovery-codes/', methods=['GET'])
 @login_required
@@ -61,6 +76,7 @@ def reset_recovery_codes():
 
     # Save to database.
     db.session.commit()
+    UserPrincipal.invalidate(user.id)
     return render_template("auth/reset-codes.html", page_title="MFA Recovery Codes", codes=codes)
 
 @mfa_bp.route('/verify-recovery-code/', methods=['GET', 'POST'])
@@ -146,27 +162,22 @@ def setup_totp():
 
     form = TotpSetupForm()
 
-    # 1. Get the provisioning URI
-    current_user.generate_totp_secret()
-    db.session.commit()
-    uri = current_user.get_totp_uri()
-
-    # 2. Generate the QR Code image data using 'qrcode'
-    img = qrcode.make(uri)
-    stream = BytesIO()
-    # Save the image to the in-memory buffer as PNG
-    img.save(stream, format='PNG')
+    # 1. Reuse the pending secret on reloads, otherwise generate a new one.
+    user = db.session.get(Users, current_user.id)
+    if not user.totp_secret or session.get('mfa_setup_secret') != user.totp_secret:
+        user.generate_totp_secret()
+        db.session.commit()
 
-    # 3. Encode image data for embedding in HTML
-    qr_data = base64.b64encode(stream.getvalue()).decode('utf-8')
+    # 2. Render the QR code for the provisioning URI (cached per secret).
+    qr_data = render_totp_qr(user)
 
-    # Store the URI or secret temporarily if needed for verification in a separate route
-    session['mfa_setup_secret'] = current_user.totp_secret
+    # Store the secret temporarily for verification in a separate route
+    session['mfa_setup_secret'] = user.totp_secret
 
     return render_template('auth/setup-totp.html',
                            page_title='Setup TOTP MFA',
                            qr_data=qr_data,
-                           totp_secret=current_user.totp_secret,
+                           totp_secret=user.totp_secret,
                            form=form)
 
 @mfa_bp.route('/verify-totp-setup/', methods=['POST'])
@@ -185,9 +196,11 @@ def verify_totp_setup():
         # Create a TOTP object with the secret from the session and verify the code
         if pyotp.TOTP(secret).verify(token):
             # Finalize setup: save the secret (already on the model) and enable MFA
-            current_user.mfa_active = True
-            current_user.totp_active = True
+            user = db.session.get(Users, current_user.id)
+            user.mfa_active = True
+            user.totp_active = True
             db.session.commit()
+            UserPrincipal.invalidate(user.id)
             flash('TOTP MFA successfully enabled!', 'success')
 
             # Prompt user to set up recovery codes if not already present.
@@ -210,9 +223,11 @@ def verify_totp_setup():
 @login_required
 def disable_totp():
     """ Disable Two-Factor Authentication for the current user. """
-    current_user.totp_active = False
-    current_user.generate_totp_secret()
+    user = db.session.get(Users, current_user.id)
+    user.totp_active = False
+    user.generate_totp_secret()
     db.session.commit()
+    UserPrincipal.invalidate(user.id)
     flash('Two-Factor TOTP Authentication has been disabled.', 'success')
     return redirect(url_for('auth.my_account'))
 
@@ -220,10 +235,12 @@ def disable_totp():
 @login_required
 def disable_mfa():
     """ Disable Multi-Factor Authentication for the current user. """
-    current_user.mfa_active = False
-    current_user.totp_active = False
-    current_user.totp_secret = None
+    user = db.session.get(Users, current_user.id)
+    user.mfa_active = False
+    user.totp_active = False
+    user.totp_secret = None
     RecoveryCodes.query.filter_by(user_id=current_user.id).delete()
     db.session.commit()
+    UserPrincipal.invalidate(user.id)
     flash('Multi-Factor Authentication has been disabled.', 'success')
     return redirect(url_for('auth.my_account'))
@@ -15,21 +15,36 @@ from datetime import datetime
 # Third-party imports.
 from flask import (
     Blueprint,
+    Response,
     render_template,
     redirect,
+    request,
+    stream_with_context,
     url_for,
     flash,
+    jsonify,
 )
-from flask_login import login_required, current_user
+from flask_login import login_required
 
 # Local application imports.
 from app.extensions import db
-from app.models import Poll, PollQuestion, PollOption, PollVoter
+from app.models import Poll, PollQuestion
 from app.forms import CreatePollForm, DeletePollForm
+from app.polling import (
+    free_responses_page,
+    insert_poll,
+    invalidate_active_polls,
+    render_poll_results,
+    stream_results,
+    vote_series
+)
 from app.__init__ import admin_required
 
 polls_bp = Blueprint('polls', __name__, url_prefix='/admin', template_folder='templates')
 
+# Largest vote time series bucket, in seconds (one day).
+MAX_SERIES_RESOLUTION = 86400
+
 
 def flash_form_errors(form):
     """Flash human-readable validation errors, including nested FieldList/FormField entries."""
@@ -62,23 +77,83 @@ def flash_form_errors(form):
 @admin_required
 def polls_list():
     """ Show the polls. """
-    all_polls = Poll.query.all()
+    all_polls = Poll.query.order_by(Poll.id).all()
     form = CreatePollForm()
     delete_poll_form = DeletePollForm()
-    # Get all question IDs the current user has voted on
-    voted_questions = set()
-    if current_user.is_authenticated:
-        voter_records = PollVoter.query.filter_by(user_id=current_user.id).all()
-        voted_questions = {voter.question_id for voter in voter_records}
 
     return render_template("admin/polls.html",
                           page_title="Polls",
                           polls=all_polls,
-                          voted_questions=voted_questions,
+                          results=render_poll_results(all_polls),
                           form=form,
                           delete_poll_form=delete_poll_form,
                           datetime_now=datetime.now())
 
+@polls_bp.route("/polls/<int:poll_id>/live/")
+@login_required
+@admin_required
+def poll_live(poll_id):
+    """ Show live results of a poll for projecting during a meeting. """
+    poll = Poll.query.get_or_404(poll_id)
+    return render_template("admin/poll_live.html",
+                          page_title=poll.title,
+                          poll=poll)
+
+@polls_bp.route("/polls/<int:poll_id>/stream/")
+@login_required
+@admin_required
+def poll_stream(poll_id):
+    """ Stream a poll's results as server-sent events whenever they change. """
+    # The last results version the browser received before reconnecting.
+    last_version = request.headers.get("Last-Event-ID") or None
+    response = Response(stream_with_context(stream_results(poll_id, last_version)),
+                        mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Tell nginx not to buffer the stream.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@polls_bp.route("/polls/<int:poll_id>/votes-over-time/")
+@login_required
+@admin_required
+def poll_vote_series(poll_id):
+    """ Get each option's cumulative votes over time as JSON, bucketed by the resolution in seconds. """
+    Poll.query.get_or_404(poll_id)
+    resolution = request.args.get("resolution", 60, type=int)
+    if not 1 <= resolution <= MAX_SERIES_RESOLUTION:
+        return jsonify({
+            "success": False,
+            "message": f"Resolution must be between 1 and {MAX_SERIES_RESOLUTION} seconds."
+        }), 400
+    return jsonify({
+        "success": True,
+        "poll_id": poll_id,
+        "resolution": resolution,
+        "options": vote_series(poll_id, resolution),
+    }), 200
+
+@polls_bp.route("/polls/questions/<int:question_id>/responses/")
+@login_required
+@admin_required
+def question_responses(question_id):
+    """ Get a page of a free response question's answers as JSON, optionally filtered by text. """
+    PollQuestion.query.get_or_404(question_id)
+    try:
+        rows, cursor = free_responses_page(question_id,
+                                           after=request.args.get("after"),
+                                           search=request.args.get("q", "").strip())
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid page cursor."}), 400
+    return jsonify({
+        "success": True,
+        "responses": [{
+            "id": row.id,
+            "response_text": row.response_text,
+            "created_at": row.created_at.strftime("%Y-%m-%d %H:%M"),
+        } for row in rows],
+        "next": cursor,
+    }), 200
+
 @polls_bp.route("/create-poll/", methods=["POST"])
 @login_required
 @admin_required
@@ -92,41 +167,85 @@ def create_poll():
         if form.poll_expires.data and form.poll_expires.data <= datetime.now():
             flash("Poll expiration datetime must be in the future.", "danger")
             return redirect(url_for("polls.polls_list"))
-        poll = Poll(title=form.title.data, poll_expires=form.poll_expires.data)
-        db.session.add(poll)
-        db.session.flush()
-
-        for question_form in form.questions.entries:
-            is_frq = question_form.form.is_free_response.data
-            allow_multiple = question_form.form.allow_multiple_responses.data
-            private_votes = question_form.form.private_vote.data
-            immutable_questions = question_form.form.immutable_question.data
-
-
-            question = PollQuestion(
-                poll_id=poll.id,
-                question_text=question_form.form.question_text.data,
-                is_free_response=is_frq,
-                allow_multiple_responses=allow_multiple if not is_frq else False,  # Only for MCQs
-                private_vote = private_votes,
-                immutable_question = immutable_questions
-            )
-            db.session.add(question)
-            db.session.flush()
-
-            # Only add options if it's NOT a free response question
-            if not is_frq:
-                for option_form in question_form.form.options.entries:
-                    option = PollOption(
-                        question_id=question.id,
-                        option_text=option_form.form.option_text.data
-                    )
-                    db.session.add(option)
-
+        insert_poll(form.title.data, form.poll_expires.data, [{
+            "question_text": question_form.form.question_text.data,
+            "is_free_response": question_form.form.is_free_response.data,
+            "allow_multiple_responses": question_form.form.allow_multiple_responses.data,
+            "private_vote": question_form.form.private_vote.data,
+            "immutable_question": question_form.form.immutable_question.data,
+            "options": [option_form.form.option_text.data
+                        for option_form in question_form.form.options.entries],
+        } for question_form in form.questions.entries])
         db.session.commit()
+        invalidate_active_polls()
         flash("Poll created successfully!", "success")
         return redirect(url_for("polls.polls_list"))
 
+def parse_poll_definition(definition):
+    """ Validate a JSON poll definition and get the title, expiry and questions for insert_poll.
+
+    Raises ValueError with a message for the admin when the definition is invalid.
+    """
+    if not isinstance(definition, dict):
+        raise ValueError("The poll definition must be a JSON object.")
+    title = definition.get("title")
+    if not isinstance(title, str) or not 1 <= len(title.strip()) <= 128:
+        raise ValueError("The poll title must be between 1 and 128 characters.")
+    expires = definition.get("poll_expires")
+    if expires is not None:
+        try:
+            expires = datetime.fromisoformat(expires)
+        except (TypeError, ValueError):
+            raise ValueError("The poll expiration must be an ISO 8601 datetime.") from None
+        if expires.tzinfo is not None:
+            # Expiries are stored as naive local times.
+            expires = expires.astimezone().replace(tzinfo=None)
+        if expires <= datetime.now():
+            raise ValueError("Poll expiration datetime must be in the future.")
+    questions = definition.get("questions")
+    if not isinstance(questions, list) or not questions:
+        raise ValueError("The poll must have at least one question.")
+
+    parsed = []
+    for number, question in enumerate(questions, start=1):
+        if not isinstance(question, dict):
+            raise ValueError(f"Question {number} must be a JSON object.")
+        text = question.get("question_text")
+        if not isinstance(text, str) or not 1 <= len(text.strip()) <= 500:
+            raise ValueError(f"Question {number} text must be between 1 and 500 characters.")
+        options = question.get("options", [])
+        if not isinstance(options, list) or not all(
+            isinstance(option, str) and 1 <= len(option.strip()) <= 250 for option in options
+        ):
+            raise ValueError(f"Question {number} options must be texts of 1 to 250 characters.")
+        parsed.append({
+            "question_text": text,
+            "is_free_response": bool(question.get("is_free_response", False)),
+            "allow_multiple_responses": bool(question.get("allow_multiple_responses", False)),
+            "private_vote": bool(question.get("private_vote", False)),
+            "immutable_question": bool(question.get("immutable_question", False)),
+            "options": options,
+        })
+    return title, expires, parsed
+
+@polls_bp.route("/import-poll/", methods=["POST"])
+@login_required
+@admin_required
+def import_poll():
+    """ Create a poll from a JSON poll definition. """
+    try:
+        title, expires, questions = parse_poll_definition(request.get_json(silent=True))
+    except ValueError as error:
+        return jsonify({"success": False, "message": str(error)}), 400
+    poll = insert_poll(title, expires, questions)
+    db.session.commit()
+    invalidate_active_polls()
+    return jsonify({
+        "success": True,
+        "poll_id": poll.id,
+        "message": "Poll created successfully!"
+    }), 201
+
 @polls_bp.route("/delete-poll/<int:poll_id>/", methods=["POST"])
 @login_required
 @admin_required
@@ -135,6 +254,7 @@ def delete_poll(poll_id):
     poll = Poll.query.get_or_404(poll_id)
     db.session.delete(poll)
     db.session.commit()
+    invalidate_active_polls()
     flash("Poll deleted successfully!", "success")
 
     return redirect(url_for("polls.polls_list"))
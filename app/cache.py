@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# app/cache.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Per-worker, short-lived caching and the template bytecode cache for the project.
+"""
+
+# Standard library imports.
+import threading
+import time
+
+# Third-party imports.
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache
+
+
+class TTLCache:
+    """ In-process key/value cache with a per-entry time-to-live.
+
+    Each Flask app (and therefore each gunicorn worker) holds its own store,
+    so cached values are never shared between workers. Keep TTLs short for
+    anything another worker could change.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """ Attach an empty cache store to the Flask app. """
+        app.extensions["ttl_cache"] = {}
+
+    @staticmethod
+    def _store():
+        """ Get the cache store for the active Flask app. """
+        return current_app.extensions["ttl_cache"]
+
+    def get(self, namespace, key, default=None):
+        """ Get a cached value, or the default if it is missing or expired. """
+        with self._lock:
+            entry = self._store().get((namespace, key))
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._store()[(namespace, key)]
+                return default
+            return value
+
+    def set(self, namespace, key, value, ttl=None):
+        """ Cache a value for ttl seconds (forever if ttl is None). """
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._store()[(namespace, key)] = (value, expires_at)
+
+    def delete(self, namespace, key):
+        """ Remove a single cached value if present. """
+        with self._lock:
+            self._store().pop((namespace, key), None)
+
+    def clear(self, namespace=None):
+        """ Remove every cached value, or only those in one namespace. """
+        with self._lock:
+            store = self._store()
+            if namespace is None:
+                store.clear()
+            else:
+                for cache_key in [k for k in store if k[0] == namespace]:
+                    del store[cache_key]
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """ Jinja bytecode cache shared by all workers through a directory.
+
+    Templates compiled ahead of time by `flask templates precompile` are
+    loaded from the directory instead of being compiled again. If the
+    directory cannot be written at runtime, newly compiled templates are
+    simply not stored rather than failing the request.
+    """
+
+    def dump_bytecode(self, bucket):
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            current_app.logger.warning("Could not store template bytecode: %s", e)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# app/cleanup.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Background removal and reconciliation of unreferenced attachment files.
+"""
+
+# Standard library imports.
+import os
+import time
+
+# Third-party imports.
+from flask import current_app
+
+# Local application imports.
+from app.extensions import db
+from app.jobs import enqueue, job_handler
+from app.models import Attachments
+from app.previews import thumbnail_folder, thumbnail_name
+
+
+def queue_release(filepath):
+    """ Queue removal of a stored file (and its preview) with the caller's transaction.
+
+    The file is only deleted by the jobs worker if no attachment references it
+    by then and it has not been uploaded again since it was queued.
+    """
+    enqueue("attachment_release", filepath = filepath, queued_at = time.time())
+
+
+def _remove(path):
+    """ Delete a file if it exists, returning the bytes freed. """
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    return size
+
+
+@job_handler("attachment_release")
+def release_file(filepath, queued_at):
+    """ Delete a stored attachment file and its preview once nothing references it. """
+    if db.session.query(Attachments.id).filter_by(filepath = filepath).first() is not None:
+        return
+    try:
+        if os.path.getmtime(filepath) > queued_at:
+            # Uploaded again after removal was queued; an attachment row may follow.
+            return
+    except FileNotFoundError:
+        pass
+    _remove(filepath)
+    _remove(os.path.join(thumbnail_folder(), thumbnail_name(os.path.basename(filepath))))
+
+
+def _scan(folder, referenced, min_age):
+    """ List one directory, returning (names, orphans).
+
+    names is every entry name in the folder; orphans is a list of (path, size)
+    for files whose names are not in referenced. Hidden temporary files and
+    files modified in the last min_age seconds (uploads whose rows are not
+    committed yet) are never orphans.
+    """
+    cutoff = time.time() - min_age
+    names = set()
+    orphans = []
+    try:
+        entries = os.scandir(folder)
+    except FileNotFoundError:
+        return names, orphans
+    with entries:
+        for entry in entries:
+            names.add(entry.name)
+            if entry.name in referenced or entry.name.startswith("."):
+                continue
+            if not entry.is_file(follow_symlinks = False):
+                continue
+            stat = entry.stat(follow_symlinks = False)
+            if stat.st_mtime <= cutoff:
+                orphans.append((entry.path, stat.st_size))
+    return names, orphans
+
+
+def find_orphans(min_age=3600):
+    """ Reconcile the upload folder against the attachments table.
+
+    Returns (orphans, missing): orphans is a list of (path, size) for files in
+    the upload folder (or its thumbnails folder) that no attachment references,
+    and missing is a list of attachment ids whose file is not in the folder.
+    """
+    folder = os.path.abspath(current_app.config["UPLOAD_FOLDER"])
+    files = {}
+    previews = set()
+    for attachment_id, filepath, thumbnail in db.session.query(
+        Attachments.id, Attachments.filepath, Attachments.thumbnail
+    ):
+        path = os.path.abspath(filepath)
+        if os.path.dirname(path) == folder:
+            files.setdefault(os.path.basename(path), []).append(attachment_id)
+        if thumbnail:
+            previews.add(thumbnail)
+
+    names, orphans = _scan(folder, files.keys(), min_age)
+    orphans += _scan(thumbnail_folder(), previews, min_age)[1]
+    missing = sorted(attachment_id for name in files.keys() - names
+                     for attachment_id in files[name])
+    return orphans, missing
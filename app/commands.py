@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# app/commands.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Flask CLI commands for the project.
+"""
+
+# Standard library imports.
+from collections import defaultdict
+import os
+import subprocess
+import sys
+
+# Third-party imports.
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+# Local application imports.
+from app.cleanup import find_orphans
+from app.extensions import db
+from app.jobs import jobs_cli
+from app.models import Attachments
+from app.polling import close_expired_polls
+from app.storage import is_blob_path, store_file
+from app.votes import compact_vote_events
+
+attachments_cli = AppGroup("attachments", help="Manage stored meeting attachments.")
+templates_cli = AppGroup("templates", help="Manage compiled Jinja templates.")
+polls_cli = AppGroup("polls", help="Maintain poll results.")
+
+
+@attachments_cli.command("migrate")
+def migrate_attachments():
+    """ Move attachment files into the content-addressed store and report space saved. """
+    folder = current_app.config["UPLOAD_FOLDER"]
+    migrated = duplicates = missing = bytes_saved = 0
+    for attachment in Attachments.query.order_by(Attachments.id).all():
+        if is_blob_path(attachment.filepath) and attachment.content_hash:
+            continue
+        if not os.path.exists(attachment.filepath):
+            missing += 1
+            click.echo(f"Missing file for attachment {attachment.id}: {attachment.filepath}")
+            continue
+        size = os.path.getsize(attachment.filepath)
+        digest, filepath, duplicate = store_file(attachment.filepath, folder)
+        attachment.content_hash = digest
+        attachment.filepath = filepath
+        # Commit per file to keep rows in step with files moved so far.
+        db.session.commit()
+        migrated += 1
+        if duplicate:
+            duplicates += 1
+            bytes_saved += size
+    click.echo(
+        f"Migrated {migrated} attachment(s), removed {duplicates} duplicate file(s), "
+        f"saved {bytes_saved} bytes. {missing} file(s) missing."
+    )
+
+
+@attachments_cli.command("scan-orphans")
+@click.option("--delete", is_flag = True,
+              help = "Delete the orphaned files instead of only listing them.")
+@click.option("--min-age", default = 3600, show_default = True,
+              help = "Ignore files modified in the last this many seconds.")
+def scan_orphans(delete, min_age):
+    """ Find upload files no attachment references, and attachments missing their file. """
+    orphans, missing = find_orphans(min_age)
+    deleted = []
+    for path, size in orphans:
+        click.echo(f"Orphaned file ({size} bytes): {path}")
+        if delete:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already removed meanwhile, e.g. by a queued release.
+                continue
+            deleted.append((path, size))
+    reported = deleted if delete else orphans
+    for attachment_id in missing:
+        click.echo(f"Missing file for attachment {attachment_id}.")
+    action = "Deleted" if delete else "Found"
+    click.echo(
+        f"{action} {len(reported)} orphaned file(s) totalling "
+        f"{sum(size for _, size in reported)} bytes. "
+        f"{len(missing)} attachment(s) missing their file."
+    )
+
+
+@polls_cli.command("compact-votes")
+def compact_votes():
+    """ Fold pending vote events into the poll option totals now. """
+    click.echo(f"Folded {compact_vote_events()} vote event(s).")
+
+
+@polls_cli.command("close-expired")
+def close_expired():
+    """ Freeze the results of every expired poll that is not closed yet. """
+    click.echo(f"Closed {close_expired_polls()} poll(s).")
+
+
+@templates_cli.command("precompile")
+def precompile_templates():
+    """ Compile every template into the TEMPLATE_CACHE_DIR bytecode cache. """
+    if current_app.jinja_env.bytecode_cache is None:
+        raise click.ClickException("Set TEMPLATE_CACHE_DIR to enable the template bytecode cache.")
+    names = current_app.jinja_env.list_templates(extensions = ["html"])
+    for name in names:
+        # Loading a template compiles it and stores the bytecode in the cache.
+        current_app.jinja_env.get_template(name)
+    folder = current_app.config["TEMPLATE_CACHE_DIR"]
+    click.echo(f"Compiled {len(names)} template(s) into {folder}.")
+
+
+# Run in a fresh interpreter so nothing is already imported; prints milliseconds.
+STARTUP_SCRIPT = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from app import create_app\n"
+    "imported = time.perf_counter()\n"
+    "create_app()\n"
+    "done = time.perf_counter()\n"
+    "print((imported - start) * 1000, (done - imported) * 1000)\n"
+)
+
+
+def parse_importtime(output):
+    """ Sum `python -X importtime` self times (microseconds) per top-level package. """
+    totals = defaultdict(int)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_time)
+    return totals
+
+
+@click.command("startup-profile")
+@click.option("--top", default = 15, show_default = True, help = "Number of packages to list.")
+@click.option("--budget-ms", type = float, default = None,
+              help = "Exit with an error if startup takes longer than this.")
+def startup_profile(top, budget_ms):
+    """ Measure how long a fresh web worker takes to import and create the app. """
+    env = dict(os.environ)
+    # Measure what a gunicorn worker loads, not the CLI-only extras.
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd = os.path.dirname(current_app.root_path),
+        env = env,
+        capture_output = True,
+        text = True,
+        check = False,
+    )
+    if result.returncode != 0:
+        raise click.ClickException(f"Application startup failed:\n{result.stderr[-2000:]}")
+    import_ms, create_ms = (float(value) for value in result.stdout.split()[-2:])
+
+    click.echo(f"Import app package: {import_ms:8.1f} ms")
+    click.echo(f"Run create_app():   {create_ms:8.1f} ms")
+    click.echo(f"Total startup:      {import_ms + create_ms:8.1f} ms")
+    click.echo("Slowest packages by import time (self time summed per top-level package):")
+    totals = parse_importtime(result.stderr)
+    for name, microseconds in sorted(totals.items(), key = lambda item: -item[1])[:top]:
+        click.echo(f"  {name:<30} {microseconds / 1000:8.1f} ms")
+
+    if budget_ms is not None and import_ms + create_ms > budget_ms:
+        raise click.ClickException(
+            f"Startup took {import_ms + create_ms:.1f} ms, over the {budget_ms:.1f} ms budget."
+        )
+
+
+def register_commands(app):
+    """ Register the project's CLI command groups. """
+    app.cli.add_command(attachments_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(polls_cli)
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(startup_profile)
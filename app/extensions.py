@@ -4,16 +4,18 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 10/7/2025
+Last Modified: 10/19/2026
 
 File Purpose: Load extensions for the project.
 """
 
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
+
+from .cache import TTLCache
+from .replica import RoutingSession
 
 # Initialize the app extensions.
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
-migrate = Migrate()
+cache = TTLCache()
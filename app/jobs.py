@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# app/jobs.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Database-backed background job queue for the project.
+"""
+
+# Standard library imports.
+from datetime import datetime, timedelta
+import json
+import math
+import threading
+
+# Third-party imports.
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+# Local application imports.
+from app.extensions import db
+from app.models import Jobs
+
+jobs_cli = AppGroup("jobs", help="Run and inspect background jobs.")
+
+# Registered job handlers, keyed by job name.
+HANDLERS = {}
+# How often each worker thread prunes finished jobs while the queue is idle.
+PRUNE_INTERVAL = timedelta(hours = 1)
+
+
+def job_handler(name):
+    """ Decorator registering a function as the handler for a named job. """
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, run_after=None, **payload):
+    """ Add a job to the current database session.
+
+    The job is only visible to workers once the caller commits, so it is
+    recorded atomically with the request's other changes. Pass run_after
+    to delay the job until a later time.
+    """
+    job = Jobs(name = name, payload = json.dumps(payload), status = "queued",
+               run_after = run_after or datetime.now())
+    db.session.add(job)
+    return job
+
+
+def claimable_jobs(now):
+    """ Get a filter for jobs that are due, including those abandoned by a crashed worker. """
+    lease_expired = now - timedelta(seconds = current_app.config["JOB_LEASE_SECONDS"])
+    return db.or_(
+        db.and_(Jobs.status == "queued", Jobs.run_after <= now),
+        db.and_(Jobs.status == "running", Jobs.started_at < lease_expired,
+                Jobs.attempts < current_app.config["JOB_MAX_ATTEMPTS"]),
+    )
+
+
+def fail_abandoned_jobs(now):
+    """ Mark jobs whose worker crashed during their final attempt as failed, returning how many.
+
+    They cannot be reclaimed (see claimable_jobs), so without this they would
+    stay running forever.
+    """
+    lease_expired = now - timedelta(seconds = current_app.config["JOB_LEASE_SECONDS"])
+    failed = Jobs.query.filter(
+        Jobs.status == "running",
+        Jobs.started_at < lease_expired,
+        Jobs.attempts >= current_app.config["JOB_MAX_ATTEMPTS"]
+    ).update({"status": "failed", "finished_at": now,
+              "last_error": "The worker stopped during the final attempt."},
+             synchronize_session = False)
+    if failed:
+        current_app.logger.error("Marked %s abandoned job(s) as failed.", failed)
+    db.session.commit()
+    return failed
+
+
+def _start(job, now):
+    """ Get the column values marking a job as claimed by this worker. """
+    return {"status": "running", "started_at": now, "finished_at": None,
+            "attempts": job.attempts + 1}
+
+
+def claim_next_job():
+    """ Mark the next due job as running and return it, or None if nothing is due.
+
+    On PostgreSQL the candidate row is locked with FOR UPDATE SKIP LOCKED, so
+    concurrent workers each take a different job without waiting on each
+    other. Other databases (SQLite) fall back to a conditional UPDATE that
+    only succeeds if the job is unchanged since it was read.
+    """
+    now = datetime.now()
+    fail_abandoned_jobs(now)
+    query = Jobs.query.filter(claimable_jobs(now)).order_by(Jobs.run_after, Jobs.id)
+
+    if db.engine.dialect.name == "postgresql":
+        job = query.with_for_update(skip_locked = True).first()
+        if job is None:
+            db.session.rollback()
+            return None
+        for key, value in _start(job, now).items():
+            setattr(job, key, value)
+        db.session.commit()
+        return job
+
+    while True:
+        job = query.first()
+        if job is None:
+            return None
+        # Only one worker can move a job out of the state it was read in.
+        claimed = Jobs.query.filter_by(id = job.id, status = job.status, attempts = job.attempts)\
+            .update(_start(job, now))
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+
+
+def retry_delay(attempts):
+    """ Get the exponential backoff before retrying a job that has failed attempts times. """
+    return timedelta(seconds = current_app.config["JOB_RETRY_DELAY"] * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """ Run a claimed job and record whether it succeeded.
+
+    Failed jobs are queued again with exponential backoff until they reach
+    JOB_MAX_ATTEMPTS, after which they are left in the failed state.
+    """
+    handler = HANDLERS.get(job.name)
+    due = job.run_after
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job.name}'.")
+        handler(**json.loads(job.payload))
+        job.status = "done"
+        job.last_error = None
+    except Exception as e: # pylint: disable=broad-exception-caught
+        db.session.rollback()
+        job.last_error = str(e)
+        if job.attempts < current_app.config["JOB_MAX_ATTEMPTS"]:
+            job.status = "queued"
+            job.run_after = datetime.now() + retry_delay(job.attempts)
+            current_app.logger.warning("Job %s (%s) failed, retrying at %s: %s",
+                                       job.id, job.name, job.run_after, e)
+        else:
+            job.status = "failed"
+            current_app.logger.error("Job %s (%s) failed after %s attempts: %s",
+                                     job.id, job.name, job.attempts, e)
+    job.finished_at = datetime.now()
+    current_app.logger.info("Job %s (%s) %s in %.3fs after waiting %.3fs.",
+                            job.id, job.name, job.status,
+                            (job.finished_at - job.started_at).total_seconds(),
+                            max((job.started_at - due).total_seconds(), 0))
+    db.session.commit()
+    return job.status == "done"
+
+
+def run_pending(max_jobs=None):
+    """ Run due jobs until none are left (or max_jobs ran), returning the count. """
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def prune_jobs(now, hours=None):
+    """ Delete done and failed jobs finished over hours (default JOB_RETENTION_HOURS) ago.
+
+    Returns how many were deleted.
+    """
+    if hours is None:
+        hours = current_app.config["JOB_RETENTION_HOURS"]
+    cutoff = now - timedelta(hours = hours)
+    deleted = Jobs.query.filter(Jobs.status.in_(("done", "failed")), Jobs.finished_at < cutoff)\
+        .delete(synchronize_session = False)
+    db.session.commit()
+    return deleted
+
+
+def percentile(values, fraction):
+    """ Get the nearest-rank percentile of a list of numbers, or None if it is empty. """
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def job_stats(since):
+    """ Summarize queue depth and latency per job name for jobs finished since a time.
+
+    Wait time is from when a job's final attempt became due to when a worker
+    started it; run time is from start to finish. Both are in seconds.
+    """
+    by_name = {}
+    counts = db.session.query(Jobs.name, Jobs.status, db.func.count(Jobs.id))\
+        .group_by(Jobs.name, Jobs.status).all()
+    for name, status, count in counts:
+        by_name.setdefault(name, {"waits": [], "runs": []})[status] = count
+
+    finished = Jobs.query.filter(Jobs.finished_at >= since, Jobs.status.in_(("done", "failed")))
+    for job in finished:
+        entry = by_name.setdefault(job.name, {"waits": [], "runs": []})
+        entry["runs"].append((job.finished_at - job.started_at).total_seconds())
+        # run_after is when the final attempt became due.
+        entry["waits"].append(max((job.started_at - job.run_after).total_seconds(), 0))
+
+    summary = {}
+    for name, entry in sorted(by_name.items()):
+        summary[name] = {
+            "queued": entry.get("queued", 0),
+            "running": entry.get("running", 0),
+            "done": entry.get("done", 0),
+            "failed": entry.get("failed", 0),
+            "finished": len(entry["runs"]),
+            "wait_avg": sum(entry["waits"]) / len(entry["waits"]) if entry["waits"] else None,
+            "wait_p95": percentile(entry["waits"], 0.95),
+            "run_avg": sum(entry["runs"]) / len(entry["runs"]) if entry["runs"] else None,
+            "run_p95": percentile(entry["runs"], 0.95),
+        }
+    return summary
+
+
+def _worker_loop(app, once, poll_interval, stop):
+    """ Claim and run jobs in a worker thread until stopped (or the queue is empty with once).
+
+    While the queue is idle, finished jobs are pruned every PRUNE_INTERVAL.
+    """
+    next_prune = datetime.now()
+    with app.app_context():
+        while not stop.is_set():
+            ran = run_pending(max_jobs = 1)
+            if ran == 0:
+                if once:
+                    return
+                if datetime.now() >= next_prune:
+                    prune_jobs(datetime.now())
+                    next_prune = datetime.now() + PRUNE_INTERVAL
+                stop.wait(poll_interval)
+            db.session.remove()
+
+
+@jobs_cli.command("worker")
+@click.option("--concurrency", type = int, default = None,
+              help = "Number of worker threads (default JOB_WORKER_CONCURRENCY).")
+@click.option("--once", is_flag = True, help = "Run the due jobs, then exit.")
+@click.option("--poll-interval", default = 2.0, show_default = True,
+              help = "Seconds to wait between checks of an empty queue.")
+def worker(concurrency, once, poll_interval):
+    """ Process background jobs from the jobs table. """
+    app = current_app._get_current_object() # pylint: disable=protected-access
+    concurrency = concurrency or app.config["JOB_WORKER_CONCURRENCY"]
+    if once and concurrency == 1:
+        click.echo(f"Ran {run_pending()} job(s).")
+        return
+
+    click.echo(f"Jobs worker started with {concurrency} thread(s).")
+    stop = threading.Event()
+    threads = [threading.Thread(target = _worker_loop, args = (app, once, poll_interval, stop),
+                                daemon = True)
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        click.echo("Stopping after the running jobs finish.")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+@jobs_cli.command("stats")
+@click.option("--hours", default = 24.0, show_default = True,
+              help = "Only include latency for jobs finished in this many hours.")
+def stats(hours):
+    """ Show queue depth and job latency per job name. """
+    summary = job_stats(datetime.now() - timedelta(hours = hours))
+    if not summary:
+        click.echo("No jobs recorded.")
+        return
+
+    def seconds(value):
+        return "-" if value is None else f"{value:.3f}s"
+
+    click.echo(f"{'job':<24} {'queued':>6} {'running':>7} {'done':>6} {'failed':>6} "
+               f"{'wait avg':>9} {'wait p95':>9} {'run avg':>9} {'run p95':>9}")
+    for name, entry in summary.items():
+        click.echo(f"{name:<24} {entry['queued']:>6} {entry['running']:>7} {entry['done']:>6} "
+                   f"{entry['failed']:>6} {seconds(entry['wait_avg']):>9} "
+                   f"{seconds(entry['wait_p95']):>9} {seconds(entry['run_avg']):>9} "
+                   f"{seconds(entry['run_p95']):>9}")
+
+
+@jobs_cli.command("prune")
+@click.option("--hours", type = float, default = None,
+              help = "Keep finished jobs from this many hours (default JOB_RETENTION_HOURS).")
+def prune(hours):
+    """ Delete done and failed jobs older than the retention period. """
+    click.echo(f"Pruned {prune_jobs(datetime.now(), hours)} finished job(s).")
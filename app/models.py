@@ -4,12 +4,15 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz), Thomas Crossman (github.com/crossmant1)
-Last Modified: 2/14/2026
+Last Modified: 10/19/2026
 
 File Purpose: Create the database models for the project.
 """
 # Standard library imports.
+from datetime import datetime
+import os
 import secrets
+from urllib.parse import quote
 
 # Third-party imports.
 from flask import current_app
@@ -19,7 +22,7 @@ import pyotp
 from werkzeug.security import generate_password_hash, check_password_hash
 
 # Local application imports.
-from .extensions import db # pylint: disable=relative-beyond-top-level
+from .extensions import db, cache # pylint: disable=relative-beyond-top-level
 
 # Define the app database.
 class Users(UserMixin, db.Model):
@@ -71,6 +74,43 @@ class Users(UserMixin, db.Model):
                 "graduated": self.graduated,
                 "totp_active": self.totp_active}
 
+class UserPrincipal(UserMixin):
+    """ Lightweight, cacheable stand-in for a Users row used by Flask-Login.
+
+    Only holds the columns needed to authorize and render a request, so it can
+    be kept between requests without holding a database session. Routes that
+    modify the account must load the Users row instead.
+    """
+    CACHE_NAMESPACE = "users"
+    FIELDS = ("id", "username", "role", "activated", "mfa_active", "totp_active",
+              "joined", "graduated")
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_user(cls, user):
+        """ Build a principal from a Users row. """
+        return cls(**{field: getattr(user, field) for field in cls.FIELDS})
+
+    @classmethod
+    def load(cls, user_id, ttl):
+        """ Get a user's principal from the cache, querying the users table on a miss. """
+        principal = cache.get(cls.CACHE_NAMESPACE, str(user_id))
+        if principal is None:
+            user = db.session.get(Users, int(user_id))
+            if user is None:
+                return None
+            principal = cls.from_user(user)
+            cache.set(cls.CACHE_NAMESPACE, str(user_id), principal, ttl)
+        return principal
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """ Drop a user's cached principal after their account changes. """
+        cache.delete(cls.CACHE_NAMESPACE, str(user_id))
+
 class RecoveryCodes(db.Model):
     """ Store recovery codes for users. """
     id = db.Column(db.Integer, primary_key = True, nullable = False)
@@ -105,6 +145,15 @@ class Meetings(db.Model):
     code_hash = db.Column(db.String(250), nullable = True)
     admin_only = db.Column(db.Boolean, nullable = True, default = False, server_default = '0')
 
+    # Child rows are removed by the database (ON DELETE CASCADE) when a meeting
+    # is deleted, so unloaded children are never fetched just to delete them.
+    attendees = db.relationship("Attendees", order_by = "Attendees.id",
+                                cascade = "all, delete-orphan", passive_deletes = True)
+    minutes = db.relationship("Minutes", order_by = "Minutes.id",
+                              cascade = "all, delete-orphan", passive_deletes = True)
+    attachments = db.relationship("Attachments", order_by = "Attachments.id",
+                                  cascade = "all, delete-orphan", passive_deletes = True)
+
     def to_dict(self):
         """ Get meeting data values as a dictionary. """
         return {"id": self.id,
@@ -120,13 +169,17 @@ class Meetings(db.Model):
 class Attendees(db.Model):
     """ Store a list of meeting attendees. """
     id = db.Column(db.Integer, primary_key = True, nullable = False)
-    username = db.Column(db.String(250), nullable = False)
-    meeting = db.Column(db.Integer, nullable = False)
+    username = db.Column(db.String(250), nullable = False) # Denormalized for display
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete = "SET NULL"),
+                        nullable = True, index = True)
+    meeting = db.Column(db.Integer, db.ForeignKey("meetings.id", ondelete = "CASCADE"),
+                        nullable = False, index = True)
 
     def to_dict(self):
         """ Get attendee data values as a dictionary. """
         return {"id": self.id,
                 "username": self.username,
+                "user_id": self.user_id,
                 "meeting": self.meeting}
 
 class Minutes(db.Model):
@@ -134,7 +187,8 @@ class Minutes(db.Model):
     id = db.Column(db.Integer, primary_key = True, nullable = False)
     notes = db.Column(db.Text, nullable = False)
     username_by = db.Column(db.String(250), nullable = False)
-    meeting = db.Column(db.Integer, nullable = False)
+    meeting = db.Column(db.Integer, db.ForeignKey("meetings.id", ondelete = "CASCADE"),
+                        nullable = False, index = True)
 
     def to_dict(self):
         """ Get meeting minute data values as a dictionary. """
@@ -148,21 +202,69 @@ class Attachments(db.Model):
     id = db.Column(db.Integer, primary_key = True, nullable = False)
     filename = db.Column(db.String(250), nullable = False)
     filepath = db.Column(db.String(250), nullable = False)
-    meeting = db.Column(db.Integer, nullable = False)
+    meeting = db.Column(db.Integer, db.ForeignKey("meetings.id", ondelete = "CASCADE"),
+                        nullable = False, index = True)
+    content_hash = db.Column(db.String(64), nullable = True) # SHA-256 hex digest
+    thumbnail = db.Column(db.String(250), nullable = True) # Preview image filename
+
+    @property
+    def url(self):
+        """ Get the download URL, which names the stored file and the original filename. """
+        if self.filepath is None:
+            return None
+        return f"/uploads/{os.path.basename(self.filepath)}/{quote(self.filename or '')}"
+
+    @property
+    def thumbnail_url(self):
+        """ Get the preview image URL, if a preview has been generated. """
+        return f"/thumbnails/{self.thumbnail}" if self.thumbnail else None
 
     def to_dict(self):
         """ Get attachment data values as a dictionary. """
         return {"id": self.id,
                 "filename": self.filename,
                 "filepath": self.filepath,
-                "meeting": self.meeting}
+                "meeting": self.meeting,
+                "content_hash": self.content_hash,
+                "url": self.url,
+                "thumbnail_url": self.thumbnail_url}
+
+class Jobs(db.Model):
+    """ Store background jobs waiting for (or processed by) the jobs worker. """
+    id = db.Column(db.Integer, primary_key = True, nullable = False)
+    name = db.Column(db.String(100), nullable = False)
+    payload = db.Column(db.Text, nullable = False, default = "{}") # JSON keyword arguments
+    status = db.Column(db.String(16), nullable = False, default = "queued", index = True)
+    attempts = db.Column(db.Integer, nullable = False, default = 0)
+    last_error = db.Column(db.Text, nullable = True)
+    created_at = db.Column(db.DateTime, nullable = False, default = db.func.now())
+    run_after = db.Column(db.DateTime, nullable = False, default = datetime.now, index = True)
+    started_at = db.Column(db.DateTime, nullable = True)
+    finished_at = db.Column(db.DateTime, nullable = True)
+
+    def to_dict(self):
+        """ Get job data values as a dictionary. """
+        return {"id": self.id,
+                "name": self.name,
+                "payload": self.payload,
+                "status": self.status,
+                "attempts": self.attempts,
+                "last_error": self.last_error,
+                "created_at": self.created_at,
+                "run_after": self.run_after,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at}
 
 class Poll(db.Model):
     """Store polls"""
     __tablename__="polls"
     id=db.Column(db.Integer, primary_key=True)
     title=db.Column(db.String(250), nullable=False)
-    poll_expires=db.Column(db.DateTime, nullable=True)
+    poll_expires=db.Column(db.DateTime, nullable=True, index=True)
+    # Incremented whenever the poll's votes or responses change (see app.votes).
+    version=db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    # Set once an expired poll's final results are frozen into poll_results.
+    closed_at=db.Column(db.DateTime, nullable=True)
 
     questions=db.relationship("PollQuestion", backref="poll", cascade="all, delete-orphan")
 
@@ -199,10 +301,14 @@ class PollFreeResponse(db.Model):
                            db.ForeignKey("poll_questions.id", ondelete="CASCADE"),
                            nullable=False)
 
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    # Set in Python so SQLite stores it in the same format keyset cursors bind with.
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'question_id', name='unique_user_question_response'),
+        # Keyset pagination of a question's responses (see app.polling.free_responses_page).
+        db.Index("ix_poll_free_responses_question_id_created_at_id",
+                 "question_id", "created_at", "id"),
     )
 
 class PollOption(db.Model):
@@ -235,3 +341,79 @@ class PollVoter(db.Model):
                          nullable=False)
 
     poll_id = db.Column(db.Integer, db.ForeignKey("polls.id", ondelete="CASCADE"), nullable=True)
+
+    # When the user chose this option; votes cast before it was recorded have none.
+    voted_at = db.Column(db.DateTime, nullable=True, default=datetime.now)
+
+    __table_args__ = (
+        # Looks up a user's votes on the questions shown on the home page.
+        db.Index("ix_poll_voters_user_id_question_id", "user_id", "question_id"),
+        # Buckets an option's votes by time (see app.polling.vote_series).
+        db.Index("ix_poll_voters_option_id_voted_at", "option_id", "voted_at"),
+    )
+
+
+class PollVoteEvent(db.Model):
+    """Store vote count changes until they are folded into poll_options.votes.
+
+    Voting only inserts rows here, so concurrent voters never wait on the
+    same option row; app.votes.compact_vote_events applies them in batches.
+    """
+    __tablename__ = "poll_vote_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    poll_id = db.Column(db.Integer, db.ForeignKey("polls.id", ondelete="CASCADE"),
+                        nullable=False, index=True)
+    option_id = db.Column(db.Integer, db.ForeignKey("poll_options.id", ondelete="CASCADE"),
+                          nullable=False, index=True)
+    delta = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+
+# Compacted votes plus the changes not folded in yet.
+PollOption.current_votes = db.column_property(
+    PollOption.votes + db.select(db.func.coalesce(db.func.sum(PollVoteEvent.delta), 0))
+    .where(PollVoteEvent.option_id == PollOption.id)
+    .correlate_except(PollVoteEvent)
+    .scalar_subquery()
+)
+
+
+class PollSubmission(db.Model):
+    """Store the outcome of recent poll submissions by idempotency key."""
+    __tablename__ = "poll_submissions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    poll_id = db.Column(db.Integer, db.ForeignKey("polls.id", ondelete="CASCADE"), nullable=False)
+    idempotency_key = db.Column(db.String(64), nullable=False)
+    # JSON body (success, messages, and for JSON submissions the poll state) and HTTP status.
+    outcome = db.Column(db.Text, nullable=False)
+    status_code = db.Column(db.Integer, nullable=False, default=200)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "poll_id", "idempotency_key",
+                            name="unique_user_poll_submission"),
+    )
+
+
+class PollResult(db.Model):
+    """Store the final tallies of a closed poll.
+
+    Multiple choice questions get one row per option with its votes; free
+    response questions get one row (without an option) with the number of
+    responses.
+    """
+    __tablename__ = "poll_results"
+
+    id = db.Column(db.Integer, primary_key=True)
+    poll_id = db.Column(db.Integer, db.ForeignKey("polls.id", ondelete="CASCADE"),
+                        nullable=False, index=True)
+    question_id = db.Column(db.Integer,
+                            db.ForeignKey("poll_questions.id", ondelete="CASCADE"),
+                            nullable=False)
+    option_id = db.Column(db.Integer, db.ForeignKey("poll_options.id", ondelete="CASCADE"),
+                          nullable=True)
+    votes = db.Column(db.Integer, nullable=False, default=0)
+    responses = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# app/polling.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Poll creation, closing, and result rendering and streaming.
+"""
+
+# Standard library imports.
+from datetime import datetime, timedelta
+import json
+import time
+
+# Third-party imports.
+from flask import current_app, render_template
+from markupsafe import Markup
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+# Local application imports.
+from app.extensions import cache, db
+from app.jobs import enqueue, job_handler
+from app.models import (
+    Poll,
+    PollFreeResponse,
+    PollOption,
+    PollQuestion,
+    PollResult,
+    PollVoter
+)
+from app.votes import bump_poll_version, compact_vote_events, results_versions
+
+# Cache namespace of rendered poll result panels.
+RESULTS_NAMESPACE = "poll_results"
+# Cache namespace of closed polls' vote time series.
+SERIES_NAMESPACE = "poll_series"
+# Cache namespace of live result snapshots shared by a worker's stream viewers.
+LIVE_NAMESPACE = "poll_live"
+# Cache namespace of the ids of polls that are still open.
+ACTIVE_NAMESPACE = "active_polls"
+
+
+def _polls_signature():
+    """ Get the (count, highest id) of all polls, which changes when a poll is added or deleted. """
+    return tuple(db.session.query(db.func.count(Poll.id), db.func.max(Poll.id)).one())
+
+
+def active_poll_ids():
+    """ Get the ids of polls that have not expired.
+
+    The list is cached per worker until the soonest of those polls expires,
+    and at most ACTIVE_POLLS_CACHE_TTL seconds. Each call compares the polls
+    table's count and highest id with the cached copy's, so polls created or
+    deleted through another worker show up on the next request. Creating or
+    deleting a poll also clears this worker's copy (see invalidate_active_polls).
+    """
+    signature = _polls_signature()
+    cached = cache.get(ACTIVE_NAMESPACE, "ids")
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    now = datetime.now()
+    rows = db.session.query(Poll.id, Poll.poll_expires).filter(
+        Poll.poll_expires.is_(None) | (Poll.poll_expires > now)
+    ).order_by(Poll.id).all()
+    poll_ids = [poll_id for poll_id, _ in rows]
+
+    ttl = current_app.config["ACTIVE_POLLS_CACHE_TTL"]
+    expiries = [expires for _, expires in rows if expires is not None]
+    if expiries:
+        ttl = min(ttl, (min(expiries) - now).total_seconds())
+    if ttl > 0:
+        cache.set(ACTIVE_NAMESPACE, "ids", (signature, poll_ids), ttl)
+    return poll_ids
+
+
+def invalidate_active_polls():
+    """ Drop this worker's cached active polls after a poll is created or deleted. """
+    cache.delete(ACTIVE_NAMESPACE, "ids")
+
+
+def insert_poll(title, expires, questions):
+    """ Add a poll with its questions and options to the session, returning the poll.
+
+    Each question is a dictionary of PollQuestion's question_text,
+    is_free_response, allow_multiple_responses, private_vote and
+    immutable_question, plus a list of option texts under "options" (ignored
+    for free response questions). Questions are inserted with one multi-row
+    INSERT ... RETURNING and options with one batched INSERT, instead of a flush
+    per question. Polls with an expiry also queue their poll_close job. The
+    caller commits.
+    """
+    poll = Poll(title = title, poll_expires = expires)
+    db.session.add(poll)
+    db.session.flush()
+    if questions:
+        # The returned ids are matched to the questions in parameter order.
+        question_ids = db.session.scalars(
+            insert(PollQuestion).returning(PollQuestion.id, sort_by_parameter_order = True),
+            [{
+                "poll_id": poll.id,
+                "question_text": question["question_text"],
+                "is_free_response": question["is_free_response"],
+                # Only multiple choice questions take several responses.
+                "allow_multiple_responses": question["allow_multiple_responses"]
+                and not question["is_free_response"],
+                "private_vote": question["private_vote"],
+                "immutable_question": question["immutable_question"],
+            } for question in questions]
+        ).all()
+        options = [{"question_id": question_id, "option_text": option_text}
+                   for question_id, question in zip(question_ids, questions)
+                   if not question["is_free_response"]
+                   for option_text in question["options"]]
+        if options:
+            db.session.execute(insert(PollOption), options)
+    if expires:
+        # Freeze the results once the poll expires.
+        enqueue("poll_close", run_after = expires, poll_id = poll.id)
+    return poll
+
+
+@job_handler("poll_close")
+def close_poll(poll_id):
+    """ Freeze an expired poll's final tallies into poll_results, returning whether it closed.
+
+    Pending vote events are folded first where possible, but the frozen
+    tallies include any events left over (current_votes), read in the same
+    transaction that marks the poll closed. With POLL_ARCHIVE_PRIVATE_VOTERS
+    set, the per-voter rows of private-vote questions are removed as well,
+    since only their totals are ever shown.
+    """
+    now = datetime.now()
+    compact_vote_events(poll_id)
+    # Only one caller can move the poll from open to closed.
+    claimed = Poll.query.filter(Poll.id == poll_id, Poll.closed_at.is_(None),
+                                Poll.poll_expires <= now)\
+        .update({Poll.closed_at: now}, synchronize_session = False)
+    if not claimed:
+        db.session.rollback()
+        return False
+
+    questions = db.session.query(PollQuestion.id, PollQuestion.is_free_response,
+                                 PollQuestion.private_vote).filter_by(poll_id = poll_id).all()
+    tallies = question_tallies([poll_id])
+    db.session.add_all(
+        PollResult(poll_id = poll_id, question_id = question_id,
+                   responses = tallies.get(question_id, (0, 0, 0))[2])
+        for question_id, is_free_response, _ in questions if is_free_response
+    )
+    db.session.add_all(
+        PollResult(poll_id = poll_id, question_id = question_id, option_id = option_id,
+                   votes = votes)
+        for question_id, option_id, votes in db.session.query(
+            PollOption.question_id, PollOption.id, PollOption.current_votes
+        ).join(PollQuestion, PollQuestion.id == PollOption.question_id)
+        .filter(PollQuestion.poll_id == poll_id)
+    )
+    if current_app.config["POLL_ARCHIVE_PRIVATE_VOTERS"]:
+        private = [question_id for question_id, _, private_vote in questions if private_vote]
+        if private:
+            PollVoter.query.filter(PollVoter.question_id.in_(private))\
+                .delete(synchronize_session = False)
+    bump_poll_version(poll_id)
+    db.session.commit()
+    return True
+
+
+def close_expired_polls():
+    """ Close every expired poll whose results are not frozen yet, returning how many closed. """
+    expired = [poll_id for poll_id, in db.session.query(Poll.id).filter(
+        Poll.closed_at.is_(None), Poll.poll_expires <= datetime.now()
+    )]
+    return sum(close_poll(poll_id) for poll_id in expired)
+
+
+def frozen_tallies(poll_ids):
+    """ Get (question tallies, option votes) of closed polls from poll_results.
+
+    The tallies have the same shape as question_tallies; option votes map
+    option id to its final vote count.
+    """
+    tallies = {}
+    votes = {}
+    if not poll_ids:
+        return tallies, votes
+    for question_id, option_id, option_votes, responses in db.session.query(
+        PollResult.question_id, PollResult.option_id, PollResult.votes, PollResult.responses
+    ).filter(PollResult.poll_id.in_(poll_ids)):
+        total, most, count = tallies.get(question_id, (0, 0, 0))
+        if option_id is None:
+            tallies[question_id] = (total, most, count + responses)
+        else:
+            votes[option_id] = option_votes
+            tallies[question_id] = (total + option_votes, max(most, option_votes), count)
+    return tallies, votes
+
+
+def question_tallies(poll_ids):
+    """ Get vote totals for the questions of the given polls.
+
+    Returns a dictionary of question id to (total votes, most votes for one
+    option, free responses), computed with GROUP BY queries.
+    """
+    if not poll_ids:
+        return {}
+    tallies = {}
+    options = db.session.query(
+        PollOption.question_id,
+        PollOption.current_votes.label("votes")
+    ).join(PollQuestion, PollQuestion.id == PollOption.question_id)\
+        .filter(PollQuestion.poll_id.in_(poll_ids))\
+        .subquery()
+    option_totals = db.session.query(
+        options.c.question_id,
+        db.func.sum(options.c.votes),
+        db.func.max(options.c.votes)
+    ).group_by(options.c.question_id)
+    for question_id, total, most in option_totals:
+        tallies[question_id] = (total or 0, most or 0, 0)
+
+    response_counts = db.session.query(
+        PollFreeResponse.question_id,
+        db.func.count(PollFreeResponse.id)
+    ).join(PollQuestion, PollQuestion.id == PollFreeResponse.question_id)\
+        .filter(PollQuestion.poll_id.in_(poll_ids))\
+        .group_by(PollFreeResponse.question_id)
+    for question_id, count in response_counts:
+        total, most, _ = tallies.get(question_id, (0, 0, 0))
+        tallies[question_id] = (total, most, count)
+    return tallies
+
+
+def render_poll_results(polls):
+    """ Get the rendered results panel of each poll, keyed by poll id.
+
+    Panels are cached per worker together with the results version they were
+    rendered from (see results_versions), so only polls with new votes or
+    responses since are loaded and rendered again.
+    """
+    panels = {}
+    stale = []
+    versions = results_versions([poll.id for poll in polls])
+    for poll in polls:
+        cached = cache.get(RESULTS_NAMESPACE, poll.id)
+        if cached is not None and cached[0] == versions[poll.id]:
+            panels[poll.id] = cached[1]
+        else:
+            stale.append(poll.id)
+    if not stale:
+        return panels
+
+    # Closed polls read their frozen tallies instead of aggregating votes.
+    closed = {poll.id for poll in polls if poll.id in stale and poll.closed_at is not None}
+    tallies = question_tallies([poll_id for poll_id in stale if poll_id not in closed])
+    frozen, votes = frozen_tallies(list(closed))
+    tallies.update(frozen)
+    questions = PollQuestion.query.filter(PollQuestion.poll_id.in_(stale))\
+        .options(selectinload(PollQuestion.options))\
+        .order_by(PollQuestion.id)
+    by_poll = {}
+    for question in questions:
+        by_poll.setdefault(question.poll_id, []).append(question)
+        if question.poll_id not in closed:
+            votes.update((option.id, option.current_votes) for option in question.options)
+
+    for poll in polls:
+        if poll.id not in stale:
+            continue
+        html = Markup(render_template("admin/poll_results.html",
+                                      questions = by_poll.get(poll.id, []),
+                                      tallies = tallies,
+                                      votes = votes))
+        cache.set(RESULTS_NAMESPACE, poll.id, (versions[poll.id], html),
+                  current_app.config["POLL_RESULTS_CACHE_TTL"])
+        panels[poll.id] = html
+    return panels
+
+
+def free_responses_page(question_id, after=None, search=None):
+    """ Get one page of a question's free responses, oldest first, and the cursor of the next.
+
+    Pages are read with keyset pagination over (created_at, id): after is the
+    cursor returned with the previous page, so each page is an index range
+    scan however deep it is. search keeps the responses containing the text
+    (case insensitive), filtered by the database. The next cursor is None on
+    the last page. Raises ValueError for a malformed cursor.
+    """
+    page_size = current_app.config["POLL_RESPONSES_PAGE_SIZE"]
+    query = db.session.query(PollFreeResponse.id, PollFreeResponse.response_text,
+                             PollFreeResponse.created_at)\
+        .filter(PollFreeResponse.question_id == question_id)
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(PollFreeResponse.response_text.ilike(f"%{escaped}%", escape = "\\"))
+    if after:
+        created_at, _, response_id = after.rpartition("_")
+        created_at, response_id = datetime.fromisoformat(created_at), int(response_id)
+        query = query.filter(db.or_(
+            PollFreeResponse.created_at > created_at,
+            db.and_(PollFreeResponse.created_at == created_at, PollFreeResponse.id > response_id)
+        ))
+    rows = query.order_by(PollFreeResponse.created_at, PollFreeResponse.id)\
+        .limit(page_size + 1).all()
+    cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        cursor = f"{rows[-1].created_at.isoformat()}_{rows[-1].id}"
+    return rows, cursor
+
+
+def _epoch_seconds(column):
+    """ Get a SQL expression of a naive datetime column as whole seconds since the epoch.
+
+    Both databases read the stored wall-clock time as if it were UTC, so the
+    result converts back to the same naive time (see vote_series).
+    """
+    if db.engine.dialect.name == "postgresql":
+        return db.cast(db.func.floor(db.func.extract("epoch", column)), db.Integer)
+    return db.cast(db.func.strftime("%s", column), db.Integer)
+
+
+def vote_series(poll_id, resolution):
+    """ Get each option's cumulative vote count over time, bucketed every resolution seconds.
+
+    Returns a dictionary of option id to [bucket start, cumulative votes]
+    pairs for the buckets in which the option got votes. Votes are counted
+    per bucket with GROUP BY and accumulated with a window function in the
+    database; votes cast before vote times were recorded are left out. The
+    series of a closed poll no longer changes, so it is cached per worker.
+    Bucket starts are naive ISO strings in server local time, like voted_at.
+    """
+    closed = db.session.query(Poll.closed_at).filter_by(id = poll_id).scalar() is not None
+    if closed:
+        cached = cache.get(SERIES_NAMESPACE, (poll_id, resolution))
+        if cached is not None:
+            return cached
+
+    bucket = (_epoch_seconds(PollVoter.voted_at) // resolution * resolution).label("bucket")
+    counts = db.session.query(PollVoter.option_id, bucket, db.func.count().label("votes"))\
+        .join(PollQuestion, PollQuestion.id == PollVoter.question_id)\
+        .filter(PollQuestion.poll_id == poll_id, PollVoter.voted_at.isnot(None))\
+        .group_by(PollVoter.option_id, bucket)\
+        .subquery()
+    cumulative = db.func.sum(counts.c.votes).over(partition_by = counts.c.option_id,
+                                                  order_by = counts.c.bucket)
+    series = {}
+    rows = db.session.query(counts.c.option_id, counts.c.bucket, cumulative)\
+        .order_by(counts.c.option_id, counts.c.bucket)
+    for option_id, start, total in rows:
+        start = datetime(1970, 1, 1) + timedelta(seconds = start)
+        series.setdefault(option_id, []).append([start.isoformat(), int(total)])
+    if closed:
+        cache.set(SERIES_NAMESPACE, (poll_id, resolution), series,
+                  current_app.config["POLL_RESULTS_CACHE_TTL"])
+    return series
+
+
+def _snapshot(poll_id, version):
+    """ Query the per-option tallies and response counts of one poll. """
+    options = db.session.query(PollOption.question_id, PollOption.id, PollOption.current_votes)\
+        .join(PollQuestion, PollQuestion.id == PollOption.question_id)\
+        .filter(PollQuestion.poll_id == poll_id)\
+        .order_by(PollOption.id)
+    questions = {}
+    for question_id, (total, _, responses) in question_tallies([poll_id]).items():
+        questions[question_id] = {"total": total, "responses": responses, "options": {}}
+    for question_id, option_id, votes in options:
+        questions[question_id]["options"][option_id] = votes
+    return {"poll_id": poll_id, "version": version, "questions": questions}
+
+
+def live_results(poll_id):
+    """ Get the current results snapshot of a poll, or None if it does not exist.
+
+    Each worker checks a poll's version at most once per POLL_STREAM_INTERVAL
+    and only queries the tallies again when the version changed, so any number
+    of viewers and voters cost one small query per interval.
+    """
+    interval = current_app.config["POLL_STREAM_INTERVAL"]
+    snapshot = cache.get(LIVE_NAMESPACE, poll_id)
+    if snapshot is not None and snapshot["checked_at"] > time.monotonic() - interval:
+        return snapshot["results"]
+
+    version = results_versions([poll_id]).get(poll_id)
+    if version is None:
+        return None
+    if snapshot is None or snapshot["results"]["version"] != version:
+        results = _snapshot(poll_id, version)
+    else:
+        results = snapshot["results"]
+    cache.set(LIVE_NAMESPACE, poll_id, {"checked_at": time.monotonic(), "results": results},
+              current_app.config["POLL_STREAM_TIMEOUT"])
+    return results
+
+
+def stream_results(poll_id, last_version=None):
+    """ Yield server-sent events with a poll's results whenever its version changes.
+
+    Events are sent at most once per POLL_STREAM_INTERVAL. The stream ends
+    after POLL_STREAM_TIMEOUT seconds so it never outlives the web server's
+    worker timeout; browsers reconnect and resume from the last event id.
+    An open stream holds a request thread, so the web server must run a
+    threaded worker class.
+    """
+    interval = current_app.config["POLL_STREAM_INTERVAL"]
+    deadline = time.monotonic() + current_app.config["POLL_STREAM_TIMEOUT"]
+    yield f"retry: {int(interval * 1000)}\n\n"
+    while True:
+        results = live_results(poll_id)
+        # Return the connection between checks instead of holding a transaction open.
+        db.session.close()
+        if results is None:
+            yield "event: deleted\ndata: {}\n\n"
+            return
+        if results["version"] != last_version:
+            last_version = results["version"]
+            yield f"id: {last_version}\nevent: results\ndata: {json.dumps(results)}\n\n"
+        if time.monotonic() + interval > deadline:
+            return
+        time.sleep(interval)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# app/previews.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Background thumbnail generation for meeting attachments.
+"""
+
+# Standard library imports.
+import os
+import tempfile
+
+# Third-party imports.
+from flask import current_app
+
+# Local application imports.
+from app.extensions import db
+from app.jobs import enqueue, job_handler
+from app.models import Attachments
+
+# Largest preview width/height in pixels.
+THUMBNAIL_SIZE = (320, 320)
+IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+PDF_EXTENSIONS = {"pdf"}
+
+
+def thumbnail_folder():
+    """ Get the folder holding generated preview images. """
+    return os.path.join(current_app.config["UPLOAD_FOLDER"], "thumbnails")
+
+
+def thumbnail_name(content_hash):
+    """ Get the preview filename for stored content (shared by identical files). """
+    return f"{content_hash}.png"
+
+
+def preview_supported(filename):
+    """ Check whether a preview can be generated for a file type. """
+    extension = filename.lower().rsplit(".", 1)[-1]
+    return extension in IMAGE_EXTENSIONS or extension in PDF_EXTENSIONS
+
+
+def queue_preview(attachment):
+    """ Reuse an existing preview of the same content, or queue one to be generated.
+
+    The attachment must already have an id (flush first); the job is committed
+    with the caller's transaction.
+    """
+    attachment.thumbnail = None
+    if attachment.content_hash is None or not preview_supported(attachment.filename):
+        return
+    name = thumbnail_name(attachment.content_hash)
+    if os.path.exists(os.path.join(thumbnail_folder(), name)):
+        attachment.thumbnail = name
+    else:
+        enqueue("attachment_preview", attachment_id = attachment.id)
+
+
+def render_image(path):
+    """ Open an image file as a Pillow image. """
+    from PIL import Image # pylint: disable=import-outside-toplevel
+    with Image.open(path) as image:
+        image.seek(0) # First frame of animated GIFs.
+        return image.convert("RGBA")
+
+
+def render_pdf(path):
+    """ Render the first page of a PDF as a Pillow image, or None without PyMuPDF.
+
+    PyMuPDF comes with the project's previews extra, which the Docker image installs.
+    """
+    try:
+        import pymupdf # pylint: disable=import-outside-toplevel
+    except ImportError:
+        current_app.logger.info("PyMuPDF is not installed; skipping PDF preview for %s.", path)
+        return None
+    from PIL import Image # pylint: disable=import-outside-toplevel
+    with pymupdf.open(path) as document:
+        if document.page_count == 0:
+            return None
+        pixmap = document.load_page(0).get_pixmap()
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+@job_handler("attachment_preview")
+def generate_preview(attachment_id):
+    """ Generate and record the preview image for an attachment. """
+    attachment = db.session.get(Attachments, attachment_id)
+    if attachment is None or attachment.content_hash is None:
+        # Removed (or replaced) before the worker got to it.
+        return
+    if not os.path.exists(attachment.filepath):
+        return
+
+    extension = attachment.filename.lower().rsplit(".", 1)[-1]
+    if extension in PDF_EXTENSIONS:
+        image = render_pdf(attachment.filepath)
+    else:
+        image = render_image(attachment.filepath)
+    if image is None:
+        return
+    image.thumbnail(THUMBNAIL_SIZE)
+
+    # Write to a temporary file first so the preview appears atomically.
+    folder = thumbnail_folder()
+    os.makedirs(folder, exist_ok=True)
+    name = thumbnail_name(attachment.content_hash)
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".preview-")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            image.save(temp_file, format="PNG", optimize=True)
+        os.replace(temp_path, os.path.join(folder, name))
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    # Every attachment sharing this content shares the preview.
+    Attachments.query.filter_by(content_hash = attachment.content_hash)\
+        .update({"thumbnail": name})
+    db.session.commit()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# app/replica.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Read replica routing for the project's database session.
+"""
+
+# Standard library imports.
+import time
+
+# Third-party imports.
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Select, Update
+
+# SQLALCHEMY_BINDS key of the read replica engine.
+REPLICA_BIND = "replica"
+
+
+class RoutingSession(Session):
+    """ Session sending reads to the read replica when the current request allows it.
+
+    Statements only go to the replica while g.use_replica is set (see
+    route_reads_to_replica), nothing was written yet in the request, and they
+    are plain SELECTs outside a flush; everything else uses the normal
+    Flask-SQLAlchemy routing. A write (a flush or an INSERT, UPDATE or DELETE)
+    sends the rest of the request, and the user's following requests, to the
+    primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                g.db_wrote = True
+            elif (g.get("use_replica") and not g.get("db_wrote")
+                  and (clause is None or isinstance(clause, Select))):
+                engines = self._db.engines
+                if REPLICA_BIND in engines:
+                    return engines[REPLICA_BIND]
+        return super().get_bind(mapper = mapper, clause = clause, bind = bind, **kwargs)
+
+
+def route_reads_to_replica():
+    """ Before-request hook letting GET requests read from the replica.
+
+    Users who wrote within the last REPLICA_STICKY_SECONDS keep reading from
+    the primary so they see their own changes despite replication lag.
+    """
+    if not current_app.config.get("SQLALCHEMY_BINDS", {}).get(REPLICA_BIND):
+        return
+    if request.method in ("GET", "HEAD") and session.get("primary_until", 0) <= time.time():
+        g.use_replica = True
+
+
+def remember_writes(response):
+    """ After-request hook pinning a user's reads to the primary after they write. """
+    if g.get("db_wrote") and current_app.config.get("SQLALCHEMY_BINDS", {}).get(REPLICA_BIND):
+        session["primary_until"] = time.time() + current_app.config["REPLICA_STICKY_SECONDS"]
+    return response
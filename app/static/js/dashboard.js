@@ -27,7 +27,7 @@ async function refreshAttachments() {
                 const listItem = document.createElement('li');
                 listItem.id = `attachment-${attachment.id}`;
                 // Use the returned API data
-                listItem.innerHTML = `<a href="/uploads/meeting-${CURRENT_MEETING_ID}-${attachment.filename}" target="_blank">${attachment.filename}</a> <i class="fa-solid fa-trash remove-attachment-ajax" data-url="/admin/remove-attachment/${CURRENT_MEETING_ID}/${attachment.id}/" style="cursor: pointer;"></i>`;
+                listItem.innerHTML = `<a href="${attachment.url}" target="_blank">${attachment.filename}</a> <i class="fa-solid fa-trash remove-attachment-ajax" data-url="/admin/remove-attachment/${CURRENT_MEETING_ID}/${attachment.id}/" style="cursor: pointer;"></i>`;
                 attachmentList.appendChild(listItem);
             });
         } else {
@@ -332,6 +332,11 @@ document.addEventListener('DOMContentLoaded', function () {
                 body: formData
             });
 
+            if (response.status === 413) { // Rejected by the server's upload size limit
+                showMessage('File is too large.');
+                return;
+            }
+
             const result = await response.json();
 
             if (response.ok) { // Status 201 from Flask route
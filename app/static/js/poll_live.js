@@ -0,0 +1,40 @@
+// Live poll results: apply each results event from the stream to the page.
+document.addEventListener("DOMContentLoaded", () => {
+    const container = document.getElementById("poll-live");
+    const status = document.getElementById("poll-live-status");
+    const source = new EventSource(container.dataset.streamUrl);
+
+    source.addEventListener("results", (event) => {
+        const results = JSON.parse(event.data);
+        for (const [questionId, question] of Object.entries(results.questions)) {
+            const card = container.querySelector(`[data-question-id="${questionId}"]`);
+            if (!card) {
+                continue;
+            }
+            const responses = card.querySelector(".poll-live-responses");
+            if (responses) {
+                responses.textContent = question.responses;
+            }
+            for (const [optionId, votes] of Object.entries(question.options)) {
+                const row = card.querySelector(`[data-option-id="${optionId}"]`);
+                if (!row) {
+                    continue;
+                }
+                const percent = question.total > 0 ? votes / question.total * 100 : 0;
+                row.querySelector(".poll-live-votes").textContent = votes;
+                row.querySelector(".poll-live-percent").textContent = percent.toFixed(1);
+                row.querySelector(".poll-live-bar").style.width = `${percent}%`;
+            }
+        }
+        status.textContent = `Updated ${new Date().toLocaleTimeString()}`;
+    });
+
+    source.addEventListener("deleted", () => {
+        status.textContent = "This poll has been deleted.";
+        source.close();
+    });
+
+    source.onerror = () => {
+        status.textContent = "Reconnecting...";
+    };
+});
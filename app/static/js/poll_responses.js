@@ -0,0 +1,61 @@
+// Load the free responses of the polls page's questions page by page, with search.
+const SEARCH_DELAY_MS = 300;
+
+async function loadResponses(container, reset) {
+    const list = container.querySelector(".poll-responses-list");
+    const more = container.querySelector(".poll-responses-more");
+    const url = new URL(container.dataset.responsesUrl, window.location.origin);
+    const search = container.querySelector(".poll-responses-search").value.trim();
+    if (search) {
+        url.searchParams.set("q", search);
+    }
+    if (!reset && container.dataset.next) {
+        url.searchParams.set("after", container.dataset.next);
+    }
+
+    more.disabled = true;
+    const response = await fetch(url);
+    const page = await response.json();
+    if (reset) {
+        list.innerHTML = "";
+    }
+    for (const answer of page.responses || []) {
+        const item = document.createElement("li");
+        item.className = "list-group-item";
+        item.textContent = answer.response_text;
+        const date = document.createElement("small");
+        date.className = "text-muted d-block mt-1";
+        date.textContent = answer.created_at;
+        item.appendChild(date);
+        list.appendChild(item);
+    }
+    if (reset && !list.children.length) {
+        const empty = document.createElement("li");
+        empty.className = "list-group-item text-muted";
+        empty.textContent = "No matching responses.";
+        list.appendChild(empty);
+    }
+    container.dataset.next = page.next || "";
+    more.classList.toggle("d-none", !page.next);
+    more.disabled = false;
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    for (const container of document.querySelectorAll(".poll-responses")) {
+        const show = container.querySelector(".poll-responses-show");
+        show.addEventListener("click", () => {
+            show.classList.add("d-none");
+            container.querySelector(".poll-responses-body").classList.remove("d-none");
+            loadResponses(container, true);
+        });
+        container.querySelector(".poll-responses-more").addEventListener("click", () => {
+            loadResponses(container, false);
+        });
+
+        let searchTimer;
+        container.querySelector(".poll-responses-search").addEventListener("input", () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => loadResponses(container, true), SEARCH_DELAY_MS);
+        });
+    }
+});
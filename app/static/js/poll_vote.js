@@ -0,0 +1,82 @@
+// Submit home page polls in place and update the tallies from the JSON response.
+function showPollMessages(messages) {
+    const errorRow = document.getElementById("error-row");
+    errorRow.innerHTML = "";
+    for (const [category, message] of messages) {
+        const alert = document.createElement("div");
+        alert.className = `alert alert-${category} alert-dismissible fade show`;
+        alert.setAttribute("role", "alert");
+        alert.textContent = message;
+        const close = document.createElement("button");
+        close.type = "button";
+        close.className = "btn-close btn-close-white";
+        close.dataset.bsDismiss = "alert";
+        close.setAttribute("aria-label", "Close");
+        alert.appendChild(close);
+        errorRow.appendChild(alert);
+    }
+}
+
+function applyPollState(form, state) {
+    for (const question of Object.values(state.tallies)) {
+        for (const [optionId, votes] of Object.entries(question)) {
+            const badge = form.querySelector(`[data-option-votes="${optionId}"]`);
+            if (badge) {
+                badge.textContent = `${votes} votes`;
+            }
+        }
+    }
+
+    const selected = new Set(state.selected_options.map(String));
+    for (const input of form.querySelectorAll("input[name$='_mcq']")) {
+        input.checked = selected.has(input.value);
+    }
+
+    // Answered immutable questions can no longer be changed.
+    for (const question of form.querySelectorAll("[data-immutable='true']")) {
+        const questionId = question.dataset.questionId;
+        const inputs = question.querySelectorAll("input, textarea");
+        const answered = questionId in state.responses ||
+            Array.from(inputs).some((input) => input.checked);
+        if (answered) {
+            inputs.forEach((input) => { input.disabled = true; });
+        }
+    }
+}
+
+function newSubmissionKey() {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0")).join("");
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    for (const form of document.querySelectorAll(".poll-vote-form")) {
+        form.addEventListener("submit", async (event) => {
+            event.preventDefault();
+            const button = form.querySelector("button[type='submit']");
+            button.disabled = true;
+            try {
+                const csrfInput = form.querySelector("input[name='csrf_token']");
+                const response = await fetch(form.dataset.jsonAction, {
+                    method: "POST",
+                    body: new FormData(form),
+                    headers: csrfInput ? { "X-CSRFToken": csrfInput.value } : {},
+                });
+                const result = await response.json();
+                showPollMessages(result.messages);
+                if (result.tallies) {
+                    applyPollState(form, result);
+                }
+                // Retries of this request reuse its key; the next vote is a new submission.
+                if (response.ok) {
+                    form.querySelector("input[name='idempotency_key']").value = newSubmissionKey();
+                }
+            } catch (error) {
+                // Fall back to the regular form submission.
+                form.submit();
+            } finally {
+                button.disabled = false;
+            }
+        });
+    }
+});
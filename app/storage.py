@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# app/storage.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Attachment file storage helpers for the project.
+"""
+
+# Standard library imports.
+import hashlib
+import os
+import re
+import tempfile
+
+# Read and hash uploads in 64 KiB pieces so large files never sit in memory.
+CHUNK_SIZE = 64 * 1024
+
+# Content-addressed files are named by their SHA-256 hex digest.
+BLOB_NAME_REGEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadTooLargeError(Exception):
+    """ Raised when an upload exceeds the configured attachment size limit. """
+
+
+def _stream_to_temp(stream, folder, max_size=None):
+    """ Copy a stream to a temporary file in folder, returning (temp path, size, digest). """
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the {max_size} byte attachment size limit."
+                    )
+                digest.update(chunk)
+                temp_file.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path, size, digest.hexdigest()
+
+
+def blob_path(folder, digest):
+    """ Get the content-addressed path for a SHA-256 digest. """
+    return os.path.join(folder, digest)
+
+
+def is_blob_path(path):
+    """ Check whether a path points at a content-addressed file. """
+    return BLOB_NAME_REGEX.match(os.path.basename(path)) is not None
+
+
+def _commit_blob(temp_path, folder, digest):
+    """ Atomically move a finished temporary file to its digest path, deduplicating.
+
+    An existing file with the digest has the same content, so it is simply
+    replaced. Unlike checking for it first, this cannot race with a queued
+    release deleting it, and the fresh modification time makes that release
+    keep the new file.
+    """
+    destination = blob_path(folder, digest)
+    os.replace(temp_path, destination)
+    return destination
+
+
+def store_upload(file_storage, folder, max_size=None):
+    """ Stream an upload into the content-addressed store, returning (size, digest, path).
+
+    The upload is copied in chunks to a temporary file in folder and atomically
+    renamed to its digest once complete, so readers never see a partially
+    written file. Identical content is only stored once: if a file with the
+    same digest already exists, the new copy atomically replaces it. Raises
+    UploadTooLargeError (leaving nothing behind) as soon as more than max_size
+    bytes have been read.
+    """
+    temp_path, size, digest = _stream_to_temp(file_storage.stream, folder, max_size)
+    return size, digest, _commit_blob(temp_path, folder, digest)
+
+
+def store_file(path, folder):
+    """ Move an existing file into the content-addressed store, returning (digest, path, duplicate).
+
+    When an identical file is already stored, the original is removed and
+    duplicate is True.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as existing_file:
+        while True:
+            chunk = existing_file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    digest = digest.hexdigest()
+    destination = blob_path(folder, digest)
+    if os.path.abspath(path) == os.path.abspath(destination):
+        return digest, destination, False
+    duplicate = os.path.exists(destination)
+    # Replacing identical content is safe even if the stored copy is removed meanwhile.
+    os.replace(path, destination)
+    return digest, destination, duplicate
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# app/submissions.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Idempotent poll submissions and their replay.
+"""
+
+# Standard library imports.
+from datetime import datetime, timedelta
+import json
+
+# Third-party imports.
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+# Local application imports.
+from app.extensions import db
+from app.jobs import job_handler
+from app.models import PollSubmission
+
+
+def find_submission(user_id, poll_id, key):
+    """ Get the stored (outcome, status code) of a recent submission with this key, or None. """
+    if not key:
+        return None
+    cutoff = datetime.now() - timedelta(seconds = current_app.config["POLL_IDEMPOTENCY_TTL"])
+    submission = db.session.query(PollSubmission.outcome, PollSubmission.status_code).filter(
+        PollSubmission.user_id == user_id,
+        PollSubmission.poll_id == poll_id,
+        PollSubmission.idempotency_key == key,
+        PollSubmission.created_at > cutoff
+    ).first()
+    if submission is None:
+        return None
+    return json.loads(submission.outcome), submission.status_code
+
+
+def claim_submission(user_id, poll_id, key):
+    """ Reserve a submission's idempotency key before its answers are saved.
+
+    The key's row is flushed in the caller's transaction, so the unique
+    constraint makes a concurrent request with the same key wait for that
+    transaction and then fail. Returns (submission, replay): the reserved row
+    to fill in with complete_submission before committing, or the stored
+    (outcome, status code) of an earlier submission with this key. Both are
+    None when the client sent no key.
+    """
+    if not key:
+        return None, None
+    replay = find_submission(user_id, poll_id, key)
+    if replay is not None:
+        return None, replay
+    now = datetime.now()
+    cutoff = now - timedelta(seconds = current_app.config["POLL_IDEMPOTENCY_TTL"])
+    # An expired record with the same key would block the new one.
+    PollSubmission.query.filter(
+        PollSubmission.user_id == user_id,
+        PollSubmission.poll_id == poll_id,
+        PollSubmission.idempotency_key == key,
+        PollSubmission.created_at <= cutoff
+    ).delete(synchronize_session = False)
+    submission = PollSubmission(user_id = user_id, poll_id = poll_id, idempotency_key = key,
+                                outcome = "{}", created_at = now)
+    db.session.add(submission)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # A concurrent request with this key committed first: replay its outcome.
+        db.session.rollback()
+        return None, find_submission(user_id, poll_id, key)
+    return submission, None
+
+
+def complete_submission(submission, outcome, status_code=200):
+    """ Store a claimed submission's outcome, committed together with its answers. """
+    if submission is not None:
+        submission.outcome = json.dumps(outcome)
+        submission.status_code = status_code
+
+
+@job_handler("poll_submission_prune")
+def prune_submissions():
+    """ Delete submission records older than POLL_IDEMPOTENCY_TTL, returning how many. """
+    cutoff = datetime.now() - timedelta(seconds = current_app.config["POLL_IDEMPOTENCY_TTL"])
+    deleted = PollSubmission.query.filter(PollSubmission.created_at <= cutoff)\
+        .delete(synchronize_session = False)
+    db.session.commit()
+    return deleted
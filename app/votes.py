@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# app/votes.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Poll vote events, their compaction, and results versions.
+"""
+
+# Standard library imports.
+from datetime import datetime, timedelta
+
+# Third-party imports.
+from flask import current_app
+
+# Local application imports.
+from app.extensions import cache, db
+from app.jobs import enqueue, job_handler
+from app.models import Poll, PollOption, PollVoteEvent
+
+# Cache namespace marking that this worker queued a vote compaction.
+VOTES_NAMESPACE = "poll_votes"
+
+
+def bump_poll_version(poll_id):
+    """ Mark a poll's results as changed with the caller's transaction.
+
+    The increment runs in SQL so concurrent submissions on different workers
+    never lose an update, and every worker's cached panel becomes stale.
+    Votes do not bump the version; they are tracked by their vote events
+    (see results_versions).
+    """
+    Poll.query.filter_by(id = poll_id).update({Poll.version: Poll.version + 1},
+                                              synchronize_session = False)
+
+
+def results_versions(poll_ids):
+    """ Get a token for the current results of each poll, keyed by poll id.
+
+    The token combines the poll version with its newest unfolded vote event,
+    so it changes with every vote and with every compaction (which bumps the
+    version while emptying the events).
+    """
+    if not poll_ids:
+        return {}
+    latest = dict(db.session.query(PollVoteEvent.poll_id, db.func.max(PollVoteEvent.id))
+                  .filter(PollVoteEvent.poll_id.in_(poll_ids))
+                  .group_by(PollVoteEvent.poll_id))
+    return {poll_id: f"{version}-{latest.get(poll_id, 0)}" for poll_id, version in
+            db.session.query(Poll.id, Poll.version).filter(Poll.id.in_(poll_ids))}
+
+
+def record_vote(poll_id, option_id, delta):
+    """ Add a vote count change for an option to the caller's transaction. """
+    db.session.add(PollVoteEvent(poll_id = poll_id, option_id = option_id, delta = delta))
+
+
+def schedule_vote_compaction():
+    """ Queue a vote compaction job with the caller's transaction.
+
+    Each worker queues at most one job per POLL_VOTE_COMPACT_INTERVAL, which
+    runs that many seconds later and folds every vote cast meanwhile. Expired
+    submission records are pruned by a job queued alongside it.
+    """
+    interval = current_app.config["POLL_VOTE_COMPACT_INTERVAL"]
+    if cache.get(VOTES_NAMESPACE, "compaction_queued"):
+        return
+    run_after = datetime.now() + timedelta(seconds = interval)
+    enqueue("poll_vote_compaction", run_after = run_after)
+    # Expired submission records are cleared on the same schedule.
+    enqueue("poll_submission_prune", run_after = run_after)
+    cache.set(VOTES_NAMESPACE, "compaction_queued", True, interval)
+
+
+@job_handler("poll_vote_compaction")
+def compact_vote_events(poll_id=None):
+    """ Fold current vote events (of one poll, or all) into poll_options.votes.
+
+    Events up to the highest id seen when compaction starts (the watermark)
+    are summed per option and deleted; newer events stay in the tail. If a
+    concurrent compaction already deleted some of them, nothing is applied.
+    Returns how many events were folded.
+    """
+    events_query = PollVoteEvent.query
+    if poll_id is not None:
+        events_query = events_query.filter(PollVoteEvent.poll_id == poll_id)
+    watermark = events_query.with_entities(db.func.max(PollVoteEvent.id)).scalar()
+    if watermark is None:
+        return 0
+    events_query = events_query.filter(PollVoteEvent.id <= watermark)
+    folded = events_query.with_entities(
+        PollVoteEvent.poll_id,
+        PollVoteEvent.option_id,
+        db.func.sum(PollVoteEvent.delta),
+        db.func.count(PollVoteEvent.id)
+    ).group_by(PollVoteEvent.poll_id, PollVoteEvent.option_id).all()
+    events = sum(count for _, _, _, count in folded)
+
+    deleted = events_query.delete(synchronize_session = False)
+    if deleted != events:
+        db.session.rollback()
+        return 0
+    for _, option_id, delta, _ in folded:
+        if delta:
+            PollOption.query.filter_by(id = option_id)\
+                .update({PollOption.votes: PollOption.votes + delta}, synchronize_session = False)
+    for folded_poll_id in {folded_poll_id for folded_poll_id, _, _, _ in folded}:
+        bump_poll_version(folded_poll_id)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# benchmarks/bench_home_votes.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Benchmark the home page's vote lookups for long-time members.
+
+A member with a growing history of votes and free responses on expired polls
+opens the home page while one poll is open. The previous lookups loaded the
+whole history; the current ones only read answers to the open poll.
+
+Run from the repository root with: python -m benchmarks.bench_home_votes
+"""
+
+# Standard library imports.
+from datetime import datetime, timedelta
+import statistics
+import time
+
+# Third-party imports.
+from flask_login import login_user
+
+# Local application imports.
+from app import create_app, db
+from app.blueprints.main import home
+from app.models import Users, Poll, PollQuestion, PollOption, PollVoter, PollFreeResponse
+
+HISTORY_SIZES = (0, 200, 2000)
+QUESTIONS_PER_POLL = 10
+RESPONSE_TEXT = "A long free response from a past meeting. " * 50
+ROUNDS = 50
+
+
+def timed(func, rounds=ROUNDS):
+    """ Run func repeatedly and return per-call latencies in milliseconds. """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    """ Print a one-line latency summary. """
+    print(f"{label:<44} median {statistics.median(samples):8.2f} ms   "
+          f"max {max(samples):8.2f} ms")
+
+
+def add_poll(title, expires, user, free_response_every=0):
+    """ Add a poll of multiple choice questions the user voted on. """
+    poll = Poll(title = title, poll_expires = expires)
+    db.session.add(poll)
+    db.session.flush()
+    for index in range(QUESTIONS_PER_POLL):
+        is_frq = free_response_every and index % free_response_every == 0
+        question = PollQuestion(poll_id = poll.id, question_text = f"{title} Q{index}",
+                                is_free_response = bool(is_frq))
+        db.session.add(question)
+        db.session.flush()
+        if is_frq:
+            db.session.add(PollFreeResponse(user_id = user.id, question_id = question.id,
+                                            response_text = RESPONSE_TEXT))
+            continue
+        options = [PollOption(question_id = question.id, option_text = text, votes = 1)
+                   for text in ("Yes", "No")]
+        db.session.add_all(options)
+        db.session.flush()
+        db.session.add(PollVoter(user_id = user.id, question_id = question.id,
+                                 option_id = options[0].id, poll_id = poll.id))
+
+
+def legacy_lookups(user):
+    """ The previous lookups: every vote and free response the user ever made. """
+    voter_records = PollVoter.query.filter_by(user_id = user.id).all()
+    voted = {voter.question_id for voter in voter_records}
+    frq_records = PollFreeResponse.query.filter_by(user_id = user.id).all()
+    voted.update(frq.question_id for frq in frq_records)
+    return voted
+
+
+def scoped_lookups(user, question_ids):
+    """ The current lookups: the user's answers to the open poll's questions only. """
+    voted = {question_id for question_id, in db.session.query(PollVoter.question_id).filter(
+        PollVoter.user_id == user.id, PollVoter.question_id.in_(question_ids))}
+    voted.update(question_id for question_id, _ in db.session.query(
+        PollFreeResponse.question_id, PollFreeResponse.response_text
+    ).filter(PollFreeResponse.user_id == user.id, PollFreeResponse.question_id.in_(question_ids)))
+    return voted
+
+
+def main():
+    """ Time the vote lookups and the home page for growing vote histories. """
+    for history in HISTORY_SIZES:
+        app = create_app(True)
+        with app.app_context():
+            db.create_all()
+            user = Users(username = "member@example.com", role = "member", activated = True)
+            user.set_password("bench-password")
+            db.session.add(user)
+            db.session.commit()
+            expired = datetime.now() - timedelta(days = 1)
+            for index in range(history // QUESTIONS_PER_POLL):
+                add_poll(f"Past poll {index}", expired, user, free_response_every = 5)
+            add_poll("Open poll", datetime.now() + timedelta(days = 1), user)
+            db.session.commit()
+
+            print(f"\n{history} historical answers")
+            open_questions = [question_id for question_id, in db.session.query(PollQuestion.id)
+                              .join(Poll).filter(Poll.title == "Open poll")]
+            report("legacy lookups of the whole history", timed(lambda: legacy_lookups(user)))
+            report("lookups scoped to the open poll",
+                   timed(lambda: scoped_lookups(user, open_questions)))
+            with app.test_request_context("/"):
+                login_user(user)
+                report("home page (scoped lookups)", timed(home))
+            db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
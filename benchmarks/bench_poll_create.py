@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# benchmarks/bench_poll_create.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Benchmark creating large polls with per-question flushes and bulk inserts.
+
+The previous creation path flushed after the poll and after every question
+to get its id, then added the options one by one. insert_poll inserts all
+questions with one INSERT ... RETURNING and all options with one batched INSERT.
+
+Run from the repository root with: python -m benchmarks.bench_poll_create
+"""
+
+# Standard library imports.
+import statistics
+import time
+
+# Third-party imports.
+from sqlalchemy import event
+
+# Local application imports.
+from app import create_app, db
+from app.models import Poll, PollQuestion, PollOption
+from app.polling import insert_poll
+
+QUESTION_COUNTS = (5, 40, 200)
+OPTIONS_PER_QUESTION = 4
+ROUNDS = 30
+
+
+def build_questions(count):
+    """ Build a survey definition of multiple choice questions. """
+    return [{"question_text": f"Question {index}", "is_free_response": False,
+             "allow_multiple_responses": False, "private_vote": False, "immutable_question": False,
+             "options": [f"Option {option}" for option in range(OPTIONS_PER_QUESTION)]}
+            for index in range(count)]
+
+
+def legacy_create(questions):
+    """ The previous creation path: a flush per question and options added one by one. """
+    poll = Poll(title = "Survey", poll_expires = None)
+    db.session.add(poll)
+    db.session.flush()
+    for definition in questions:
+        question = PollQuestion(poll_id = poll.id, question_text = definition["question_text"],
+                                is_free_response = False, allow_multiple_responses = False,
+                                private_vote = False, immutable_question = False)
+        db.session.add(question)
+        db.session.flush()
+        for option_text in definition["options"]:
+            db.session.add(PollOption(question_id = question.id, option_text = option_text))
+    db.session.commit()
+
+
+def bulk_create(questions):
+    """ The current creation path. """
+    insert_poll("Survey", None, questions)
+    db.session.commit()
+
+
+def measure(func, questions):
+    """ Return per-call latencies in milliseconds and the statements executed per call. """
+    statements = []
+    count_statement = lambda *args: statements.append(1)
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(questions)
+        samples.append((time.perf_counter() - start) * 1000)
+    event.remove(db.engine, "before_cursor_execute", count_statement)
+    return samples, len(statements) / ROUNDS
+
+
+def main():
+    """ Time both creation paths for growing surveys. """
+    app = create_app(True)
+    with app.app_context():
+        db.create_all()
+        for count in QUESTION_COUNTS:
+            questions = build_questions(count)
+            print(f"\n{count} questions with {OPTIONS_PER_QUESTION} options each")
+            for label, func in (("per-question flushes", legacy_create),
+                                ("bulk inserts", bulk_create)):
+                samples, statements = measure(func, questions)
+                print(f"{label:<24} median {statistics.median(samples):8.2f} ms   "
+                      f"{statements:6.0f} statements")
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# benchmarks/bench_setup_totp.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Benchmark the TOTP MFA setup page latency.
+
+Run from the repository root with: python -m benchmarks.bench_setup_totp
+"""
+
+# Standard library imports.
+import base64
+from io import BytesIO
+import statistics
+import time
+
+# Third-party imports.
+import qrcode
+import qrcode.image.svg
+
+# Local application imports.
+from app import create_app, db
+from app.models import Users
+
+ROUNDS = 50
+
+
+def timed(func, rounds=ROUNDS):
+    """ Run func repeatedly and return per-call latencies in milliseconds. """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    """ Print a one-line latency summary. """
+    print(f"{label:<40} median {statistics.median(samples):7.2f} ms   "
+          f"max {max(samples):7.2f} ms")
+
+
+def main():
+    """ Compare first loads, reloads, and the PNG and SVG QR renderers side by side. """
+    app = create_app(True)
+    with app.app_context():
+        db.create_all()
+        users = []
+        for index in range(ROUNDS):
+            user = Users(username=f"bench{index}@example.com", role="user", activated=True)
+            user.password = "unused"
+            users.append(user)
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+
+    clients = []
+    for user_id in user_ids:
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(user_id)
+        clients.append(client)
+
+    def fresh_client_iter():
+        remaining = iter(clients)
+        return lambda: next(remaining).get("/mfa/setup-totp/")
+
+    report("setup page, first load (new secret)", timed(fresh_client_iter()))
+    report("setup page, reload (cached QR)", timed(lambda: clients[0].get("/mfa/setup-totp/")))
+
+    uri = "otpauth://totp/Bench:bench%40example.com?secret=JBSWY3DPEHPK3PXP&issuer=Bench"
+    def png():
+        stream = BytesIO()
+        qrcode.make(uri).save(stream, format="PNG")
+        base64.b64encode(stream.getvalue()).decode("utf-8")
+    def svg():
+        image = qrcode.make(uri, image_factory=qrcode.image.svg.SvgPathImage)
+        base64.b64encode(image.to_string()).decode("utf-8")
+    report("PNG QR render only (served)", timed(png))
+    report("SVG path QR render only", timed(svg))
+
+
+if __name__ == "__main__":
+    main()
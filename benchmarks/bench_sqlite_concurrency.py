@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# benchmarks/bench_sqlite_concurrency.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Benchmark concurrent check-in writes and attendee polling on SQLite.
+
+Each worker process stands in for a gunicorn worker: it builds its own app
+and alternates check-in inserts with attendee list reads against a shared
+SQLite file. The run is repeated with SQLite's default settings and with the
+tuned pragmas applied by the application factory.
+
+Run from the repository root with: python -m benchmarks.bench_sqlite_concurrency
+"""
+
+# Standard library imports.
+import multiprocessing
+import os
+import tempfile
+import time
+
+# Third-party imports.
+from sqlalchemy.exc import OperationalError
+
+WORKERS = 8
+DURATION = 5.0
+READS_PER_WRITE = 4
+
+# SQLite's own defaults, with pysqlite's default 5 second lock wait.
+DEFAULT_SETTINGS = {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL",
+                    "SQLITE_BUSY_TIMEOUT": "5000", "SQLITE_CACHE_SIZE_KB": "2000",
+                    "SQLITE_MMAP_SIZE": "0"}
+# The application factory's defaults (WAL, synchronous=NORMAL, busy timeout, ...).
+TUNED_SETTINGS = {}
+
+
+def make_app(path, settings):
+    """ Build an app on the SQLite file at path with the given pragma settings. """
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    for key in DEFAULT_SETTINGS:
+        os.environ.pop(key, None)
+    os.environ.update(settings)
+    from app import create_app # pylint: disable=import-outside-toplevel
+    return create_app()
+
+
+def worker(path, settings, worker_id, results):
+    """ Alternate check-in writes and attendee reads until the duration is up. """
+    from app import db # pylint: disable=import-outside-toplevel
+    from app.models import Attendees # pylint: disable=import-outside-toplevel
+    app = make_app(path, settings)
+    writes = reads = locked = 0
+    with app.app_context():
+        deadline = time.perf_counter() + DURATION
+        while time.perf_counter() < deadline:
+            try:
+                db.session.add(Attendees(username=f"worker{worker_id}-{writes}", meeting=1))
+                db.session.commit()
+                writes += 1
+                for _ in range(READS_PER_WRITE):
+                    Attendees.query.filter_by(meeting=1).count()
+                    reads += 1
+            except OperationalError as e:
+                db.session.rollback()
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+    results.put((writes, reads, locked))
+
+
+def run(label, settings):
+    """ Run the workers against a fresh database and print throughput and lock errors. """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        app = make_app(path, settings)
+        from app import db # pylint: disable=import-outside-toplevel
+        from app.models import Meetings # pylint: disable=import-outside-toplevel
+        with app.app_context():
+            db.create_all()
+            db.session.add(Meetings(id=1, state="active", title="Bench", description="", host="bench"))
+            db.session.commit()
+            db.engine.dispose()
+
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=worker, args=(path, settings, index, results))
+                     for index in range(WORKERS)]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    writes = sum(result[0] for result in totals)
+    reads = sum(result[1] for result in totals)
+    locked = sum(result[2] for result in totals)
+    print(f"{label:<10} {writes / DURATION:9.1f} writes/s {reads / DURATION:9.1f} reads/s "
+          f"{locked:6d} 'database is locked' errors")
+
+
+def main():
+    """ Compare SQLite defaults with the tuned pragmas. """
+    print(f"{WORKERS} worker processes, {DURATION:.0f} s each, {READS_PER_WRITE} reads per write")
+    run("default", DEFAULT_SETTINGS)
+    run("tuned", TUNED_SETTINGS)
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# benchmarks/bench_users_page.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Benchmark the administrator users page attendance summary.
+
+Run from the repository root with: python -m benchmarks.bench_users_page
+"""
+
+# Standard library imports.
+from datetime import datetime, timedelta
+import random
+import statistics
+import time
+
+# Third-party imports.
+from flask_login import login_user
+
+# Local application imports.
+from app import create_app, db
+from app.blueprints.admin import users_list
+from app.models import Users, Meetings, Attendees
+
+USERS = 500
+MEETINGS = 100
+CHECKINS_PER_USER = 20
+ROUNDS = 20
+
+
+def timed(func, rounds=ROUNDS):
+    """ Run func repeatedly and return per-call latencies in milliseconds. """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    """ Print a one-line latency summary. """
+    print(f"{label:<40} median {statistics.median(samples):8.2f} ms   "
+          f"max {max(samples):8.2f} ms")
+
+
+def legacy_attendance(users):
+    """ The previous per-user summary: two username-joined queries for every user. """
+    for user in users:
+        user.meetings_attended = Attendees.query.filter_by(username = user.username).count()
+        last_meeting = db.session.query(Meetings.event_start)\
+            .join(Attendees, Meetings.id == Attendees.meeting)\
+            .filter(Attendees.username == user.username)\
+            .filter(Meetings.event_start != None)\
+            .order_by(Meetings.event_start.desc())\
+            .first()
+        user.last_checkin = last_meeting[0] if last_meeting else None
+
+
+def aggregate_attendance(users):
+    """ The current summary: one GROUP BY query joined on user ids. """
+    attendance = dict(
+        (user_id, (count, last)) for user_id, count, last in
+        db.session.query(
+            Attendees.user_id,
+            db.func.count(Attendees.id),
+            db.func.max(Meetings.event_start)
+        ).join(Meetings, Meetings.id == Attendees.meeting)
+        .filter(Attendees.user_id.isnot(None))
+        .group_by(Attendees.user_id)
+    )
+    for user in users:
+        user.meetings_attended, user.last_checkin = attendance.get(user.id, (0, None))
+
+
+def main():
+    """ Compare the legacy and aggregate attendance summaries, then time the whole page. """
+    random.seed(0)
+    app = create_app(True)
+    with app.app_context():
+        db.create_all()
+        admin = Users(username="bench-admin", role="admin", activated=True)
+        admin.set_password("bench-password")
+        users = [Users(username=f"bench{index}@example.com", role="member",
+                       activated=True, password="unused") for index in range(USERS)]
+        meetings = [Meetings(title=f"Meeting {index}", state="ended", description="",
+                             host="bench-admin",
+                             event_start=datetime(2026, 1, 1) + timedelta(days=index))
+                    for index in range(MEETINGS)]
+        db.session.add_all([admin] + users + meetings)
+        db.session.commit()
+        db.session.add_all([
+            Attendees(username=user.username, user_id=user.id, meeting=meeting.id)
+            for user in users
+            for meeting in random.sample(meetings, CHECKINS_PER_USER)
+        ])
+        db.session.commit()
+        print(f"{USERS} users, {MEETINGS} meetings, {USERS * CHECKINS_PER_USER} check-ins")
+
+        all_users = Users.query.order_by(Users.id).all()
+        report("legacy per-user username queries", timed(lambda: legacy_attendance(all_users), 3))
+        report("aggregate query on user ids", timed(lambda: aggregate_attendance(all_users)))
+
+        with app.test_request_context("/admin/users/"):
+            # Render the full page as the admin, skipping the login and role decorators.
+            login_user(admin)
+            report("full users page render", timed(users_list.__wrapped__.__wrapped__))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""meeting foreign keys with cascading deletes on attendees, minutes, attachments
+
+Revision ID: 4d6f0b8e3c21
+Revises: e81b4c6d2a93
+Create Date: 2026-10-19 16:20:31.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d6f0b8e3c21'
+down_revision = 'e81b4c6d2a93'
+branch_labels = None
+depends_on = None
+
+CHILD_TABLES = ('attendees', 'minutes', 'attachments')
+
+
+def upgrade():
+    for table in CHILD_TABLES:
+        # Rows left behind by meetings deleted before the constraint existed
+        # would make it fail; their files are reaped by attachments scan-orphans.
+        op.execute(f"DELETE FROM {table} WHERE meeting NOT IN (SELECT id FROM meetings)")
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_meeting'), ['meeting'], unique=False)
+            batch_op.create_foreign_key(f'fk_{table}_meeting_meetings', 'meetings',
+                                        ['meeting'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    for table in CHILD_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_meeting_meetings', type_='foreignkey')
+            batch_op.drop_index(batch_op.f(f'ix_{table}_meeting'))
@@ -0,0 +1,39 @@
+"""attendees reference users by id
+
+Revision ID: 7a2e5c9d1f46
+Revises: 4d6f0b8e3c21
+Create Date: 2026-10-19 17:05:12.338460
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2e5c9d1f46'
+down_revision = '4d6f0b8e3c21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendees', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+
+    # Attendance recorded for usernames without an account keeps user_id NULL.
+    op.execute(
+        "UPDATE attendees SET user_id = "
+        "(SELECT users.id FROM users WHERE users.username = attendees.username)"
+    )
+
+    with op.batch_alter_table('attendees', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_attendees_user_id'), ['user_id'], unique=False)
+        batch_op.create_foreign_key('fk_attendees_user_id_users', 'users',
+                                    ['user_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('attendees', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_attendees_user_id_users', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_attendees_user_id'))
+        batch_op.drop_column('user_id')
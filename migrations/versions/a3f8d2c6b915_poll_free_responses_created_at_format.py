@@ -0,0 +1,28 @@
+"""store poll free response times with microseconds on sqlite
+
+Revision ID: a3f8d2c6b915
+Revises: f5a2c8d3e619
+Create Date: 2026-10-19 23:41:08.215734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f8d2c6b915'
+down_revision = 'f5a2c8d3e619'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Times stored by CURRENT_TIMESTAMP lack the microseconds that keyset
+    # cursors are bound with, so SQLite's text comparison never matches them.
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("UPDATE poll_free_responses SET created_at = created_at || '.000000' "
+                   "WHERE length(created_at) = 19")
+
+
+def downgrade():
+    pass
@@ -0,0 +1,40 @@
+"""poll submission idempotency keys
+
+Revision ID: a9e5c1d7b382
+Revises: f1b3d6a8c047
+Create Date: 2026-10-19 20:14:09.671233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e5c1d7b382'
+down_revision = 'f1b3d6a8c047'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('poll_submissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+    sa.Column('outcome', sa.Text(), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'poll_id', 'idempotency_key', name='unique_user_poll_submission')
+    )
+    with op.batch_alter_table('poll_submissions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_poll_submissions_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('poll_submissions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_poll_submissions_created_at'))
+
+    op.drop_table('poll_submissions')
@@ -0,0 +1,26 @@
+"""polls track a results version
+
+Revision ID: b2c8e4f1a6d3
+Revises: 7a2e5c9d1f46
+Create Date: 2026-10-19 18:20:41.902115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2c8e4f1a6d3'
+down_revision = '7a2e5c9d1f46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.drop_column('version')
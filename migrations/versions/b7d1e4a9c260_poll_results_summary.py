@@ -0,0 +1,46 @@
+"""frozen results of closed polls
+
+Revision ID: b7d1e4a9c260
+Revises: c6f0a3e8d914
+Create Date: 2026-10-19 21:40:12.518304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d1e4a9c260'
+down_revision = 'c6f0a3e8d914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('poll_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('option_id', sa.Integer(), nullable=True),
+    sa.Column('votes', sa.Integer(), nullable=False),
+    sa.Column('responses', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['option_id'], ['poll_options.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['poll_questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('poll_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_poll_results_poll_id'), ['poll_id'], unique=False)
+
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('closed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.drop_column('closed_at')
+
+    with op.batch_alter_table('poll_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_poll_results_poll_id'))
+
+    op.drop_table('poll_results')
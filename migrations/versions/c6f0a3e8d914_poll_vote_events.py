@@ -0,0 +1,40 @@
+"""append-only poll vote events
+
+Revision ID: c6f0a3e8d914
+Revises: a9e5c1d7b382
+Create Date: 2026-10-19 20:52:33.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f0a3e8d914'
+down_revision = 'a9e5c1d7b382'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('poll_vote_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('option_id', sa.Integer(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['option_id'], ['poll_options.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('poll_vote_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_poll_vote_events_option_id'), ['option_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_poll_vote_events_poll_id'), ['poll_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('poll_vote_events', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_poll_vote_events_poll_id'))
+        batch_op.drop_index(batch_op.f('ix_poll_vote_events_option_id'))
+
+    op.drop_table('poll_vote_events')
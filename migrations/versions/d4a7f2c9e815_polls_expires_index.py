@@ -0,0 +1,26 @@
+"""index polls by expiration
+
+Revision ID: d4a7f2c9e815
+Revises: b2c8e4f1a6d3
+Create Date: 2026-10-19 19:02:17.550824
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7f2c9e815'
+down_revision = 'b2c8e4f1a6d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_polls_poll_expires'), ['poll_expires'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_polls_poll_expires'))
@@ -0,0 +1,34 @@
+"""keyset pagination index on poll free responses
+
+Revision ID: e3c9a5f1b748
+Revises: b7d1e4a9c260
+Create Date: 2026-10-19 22:18:47.093615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c9a5f1b748'
+down_revision = 'b7d1e4a9c260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Responses are paged by (created_at, id), so every row needs a timestamp.
+    op.execute("UPDATE poll_free_responses SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table('poll_free_responses', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               nullable=False)
+        batch_op.create_index('ix_poll_free_responses_question_id_created_at_id', ['question_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('poll_free_responses', schema=None) as batch_op:
+        batch_op.drop_index('ix_poll_free_responses_question_id_created_at_id')
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               nullable=True)
@@ -0,0 +1,34 @@
+"""jobs run_after for retries with backoff
+
+Revision ID: e81b4c6d2a93
+Revises: c5d28f4a9e17
+Create Date: 2026-10-19 15:02:44.618302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81b4c6d2a93'
+down_revision = 'c5d28f4a9e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('run_after', sa.DateTime(), nullable=True))
+
+    # Existing jobs became due when they were created.
+    op.execute("UPDATE jobs SET run_after = created_at")
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.alter_column('run_after', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_jobs_run_after'), ['run_after'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_run_after'))
+        batch_op.drop_column('run_after')
@@ -0,0 +1,26 @@
+"""index poll voters by user and question
+
+Revision ID: f1b3d6a8c047
+Revises: d4a7f2c9e815
+Create Date: 2026-10-19 19:31:45.118302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d6a8c047'
+down_revision = 'd4a7f2c9e815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('poll_voters', schema=None) as batch_op:
+        batch_op.create_index('ix_poll_voters_user_id_question_id', ['user_id', 'question_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('poll_voters', schema=None) as batch_op:
+        batch_op.drop_index('ix_poll_voters_user_id_question_id')
@@ -0,0 +1,28 @@
+"""record when poll votes are cast
+
+Revision ID: f5a2c8d3e619
+Revises: e3c9a5f1b748
+Create Date: 2026-10-19 23:02:15.640281
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a2c8d3e619'
+down_revision = 'e3c9a5f1b748'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('poll_voters', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('voted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_poll_voters_option_id_voted_at', ['option_id', 'voted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('poll_voters', schema=None) as batch_op:
+        batch_op.drop_index('ix_poll_voters_option_id_voted_at')
+        batch_op.drop_column('voted_at')
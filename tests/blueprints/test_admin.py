@@ -4,18 +4,20 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 6/6/2026
+Last Modified: 10/19/2026
 
 File Purpose: Pytest for the blueprints/admin endpoints.
 """
 
+import hashlib
 import io
 import os
 from datetime import datetime, timedelta
 
 from flask import current_app, get_flashed_messages
 
-from app.models import Attachments, Attendees, Meetings, Minutes, Users
+from app.jobs import run_pending
+from app.models import Attachments, Attendees, Jobs, Meetings, Minutes, Users
 from tests.conftest import app as flask_app, db  # Import the app fixture for context in tests.
 
 def test_get_last_attended_date(flask_app):
@@ -23,15 +25,10 @@ def test_get_last_attended_date(flask_app):
     from app.blueprints.admin import get_last_attended_date
     with flask_app.app_context():
 
-        user1 = Users(username="testuser1", role="member")
-        user2 = Users(username="testuser2", role="member")
-        user3 = Users(username="testuser3", role="member")
-
-        attendee1 = Attendees(username="testuser1", meeting=1)
-        attendee2 = Attendees(username="testuser1", meeting=2)
-        attendee3 = Attendees(username="testuser2", meeting=2)
-        db.session.add_all([attendee1, attendee2, attendee3])
-        db.session.commit()
+        user1 = Users(username="testuser1", role="member", password="unused")
+        user2 = Users(username="testuser2", role="member", password="unused")
+        user3 = Users(username="testuser3", role="member", password="unused")
+        db.session.add_all([user1, user2, user3])
 
         # Create test data for meetings and attendees.
         current_time = datetime.now()
@@ -40,6 +37,12 @@ def test_get_last_attended_date(flask_app):
         db.session.add_all([meeting1, meeting2])
         db.session.commit()
 
+        attendee1 = Attendees(username="testuser1", user_id=user1.id, meeting=meeting1.id)
+        attendee2 = Attendees(username="testuser1", user_id=user1.id, meeting=meeting2.id)
+        attendee3 = Attendees(username="testuser2", user_id=user2.id, meeting=meeting2.id)
+        db.session.add_all([attendee1, attendee2, attendee3])
+        db.session.commit()
+
 
         # Test the function with the test data.
         last_attended_date = get_last_attended_date(user1)
@@ -445,11 +448,78 @@ def test_add_attachment(flask_app):
     non_existent_meeting_response = test_client.post(f"/admin/add-attachment/9999/", data=auth_payload, follow_redirects=True)
     assert non_existent_meeting_response.status_code == 400
 
-    # Clean up: delete the dummy file created by the test.
-    uploaded_file_path = os.path.join(upload_folder, f"meeting-{meeting_id}-testfile.txt")
+    # Clean up: delete the dummy file created by the test (stored under its SHA-256 digest).
+    uploaded_file_path = os.path.join(upload_folder, hashlib.sha256(b"dummy file content").hexdigest())
     if os.path.exists(uploaded_file_path):
         os.remove(uploaded_file_path)
 
+def test_add_attachment_records_hash_and_enforces_size_limit(flask_app, tmp_path):
+    """ Uploads should store their SHA-256 digest and reject files over the size limit. """
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    flask_app.config["MAX_ATTACHMENT_SIZE"] = 1024
+    with flask_app.app_context():
+        admin_user = Users(username="adminuser", role="admin", activated=True)
+        admin_user.set_password("testpassword")
+        meeting = Meetings(title="Test Meeting", state="active", description="Test Meeting Description", host="adminuser")
+        db.session.add_all([admin_user, meeting])
+        db.session.commit()
+
+        test_client = flask_app.test_client()
+        test_client.post("/login/", data={"username": "adminuser", "password": "testpassword"})
+
+        content = b"slide deck content"
+        response = test_client.post(f"/admin/add-attachment/{meeting.id}/", data={"file": (io.BytesIO(content), "deck.pdf")})
+        assert response.status_code == 201
+        attachment = Attachments.query.filter_by(meeting=meeting.id, filename="deck.pdf").first()
+        assert attachment.content_hash == hashlib.sha256(content).hexdigest()
+        with open(attachment.filepath, "rb") as saved_file:
+            assert saved_file.read() == content
+
+        # Files over the attachment limit are rejected and not recorded.
+        response = test_client.post(f"/admin/add-attachment/{meeting.id}/", data={"file": (io.BytesIO(b"x" * 2048), "huge.pdf")})
+        assert response.status_code == 413
+        assert Attachments.query.filter_by(filename="huge.pdf").first() is None
+        assert os.listdir(tmp_path) == [attachment.content_hash]
+
+def test_shared_attachment_file_is_reference_counted(flask_app, tmp_path):
+    """ Identical uploads share one stored file that is only deleted with its last reference. """
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    with flask_app.app_context():
+        admin_user = Users(username="adminuser", role="admin", activated=True)
+        admin_user.set_password("testpassword")
+        first_meeting = Meetings(title="First", state="active", description="First meeting", host="adminuser")
+        second_meeting = Meetings(title="Second", state="active", description="Second meeting", host="adminuser")
+        third_meeting = Meetings(title="Third", state="active", description="Third meeting", host="adminuser")
+        db.session.add_all([admin_user, first_meeting, second_meeting, third_meeting])
+        db.session.commit()
+
+        test_client = flask_app.test_client()
+        test_client.post("/login/", data={"username": "adminuser", "password": "testpassword"})
+        for meeting in (first_meeting, second_meeting, third_meeting):
+            response = test_client.post(f"/admin/add-attachment/{meeting.id}/", data={"file": (io.BytesIO(b"same slides"), "slides.pdf")})
+            assert response.status_code == 201
+
+        stored_path = os.path.join(str(tmp_path), hashlib.sha256(b"same slides").hexdigest())
+        assert os.listdir(tmp_path) == [os.path.basename(stored_path)]
+        assert {attachment.filepath for attachment in Attachments.query.all()} == {stored_path}
+
+        # Deleting a meeting or removing an attachment keeps the file while others use it.
+        test_client.post(f"/admin/delete/{first_meeting.id}/")
+        assert Jobs.query.filter_by(name="attachment_release").count() == 1
+        run_pending()
+        assert os.path.exists(stored_path)
+        second_attachment = Attachments.query.filter_by(meeting=second_meeting.id).first()
+        test_client.post(f"/admin/remove-attachment/{second_meeting.id}/{second_attachment.id}/")
+        run_pending()
+        assert os.path.exists(stored_path)
+
+        # The last reference removes the file once the jobs worker runs.
+        third_attachment = Attachments.query.filter_by(meeting=third_meeting.id).first()
+        test_client.post(f"/admin/remove-attachment/{third_meeting.id}/{third_attachment.id}/")
+        assert os.path.exists(stored_path)
+        run_pending()
+        assert not os.path.exists(stored_path)
+
 def test_remove_attachement(flask_app):
     """ Test the /admin/remove-attachment/ endpoint. """
     with flask_app.app_context():
@@ -564,6 +634,35 @@ def test_users(flask_app):
             test_client.get("/admin/users/?since=invalid-date", follow_redirects=True)
             assert get_flashed_messages(category_filter=["danger"]) == ["Invalid date format for 'since' filter. Use YYYY-MM-DD."]
 
+def test_users_attendance_summary(flask_app):
+    """ The users page should show each user's attendance count and last check-in by user id. """
+    with flask_app.app_context():
+        admin_user = Users(username="adminuser", role="admin", activated=True)
+        admin_user.set_password("testpassword")
+        member = Users(username="renamed-member", role="member", activated=True, password="unused")
+        db.session.add_all([admin_user, member])
+        current_time = datetime(2026, 10, 1, 18, 30)
+        first = Meetings(title="First", state="ended", description="", host="adminuser", event_start=current_time - timedelta(days=7))
+        second = Meetings(title="Second", state="ended", description="", host="adminuser", event_start=current_time)
+        db.session.add_all([first, second])
+        db.session.commit()
+        # Attendance follows the user id even though the username recorded at check-in differs.
+        db.session.add_all([
+            Attendees(username="old-member-name", user_id=member.id, meeting=first.id),
+            Attendees(username="old-member-name", user_id=member.id, meeting=second.id),
+        ])
+        db.session.commit()
+
+        test_client = flask_app.test_client()
+        test_client.post("/login/", data={"username": "adminuser", "password": "testpassword"})
+        page = test_client.get("/admin/users/").get_data(as_text=True)
+        member_row = page[page.index("renamed-member"):]
+        member_row = member_row[:member_row.index("</tr>")]
+        assert "<td>2</td>" in member_row
+        assert str(current_time) in member_row
+        admin_row = page[page.index("<td>adminuser</td>"):]
+        assert "<td>0</td>" in admin_row[:admin_row.index("</tr>")]
+
 def test_reset_user_password(flask_app):
     """ Test the /admin/reset-user-password/ endpoint. """
     with flask_app.app_context():
@@ -792,4 +891,35 @@ def test_enable_user_account(flask_app):
         # Test that you cannot enable an already enabled account.
         with test_client:
             test_client.post(f"/admin/users/enable-account/{target_user.id}/", follow_redirects=True)
-            assert get_flashed_messages() == [f"User {target_user.username}'s account is already enabled."]
\ No newline at end of file
+            assert get_flashed_messages() == [f"User {target_user.username}'s account is already enabled."]
+
+def test_role_change_invalidates_cached_user(flask_app):
+    """ Promoting a user should take effect immediately with the user cache enabled. """
+    flask_app.config["USER_CACHE_TTL"] = 60
+    admin_user = Users(username="adminuser", role="admin", activated=True)
+    admin_user.set_password("testpassword")
+    target_user = Users(username="targetuser", role="user", activated=True)
+    target_user.set_password("password")
+    db.session.add_all([admin_user, target_user])
+    db.session.commit()
+    target_id = target_user.id
+
+    admin_client = flask_app.test_client()
+    target_client = flask_app.test_client()
+
+    def send(client, method, url, **kwargs):
+        # Push a fresh app context so each request loads its own user into g.
+        with flask_app.app_context():
+            return getattr(client, method)(url, **kwargs).status_code
+
+    send(admin_client, "post", "/login/", data={"username": "adminuser", "password": "testpassword"})
+    send(target_client, "post", "/login/", data={"username": "targetuser", "password": "password"})
+
+    # The target user's principal is now cached without admin access.
+    assert send(target_client, "get", "/admin/users/") == 403
+
+    assert send(admin_client, "post", f"/admin/users/promote/{target_id}/") == 302
+    assert send(target_client, "get", "/admin/users/") == 200
+
+    assert send(admin_client, "post", f"/admin/users/demote/{target_id}/") == 302
+    assert send(target_client, "get", "/admin/users/") == 403
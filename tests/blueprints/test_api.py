@@ -21,6 +21,7 @@ def test_api_event_attendees(flask_app):
         assert response.json == []
 
         # Write test data for attendees and meeting.
+        db.session.add(Meetings(id=1, state="active", title="Test Meeting", description="Test Description", host="testuser"))
         db.session.add(Attendees(id=1, meeting=1, username="testuser"))
         db.session.commit()
 
@@ -42,6 +43,7 @@ def test_api_event_minutes(flask_app):
         assert response.json == []
 
         # Write test data for minutes and meeting.
+        db.session.add(Meetings(id=1, state="active", title="Test Meeting", description="Test Description", host="testuser"))
         db.session.add(Minutes(id=1, meeting=1, notes="Test Minutes", username_by="testuser"))
         db.session.commit()
 
@@ -81,6 +83,7 @@ def test_api_event_attachments(flask_app):
         assert response.json == []
 
         # Write test data for attachments and meeting.
+        db.session.add(Meetings(id=1, state="active", title="Test Meeting", description="Test Description", host="testuser"))
         db.session.add(Attachments(id=1, meeting=1, filename="testfile.txt", filepath="/path/to/testfile.txt"))
         db.session.commit()
 
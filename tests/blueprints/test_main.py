@@ -4,7 +4,7 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 7/1/2026
+Last Modified: 10/19/2026
 
 File Purpose: Pytest for the blueprints/main endpoints.
 """
@@ -16,7 +16,10 @@ from flask_login import login_user as flask_login_user
 
 from app.blueprints import main as main_module
 from app.extensions import db
+from app import submissions as submissions_module
+from app.polling import invalidate_active_polls
 from app.models import (
+    Attachments,
     Meetings,
     Attendees,
     Users,
@@ -24,7 +27,8 @@ from app.models import (
     PollQuestion,
     PollOption,
     PollVoter,
-    PollFreeResponse
+    PollFreeResponse,
+    PollSubmission
 )
 from app.utils import sha_hash
 from tests.conftest import app as flask_app
@@ -69,11 +73,21 @@ def create_meeting(title, state="active", description="Test meeting", host="test
     db.session.commit()
     return meeting
 
+def create_attachment(filename, filepath):
+    """Create and persist an attachment record of a new meeting."""
+    meeting = create_meeting("Attachment meeting")
+    attachment = Attachments(filename=filename, filepath=filepath, meeting=meeting.id)
+    db.session.add(attachment)
+    db.session.commit()
+    return attachment
+
 def create_poll(title, expires=None):
     """Create and persist a poll record."""
     poll = Poll(title=title, poll_expires=expires)
     db.session.add(poll)
     db.session.flush()
+    # Rows added directly skip create_poll, which normally clears the active polls cache.
+    invalidate_active_polls()
     return poll
 
 def create_question(poll, question_text, *, is_free_response=False, allow_multiple=False, private_vote=False, immutable_question=False):
@@ -841,6 +855,114 @@ def test_download_file(flask_app, tmp_path):
         assert response.status_code == 200
         assert response.get_data(as_text=True) == "meeting notes"
 
+def test_download_attachment_uses_original_filename(flask_app, tmp_path):
+    """Content-addressed attachments should download under their original filename."""
+    with flask_app.app_context():
+        digest = "c" * 64
+        (tmp_path / digest).write_bytes(b"%PDF-1.4 slides")
+        flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+        create_attachment("Slides Deck.pdf", str(tmp_path / digest))
+
+        response = flask_app.test_client().get(f"/uploads/{digest}/Slides%20Deck.pdf")
+        assert response.status_code == 200
+        assert response.data == b"%PDF-1.4 slides"
+        assert response.mimetype == "application/pdf"
+        assert response.headers["Content-Disposition"].startswith("inline")
+        assert "Slides Deck.pdf" in response.headers["Content-Disposition"]
+
+def test_download_attachment_ignores_filename_in_url(flask_app, tmp_path):
+    """The content type of an attachment should come from its stored filename, not the URL."""
+    with flask_app.app_context():
+        digest = "d" * 64
+        (tmp_path / digest).write_bytes(b"<script>alert(1)</script>")
+        flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+        create_attachment("notes.txt", str(tmp_path / digest))
+        test_client = flask_app.test_client()
+
+        for filename in ("x.html", "x.svg"):
+            response = test_client.get(f"/uploads/{digest}/{filename}")
+            assert response.status_code == 200
+            assert response.mimetype == "text/plain"
+            assert response.headers["X-Content-Type-Options"] == "nosniff"
+            # Files that are not images or PDFs are downloaded rather than shown.
+            assert response.headers["Content-Disposition"].startswith("attachment")
+            assert "notes.txt" in response.headers["Content-Disposition"]
+
+        flask_app.config["UPLOAD_SENDFILE"] = "x-sendfile"
+        response = test_client.get(f"/uploads/{digest}/x.svg")
+        assert response.mimetype == "text/plain"
+        assert response.headers["Content-Disposition"].startswith("attachment")
+
+        # Files without an attachment record are not served under a chosen name.
+        assert test_client.get(f"/uploads/{'e' * 64}/x.html").status_code == 404
+
+def test_download_content_addressed_upload_caching_and_ranges(flask_app, tmp_path):
+    """Content-addressed uploads should get strong ETags, long caching and range support."""
+    with flask_app.app_context():
+        digest = "a" * 64
+        (tmp_path / digest).write_bytes(b"0123456789")
+        (tmp_path / "legacy.txt").write_text("legacy", encoding="utf-8")
+        flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+        create_attachment("deck.pdf", str(tmp_path / digest))
+        test_client = flask_app.test_client()
+
+        response = test_client.get(f"/uploads/{digest}/deck.pdf")
+        assert response.status_code == 200
+        assert response.headers["ETag"] == f'"{digest}"'
+        assert response.cache_control.immutable
+        assert response.cache_control.public
+        assert response.cache_control.max_age == flask_app.config["UPLOAD_MAX_AGE"]
+
+        # Conditional requests are answered without a body.
+        not_modified = test_client.get(f"/uploads/{digest}/deck.pdf", headers={"If-None-Match": f'"{digest}"'})
+        assert not_modified.status_code == 304
+
+        # Byte ranges are supported for large decks.
+        partial = test_client.get(f"/uploads/{digest}/deck.pdf", headers={"Range": "bytes=2-5"})
+        assert partial.status_code == 206
+        assert partial.data == b"2345"
+        assert partial.headers["Content-Range"] == "bytes 2-5/10"
+
+        # Files that are not content-addressed must be revalidated.
+        legacy = test_client.get("/uploads/legacy.txt")
+        assert legacy.status_code == 200
+        assert legacy.cache_control.no_cache
+        assert not legacy.cache_control.immutable
+
+def test_download_upload_offloaded_to_proxy(flask_app, tmp_path):
+    """With UPLOAD_SENDFILE set, the file transfer should be handed to the front proxy."""
+    with flask_app.app_context():
+        digest = "b" * 64
+        (tmp_path / digest).write_bytes(b"slides")
+        flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+        create_attachment("deck.pdf", str(tmp_path / digest))
+        test_client = flask_app.test_client()
+
+        flask_app.config["UPLOAD_SENDFILE"] = "x-accel-redirect"
+        response = test_client.get(f"/uploads/{digest}/deck.pdf")
+        assert response.status_code == 200
+        assert response.data == b""
+        assert response.headers["X-Accel-Redirect"] == f"/protected-uploads/{digest}"
+        assert response.mimetype == "application/pdf"
+        assert response.headers["ETag"] == f'"{digest}"'
+        assert test_client.get(f"/uploads/{digest}/deck.pdf", headers={"If-None-Match": f'"{digest}"'}).status_code == 304
+
+        flask_app.config["UPLOAD_SENDFILE"] = "x-sendfile"
+        response = test_client.get(f"/uploads/{digest}")
+        assert response.headers["X-Sendfile"] == str(tmp_path / digest)
+
+        # Missing files are still reported by the application.
+        assert test_client.get("/uploads/missing.pdf").status_code == 404
+
+def test_static_files_cache_control(flask_app):
+    """Static assets should be served with the configured public cache lifetime."""
+    with flask_app.app_context():
+        response = flask_app.test_client().get("/static/css/main.css")
+        assert response.status_code == 200
+        assert response.cache_control.public
+        assert response.cache_control.max_age == 3600
+        response.close()
+
 def build_composite_poll_submission_setup():
     poll = create_poll("Composite Poll", expires=datetime.now() + timedelta(days=1))
     frq = create_question(poll, "Share feedback", is_free_response=True)
@@ -879,6 +1001,8 @@ def test_submit_poll_successfully_persists_responses(flask_app):
             assert PollFreeResponse.query.filter_by(user_id=user.id, question_id=frq.id).one().response_text == "Good work"
             assert PollVoter.query.filter_by(user_id=user.id, question_id=multi.id).count() == 2
             assert PollVoter.query.filter_by(user_id=user.id, question_id=single.id).count() == 1
+            # Cached result panels are keyed by the poll version.
+            assert db.session.get(Poll, poll.id).version == 2
 
 
 def test_submit_poll_repeat_submission_reports_no_changes(flask_app):
@@ -910,6 +1034,7 @@ def test_submit_poll_repeat_submission_reports_no_changes(flask_app):
             )
             assert response.status_code == 200
             assert get_flashed_messages() == ["No changes were made to any responses."]
+            assert db.session.get(Poll, poll.id).version == 1
 
 def test_submit_poll_rejects_expired_poll(flask_app):
     """Expired polls should be rejected before any submission work happens."""
@@ -947,3 +1072,155 @@ def test_submit_poll_reports_invalid_option(flask_app):
             )
             assert response.status_code == 200
             assert get_flashed_messages() == ["Selected option does not exist.", "Some responses were not submitted successfully. Successes: 0, Failures: 1"]
+
+def test_submit_poll_json_returns_tallies_and_answers(flask_app):
+    """The JSON submission should save answers and return the tallies without redirecting."""
+    with flask_app.app_context():
+        user = create_user()
+        test_client = flask_app.test_client()
+        login_user(test_client)
+
+        poll, frq, multi, single, single_a = build_composite_poll_submission_setup()
+        private = create_question(poll, "Secret ballot", private_vote=True)
+        secret = create_option(private, "Secret A")
+        db.session.commit()
+
+        response = test_client.post(
+            f"/submit-poll/{poll.id}/json",
+            data={
+                f"question_{frq.id}_frq": "Good work",
+                f"question_{single.id}_mcq": str(single_a.id),
+                f"question_{private.id}_mcq": str(secret.id),
+            },
+        )
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["success"] is True
+        assert result["messages"] == [["success", "All responses submitted successfully!"]]
+        assert result["tallies"][str(single.id)] == {str(single_a.id): 1, str(single.options[1].id): 0}
+        assert str(private.id) not in result["tallies"]
+        assert result["selected_options"] == sorted([single_a.id, secret.id])
+        assert result["responses"] == {str(frq.id): "Good work"}
+        assert PollVoter.query.filter_by(user_id=user.id).count() == 2
+
+        # The outcome was returned, so it is not flashed again on the next page.
+        assert "All responses submitted successfully!" not in test_client.get("/").get_data(as_text=True)
+
+def test_submit_poll_json_rejects_expired_poll(flask_app):
+    """Expired polls should be rejected with a JSON error."""
+    with flask_app.app_context():
+        create_user()
+        test_client = flask_app.test_client()
+        login_user(test_client)
+        poll = create_poll("Expired JSON Poll", expires=datetime.now() - timedelta(minutes=1))
+        db.session.commit()
+
+        response = test_client.post(f"/submit-poll/{poll.id}/json", data={})
+        assert response.status_code == 403
+        assert response.get_json()["success"] is False
+
+def test_submit_poll_json_reports_commit_failure(flask_app, monkeypatch):
+    """A failed commit should return an error instead of the outcome stored before committing."""
+    with flask_app.app_context():
+        user = create_user()
+        test_client = flask_app.test_client()
+        login_user(test_client)
+
+        poll = create_poll("Failing JSON Poll", expires=datetime.now() + timedelta(days=1))
+        question = create_question(poll, "Pick one", allow_multiple=False)
+        option = create_option(question, "Only")
+        db.session.commit()
+
+        def raise_commit():
+            raise Exception("boom")
+
+        data = {f"question_{question.id}_mcq": str(option.id), "idempotency_key": "tap-1"}
+        with monkeypatch.context() as patch:
+            patch.setattr(db.session, "commit", raise_commit)
+            response = test_client.post(f"/submit-poll/{poll.id}/json", data=data)
+        assert response.status_code == 500
+        result = response.get_json()
+        assert result["success"] is False
+        assert result["messages"] == [["danger", "An error occurred while saving your responses. Please try again."]]
+        assert "tallies" not in result
+        assert PollVoter.query.filter_by(user_id=user.id).count() == 0
+
+        # Nothing was stored under the key, so a retry saves the vote.
+        retry = test_client.post(f"/submit-poll/{poll.id}/json", data=data)
+        assert retry.status_code == 200
+        assert retry.get_json()["success"] is True
+        assert PollVoter.query.filter_by(user_id=user.id).count() == 1
+
+def test_submit_poll_replays_idempotent_retries(flask_app):
+    """A retried submission with the same key should return the stored outcome without saving again."""
+    with flask_app.app_context():
+        user = create_user()
+        test_client = flask_app.test_client()
+        login_user(test_client)
+
+        poll = create_poll("Retry Poll", expires=datetime.now() + timedelta(days=1))
+        question = create_question(poll, "Pick one", allow_multiple=False)
+        first = create_option(question, "First")
+        second = create_option(question, "Second")
+        db.session.commit()
+
+        vote_first = {f"question_{question.id}_mcq": str(first.id), "idempotency_key": "tap-1"}
+        original = test_client.post(f"/submit-poll/{poll.id}/json", data=vote_first).get_json()
+
+        # The replay answers with the stored outcome even though the body changed.
+        vote_second = {f"question_{question.id}_mcq": str(second.id)}
+        replay = test_client.post(f"/submit-poll/{poll.id}/json", data=vote_second,
+                                  headers={"Idempotency-Key": "tap-1"})
+        assert replay.get_json() == original
+        assert PollVoter.query.filter_by(user_id=user.id).one().option_id == first.id
+
+        # The form route replays the same outcome as a flashed message.
+        with test_client:
+            test_client.post(f"/submit-poll/{poll.id}", data={**vote_second, "idempotency_key": "tap-1"})
+            assert get_flashed_messages() == ["All responses submitted successfully!"]
+        assert PollVoter.query.filter_by(user_id=user.id).one().option_id == first.id
+
+        # A new key, or the same key after the retention window, is a new submission.
+        new_key = test_client.post(f"/submit-poll/{poll.id}/json",
+                                   data={**vote_second, "idempotency_key": "tap-2"}).get_json()
+        assert new_key["selected_options"] == [second.id]
+        flask_app.config["POLL_IDEMPOTENCY_TTL"] = 0
+        expired_key = test_client.post(f"/submit-poll/{poll.id}/json",
+                                       data={**vote_first, "idempotency_key": "tap-2"}).get_json()
+        assert expired_key["selected_options"] == [first.id]
+        assert PollSubmission.query.filter_by(idempotency_key="tap-2").count() == 1
+        # Expired records are removed by the jobs worker, not by each vote.
+        assert PollSubmission.query.count() == 2
+        assert submissions_module.prune_submissions() == 2
+        assert PollSubmission.query.count() == 0
+
+def test_submit_poll_concurrent_retry_replays_committed_outcome(flask_app, monkeypatch):
+    """A retry that loses the race for its key should replay the winner's outcome instead of voting again."""
+    with flask_app.app_context():
+        user = create_user()
+        test_client = flask_app.test_client()
+        login_user(test_client)
+
+        poll = create_poll("Race Poll", expires=datetime.now() + timedelta(days=1))
+        question = create_question(poll, "Pick one", allow_multiple=False)
+        first = create_option(question, "First")
+        second = create_option(question, "Second")
+        db.session.commit()
+
+        data = {f"question_{question.id}_mcq": str(first.id), "idempotency_key": "tap-1"}
+        original = test_client.post(f"/submit-poll/{poll.id}/json", data=data).get_json()
+
+        # The retry looked up the key before the first request committed.
+        find_submission = submissions_module.find_submission
+        lookups = []
+        def racing_find_submission(*args):
+            lookups.append(args)
+            return None if len(lookups) == 1 else find_submission(*args)
+        monkeypatch.setattr(submissions_module, "find_submission", racing_find_submission)
+
+        retry = test_client.post(f"/submit-poll/{poll.id}/json",
+                                 data={**data, f"question_{question.id}_mcq": str(second.id)})
+        assert retry.get_json() == original
+        assert len(lookups) == 2
+        assert PollVoter.query.filter_by(user_id=user.id).one().option_id == first.id
+        assert PollSubmission.query.count() == 1
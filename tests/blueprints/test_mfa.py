@@ -4,7 +4,7 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 6/6/2026
+Last Modified: 10/19/2026
 
 File Purpose: Pytest for the blueprints/mfa endpoints.
 """
@@ -243,6 +243,36 @@ def test_setup_totp_success(flask_app):
         with test_client.session_transaction() as sess:
             assert sess.get('mfa_setup_secret') == updated_user.totp_secret
 
+def test_setup_totp_reload_reuses_secret_and_qr(flask_app, monkeypatch):
+    """Reloading the setup page mid-enrollment should keep the secret and reuse the cached QR code."""
+    import qrcode
+    with flask_app.app_context():
+        user = Users(username="reloaduser", role="user", activated=True, totp_active=False)
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+
+        test_client = flask_app.test_client()
+        with test_client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+
+        first_response = test_client.get("/mfa/setup-totp/")
+        assert first_response.status_code == 200
+        assert b"data:image/png;base64," in first_response.data
+        with test_client.session_transaction() as sess:
+            first_secret = sess.get('mfa_setup_secret')
+
+        # The second render must come from the cache rather than the QR encoder.
+        def fail_make(*args, **kwargs):
+            raise AssertionError("QR code should not be re-rendered")
+        monkeypatch.setattr(qrcode, "make", fail_make)
+
+        second_response = test_client.get("/mfa/setup-totp/")
+        assert second_response.status_code == 200
+        with test_client.session_transaction() as sess:
+            assert sess.get('mfa_setup_secret') == first_secret
+        assert db.session.get(Users, user.id).totp_secret == first_secret
+
 def test_setup_totp_unauthenticated(flask_app):
     """Test that an unauthenticated user cannot access the setup route."""
     with flask_app.app_context():
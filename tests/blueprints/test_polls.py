@@ -10,10 +10,16 @@ File Purpose: Pytest for the blueprints/polls endpoints.
 """
 
 from datetime import datetime, timedelta
+import time
 
 from flask import get_flashed_messages
+from flask_login import login_user
 
-from app.models import Poll, PollOption, PollQuestion, PollVoter, Users
+from app import polling as polling_module
+from app.blueprints import main as main_module
+from app import votes as votes_module
+from app.models import (Jobs, Poll, PollFreeResponse, PollOption, PollQuestion, PollResult, PollVoteEvent,
+                        PollVoter, Users)
 from tests.conftest import app as flask_app, db  # Import the app fixture for context in tests.
 
 
@@ -220,3 +226,425 @@ def test_delete_poll(flask_app):
             assert response.status_code == 302
             assert get_flashed_messages() == ["Poll deleted successfully!"]
         assert db.session.get(Poll, poll.id) is None
+
+
+def test_polls_list_caches_results_until_poll_version_changes(flask_app, monkeypatch):
+    """Result panels should be rendered once per poll version and show SQL totals."""
+    with flask_app.app_context():
+        create_admin_user()
+        poll = Poll(title="Cached Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Pick one")
+        db.session.add(question)
+        db.session.flush()
+        option_a = PollOption(question_id=question.id, option_text="Cached A", votes=3)
+        option_b = PollOption(question_id=question.id, option_text="Cached B", votes=1)
+        db.session.add_all([option_a, option_b])
+        db.session.commit()
+
+        rendered = []
+        real_render = polling_module.render_template
+        def counting_render(*args, **kwargs):
+            rendered.append(args[0])
+            return real_render(*args, **kwargs)
+        monkeypatch.setattr(polling_module, "render_template", counting_render)
+
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+
+        page_text = test_client.get("/admin/polls/").get_data(as_text=True)
+        assert "3/4" in page_text
+        assert "75.0%" in page_text
+        test_client.get("/admin/polls/")
+        assert rendered == ["admin/poll_results.html"]
+
+        # A vote bumps the version, so the next page view renders the panel again.
+        option_b.votes = 5
+        votes_module.bump_poll_version(poll.id)
+        db.session.commit()
+        page_text = test_client.get("/admin/polls/").get_data(as_text=True)
+        assert len(rendered) == 2
+        assert "5/8" in page_text
+
+
+def test_poll_live_page_and_results_stream(flask_app):
+    """The live page should render and the stream should send the poll's tallies once per version."""
+    with flask_app.app_context():
+        create_admin_user()
+        poll = Poll(title="Live Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Live question")
+        db.session.add(question)
+        db.session.flush()
+        option = PollOption(question_id=question.id, option_text="Live A", votes=2)
+        db.session.add(option)
+        db.session.commit()
+        flask_app.config.update(POLL_STREAM_INTERVAL=0.01, POLL_STREAM_TIMEOUT=0.05)
+
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+
+        page_text = test_client.get(f"/admin/polls/{poll.id}/live/").get_data(as_text=True)
+        assert "Live question" in page_text
+        assert f"/admin/polls/{poll.id}/stream/" in page_text
+
+        response = test_client.get(f"/admin/polls/{poll.id}/stream/")
+        assert response.mimetype == "text/event-stream"
+        events = [event for event in response.get_data(as_text=True).split("\n\n") if event.startswith("id:")]
+        # Unchanged results are only sent once, however many times the stream checks them.
+        assert len(events) == 1
+        assert events[0].startswith("id: 1-0\nevent: results\n")
+        assert f'"{option.id}": 2' in events[0]
+
+        # A browser reconnecting with the current version gets no repeated event.
+        response = test_client.get(f"/admin/polls/{poll.id}/stream/", headers={"Last-Event-ID": "1-0"})
+        assert "event: results" not in response.get_data(as_text=True)
+
+
+def test_live_results_coalesce_within_interval(flask_app):
+    """Votes within one stream interval should be picked up by the next check, not each vote."""
+    with flask_app.app_context():
+        poll = Poll(title="Busy Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Busy question")
+        db.session.add(question)
+        db.session.flush()
+        option = PollOption(question_id=question.id, option_text="Busy A")
+        db.session.add(option)
+        db.session.commit()
+        flask_app.config["POLL_STREAM_INTERVAL"] = 60
+
+        assert polling_module.live_results(poll.id)["version"] == "1-0"
+        votes_module.record_vote(poll.id, option.id, 1)
+        db.session.commit()
+        assert polling_module.live_results(poll.id)["version"] == "1-0"
+
+        flask_app.config["POLL_STREAM_INTERVAL"] = 0
+        results = polling_module.live_results(poll.id)
+        assert results["version"] != "1-0"
+        assert results["questions"][question.id]["options"][option.id] == 1
+        assert polling_module.live_results(poll.id + 1) is None
+
+
+def test_active_poll_ids_cached_until_next_expiry(flask_app):
+    """Active poll ids should be cached until the soonest expiry and refreshed when polls change."""
+    with flask_app.app_context():
+        create_admin_user()
+        soon = Poll(title="Soon", poll_expires=datetime.now() + timedelta(seconds=30))
+        later = Poll(title="Later", poll_expires=datetime.now() + timedelta(days=1))
+        expired = Poll(title="Expired", poll_expires=datetime.now() - timedelta(days=1))
+        db.session.add_all([soon, later, expired])
+        db.session.commit()
+
+        assert polling_module.active_poll_ids() == [soon.id, later.id]
+        _, expires_at = flask_app.extensions["ttl_cache"][(polling_module.ACTIVE_NAMESPACE, "ids")]
+        assert expires_at - time.monotonic() <= 30
+
+        # Polls added by another worker change the table's count and highest id.
+        untracked = Poll(title="Untracked")
+        db.session.add(untracked)
+        db.session.commit()
+        assert polling_module.active_poll_ids() == [soon.id, later.id, untracked.id]
+
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+        test_client.post(
+            "/admin/create-poll/",
+            data=build_create_poll_data(title="Created", question_text="Pick one", option_texts=["A"]),
+        )
+        assert len(polling_module.active_poll_ids()) == 4
+
+        test_client.post(f"/admin/delete-poll/{soon.id}/")
+        assert soon.id not in polling_module.active_poll_ids()
+
+        db.session.delete(later)
+        db.session.commit()
+        assert later.id not in polling_module.active_poll_ids()
+
+
+def test_votes_append_events_and_compaction_folds_them(flask_app):
+    """Votes should only insert events, read as compacted totals plus the tail, and fold on compaction."""
+    with flask_app.app_context():
+        poll = Poll(title="Event Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Pick one")
+        db.session.add(question)
+        db.session.flush()
+        first = PollOption(question_id=question.id, option_text="First", votes=3)
+        second = PollOption(question_id=question.id, option_text="Second")
+        db.session.add_all([first, second])
+        db.session.commit()
+
+        for index in range(2):
+            user = Users(username=f"voter{index}", role="user", activated=True)
+            user.set_password("password")
+            db.session.add(user)
+            db.session.commit()
+            test_client = flask_app.test_client()
+            login_admin(test_client, username=f"voter{index}")
+            test_client.post(f"/submit-poll/{poll.id}/json", data={f"question_{question.id}_mcq": str(first.id)})
+        # The second voter changes their mind: one -1 and one +1 event.
+        result = test_client.post(f"/submit-poll/{poll.id}/json",
+                                  data={f"question_{question.id}_mcq": str(second.id)}).get_json()
+        assert result["tallies"][str(question.id)] == {str(first.id): 4, str(second.id): 1}
+
+        db.session.expire_all()
+        assert (first.votes, second.votes) == (3, 0)
+        assert (first.current_votes, second.current_votes) == (4, 1)
+        assert PollVoteEvent.query.count() == 4
+        # The worker queued a single delayed compaction for all of those votes.
+        assert Jobs.query.filter_by(name="poll_vote_compaction").count() == 1
+        version = votes_module.results_versions([poll.id])[poll.id]
+
+        result = flask_app.test_cli_runner().invoke(args=["polls", "compact-votes"])
+        assert "Folded 4 vote event(s)." in result.output
+        db.session.expire_all()
+        assert (first.votes, second.votes) == (4, 1)
+        assert (first.current_votes, second.current_votes) == (4, 1)
+        assert PollVoteEvent.query.count() == 0
+        assert votes_module.results_versions([poll.id])[poll.id] != version
+        assert votes_module.compact_vote_events() == 0
+
+
+def test_close_expired_poll_freezes_results(flask_app):
+    """Closing an expired poll should fold its votes into poll_results and render from them."""
+    with flask_app.app_context():
+        flask_app.config["POLL_ARCHIVE_PRIVATE_VOTERS"] = True
+        admin = create_admin_user()
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+        test_client.post("/admin/create-poll/", data=build_create_poll_data(
+            "Scheduled Poll", "Pick one", ["Yes", "No"], expires=datetime.now() + timedelta(days=1)))
+        scheduled = Poll.query.filter_by(title="Scheduled Poll").one()
+        job = Jobs.query.filter_by(name="poll_close").one()
+        assert job.run_after == scheduled.poll_expires
+
+        poll = Poll(title="Closed Poll", poll_expires=datetime.now() - timedelta(minutes=1))
+        db.session.add(poll)
+        db.session.flush()
+        private = PollQuestion(poll_id=poll.id, question_text="Secret pick", private_vote=True)
+        free = PollQuestion(poll_id=poll.id, question_text="Comments", is_free_response=True)
+        db.session.add_all([private, free])
+        db.session.flush()
+        option = PollOption(question_id=private.id, option_text="Yes", votes=2)
+        db.session.add(option)
+        db.session.flush()
+        db.session.add_all([
+            PollVoteEvent(poll_id=poll.id, option_id=option.id, delta=1),
+            PollVoter(user_id=admin.id, question_id=private.id, option_id=option.id, poll_id=poll.id),
+            PollFreeResponse(user_id=admin.id, question_id=free.id, response_text="Nice"),
+        ])
+        db.session.commit()
+
+        # Viewing the polls page never closes polls; the job or the command does.
+        assert test_client.get("/admin/polls/").status_code == 200
+        db.session.expire_all()
+        assert poll.closed_at is None
+
+        result = flask_app.test_cli_runner().invoke(args=["polls", "close-expired"])
+        assert "Closed 1 poll(s)." in result.output
+        db.session.expire_all()
+        assert poll.closed_at is not None
+        assert scheduled.closed_at is None
+        assert PollVoteEvent.query.count() == 0
+        assert PollVoter.query.filter_by(question_id=private.id).count() == 0
+        rows = {(row.question_id, row.option_id): (row.votes, row.responses)
+                for row in PollResult.query.filter_by(poll_id=poll.id)}
+        assert rows == {(private.id, option.id): (3, 0), (free.id, None): (0, 1)}
+        assert polling_module.close_poll(poll.id) is False
+
+        with flask_app.test_request_context():
+            html = str(polling_module.render_poll_results([poll])[poll.id])
+        assert "3 votes" in html
+        assert "Responses (1)" in html
+
+
+def test_close_poll_freezes_unfolded_votes(flask_app, monkeypatch):
+    """Votes a concurrent compaction left unfolded should still be frozen into the results."""
+    with flask_app.app_context():
+        poll = Poll(title="Racing Poll", poll_expires=datetime.now() - timedelta(minutes=1))
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Pick one")
+        db.session.add(question)
+        db.session.flush()
+        option = PollOption(question_id=question.id, option_text="Yes", votes=2)
+        db.session.add(option)
+        db.session.flush()
+        db.session.add(PollVoteEvent(poll_id=poll.id, option_id=option.id, delta=1))
+        db.session.commit()
+
+        # The compaction backs off because another one is running.
+        monkeypatch.setattr(polling_module, "compact_vote_events", lambda poll_id=None: 0)
+        assert polling_module.close_poll(poll.id) is True
+        assert PollResult.query.filter_by(poll_id=poll.id, option_id=option.id).one().votes == 3
+
+
+def test_import_poll_from_json_definition(flask_app):
+    """Importing a JSON poll definition should bulk insert its questions and options in order."""
+    with flask_app.app_context():
+        create_admin_user()
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+        expires = datetime.now() + timedelta(days=1)
+        definition = {
+            "title": "Imported Survey",
+            "poll_expires": expires.isoformat(),
+            "questions": [
+                {"question_text": f"Question {index}", "options": ["Yes", "No", "Maybe"],
+                 "allow_multiple_responses": index == 0}
+                for index in range(40)
+            ] + [{"question_text": "Anything else?", "is_free_response": True, "options": ["Ignored"]}],
+        }
+
+        response = test_client.post("/admin/import-poll/", json=definition)
+        assert response.status_code == 201
+        poll = db.session.get(Poll, response.get_json()["poll_id"])
+        questions = PollQuestion.query.filter_by(poll_id=poll.id).order_by(PollQuestion.id).all()
+        assert [question.question_text for question in questions] == \
+            [f"Question {index}" for index in range(40)] + ["Anything else?"]
+        assert questions[0].allow_multiple_responses and not questions[1].allow_multiple_responses
+        assert [option.option_text for option in questions[5].options] == ["Yes", "No", "Maybe"]
+        assert questions[-1].is_free_response and questions[-1].options == []
+        assert PollOption.query.count() == 120
+        assert Jobs.query.filter_by(name="poll_close").one().run_after == poll.poll_expires
+
+        response = test_client.post("/admin/import-poll/", json={"title": "Empty", "questions": []})
+        assert response.status_code == 400
+        assert response.get_json()["message"] == "The poll must have at least one question."
+        assert Poll.query.count() == 1
+
+
+def test_question_responses_keyset_pages_and_search(flask_app):
+    """The response viewer should page a question's answers by cursor and filter them in the database."""
+    with flask_app.app_context():
+        flask_app.config["POLL_RESPONSES_PAGE_SIZE"] = 2
+        create_admin_user()
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+        poll = Poll(title="Feedback Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Feedback?", is_free_response=True)
+        db.session.add(question)
+        db.session.flush()
+        submitted = datetime(2026, 10, 1, 18, 0)
+        texts = ["Great talk", "More pizza", "great_slides", "Too long", "GREAT demo"]
+        db.session.add_all([
+            # The first two responses share a timestamp, so the id breaks the tie.
+            PollFreeResponse(user_id=index, question_id=question.id, response_text=text,
+                             created_at=submitted + timedelta(minutes=max(index - 1, 0)))
+            for index, text in enumerate(texts)
+        ])
+        db.session.commit()
+
+        url = f"/admin/polls/questions/{question.id}/responses/"
+        seen = []
+        page = test_client.get(url).get_json()
+        while True:
+            seen.extend(response["response_text"] for response in page["responses"])
+            if not page["next"]:
+                break
+            page = test_client.get(url, query_string={"after": page["next"]}).get_json()
+        assert seen == texts
+
+        page = test_client.get(url, query_string={"q": "great"}).get_json()
+        assert [response["response_text"] for response in page["responses"]] == ["Great talk", "great_slides"]
+        page = test_client.get(url, query_string={"q": "great", "after": page["next"]}).get_json()
+        assert [response["response_text"] for response in page["responses"]] == ["GREAT demo"]
+        assert page["next"] is None
+        # Wildcards in the search are matched literally.
+        page = test_client.get(url, query_string={"q": "t_s"}).get_json()
+        assert [response["response_text"] for response in page["responses"]] == ["great_slides"]
+
+        assert test_client.get(url, query_string={"after": "bogus"}).status_code == 400
+        assert test_client.get("/admin/polls/questions/999/responses/").status_code == 404
+        polls_page = test_client.get("/admin/polls/").get_data(as_text=True)
+        assert "Responses (5)" in polls_page
+        assert "More pizza" not in polls_page
+
+
+def test_free_responses_page_with_default_timestamps(flask_app):
+    """Responses saved in the same second with default timestamps should all be paged."""
+    with flask_app.app_context():
+        flask_app.config["POLL_RESPONSES_PAGE_SIZE"] = 2
+        poll = Poll(title="Feedback Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Feedback?", is_free_response=True)
+        db.session.add(question)
+        db.session.commit()
+
+        texts = [f"Answer {index}" for index in range(5)]
+        for index, text in enumerate(texts):
+            user = create_admin_user(username=f"voter{index}")
+            with flask_app.test_request_context(f"/submit-poll/{poll.id}", method="POST",
+                                                data={f"question_{question.id}_frq": text}):
+                login_user(user)
+                assert main_module.handle_frq(question) == (True, True)
+        db.session.commit()
+
+        seen = []
+        after = None
+        while True:
+            rows, after = polling_module.free_responses_page(question.id, after)
+            seen.extend(row.response_text for row in rows)
+            if after is None:
+                break
+        assert seen == texts
+
+
+def test_vote_series_buckets_cumulative_votes(flask_app):
+    """The vote series should accumulate each option's votes per bucket and be cached once the poll closes."""
+    with flask_app.app_context():
+        admin = create_admin_user()
+        test_client = flask_app.test_client()
+        login_admin(test_client)
+        poll = Poll(title="Timed Poll")
+        db.session.add(poll)
+        db.session.flush()
+        question = PollQuestion(poll_id=poll.id, question_text="Pick one")
+        db.session.add(question)
+        db.session.flush()
+        first = PollOption(question_id=question.id, option_text="First")
+        second = PollOption(question_id=question.id, option_text="Second")
+        db.session.add_all([first, second])
+        db.session.flush()
+        start = datetime(2026, 10, 1, 18, 0)
+        votes = [(first, 10), (first, 50), (first, 90), (second, 125)]
+        db.session.add_all([
+            PollVoter(user_id=index, question_id=question.id, option_id=option.id,
+                      voted_at=start + timedelta(seconds=offset))
+            for index, (option, offset) in enumerate(votes)
+        ])
+        # Votes from before vote times were recorded are left out.
+        db.session.add(PollVoter(user_id=99, question_id=question.id, option_id=second.id))
+        db.session.flush()
+        PollVoter.query.filter_by(user_id=99).update({"voted_at": None})
+        db.session.commit()
+
+        url = f"/admin/polls/{poll.id}/votes-over-time/"
+        series = test_client.get(url, query_string={"resolution": 60}).get_json()["options"]
+        assert series == {
+            str(first.id): [["2026-10-01T18:00:00", 2], ["2026-10-01T18:01:00", 3]],
+            str(second.id): [["2026-10-01T18:02:00", 1]],
+        }
+        series = test_client.get(url, query_string={"resolution": 3600}).get_json()["options"]
+        assert series[str(first.id)] == [["2026-10-01T18:00:00", 3]]
+        assert test_client.get(url, query_string={"resolution": 0}).status_code == 400
+
+        # New votes are recorded with their time.
+        test_client.post(f"/submit-poll/{poll.id}/json", data={f"question_{question.id}_mcq": str(second.id)})
+        assert PollVoter.query.filter_by(user_id=admin.id).one().voted_at is not None
+        assert len(test_client.get(url).get_json()["options"][str(second.id)]) == 2
+
+        poll.closed_at = datetime.now()
+        db.session.commit()
+        closed = test_client.get(url).get_json()["options"]
+        db.session.add(PollVoter(user_id=100, question_id=question.id, option_id=first.id))
+        db.session.commit()
+        assert test_client.get(url).get_json()["options"] == closed
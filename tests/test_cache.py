@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# tests/test_cache.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for the per-worker TTL cache.
+"""
+
+import time
+
+from app.extensions import cache
+from tests.conftest import app as flask_app  # Import the app fixture for context in tests.
+
+def test_cache_set_get_and_expire(flask_app):
+    """ Cached values should be returned until their TTL passes. """
+    with flask_app.app_context():
+        cache.set("tests", "key", "value", ttl=0.05)
+        assert cache.get("tests", "key") == "value"
+        time.sleep(0.06)
+        assert cache.get("tests", "key") is None
+        assert cache.get("tests", "key", "fallback") == "fallback"
+
+def test_cache_delete_and_clear(flask_app):
+    """ Deleting or clearing a namespace should leave other namespaces alone. """
+    with flask_app.app_context():
+        cache.set("tests", "a", 1)
+        cache.set("tests", "b", 2)
+        cache.set("other", "a", 3)
+
+        cache.delete("tests", "a")
+        assert cache.get("tests", "a") is None
+        assert cache.get("tests", "b") == 2
+
+        cache.clear("tests")
+        assert cache.get("tests", "b") is None
+        assert cache.get("other", "a") == 3
+
+        cache.clear()
+        assert cache.get("other", "a") is None
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# tests/test_database.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for SQLite connection settings applied by the application factory.
+"""
+
+from app import create_app, db
+from tests.conftest import app as flask_app  # Import the app fixture for context in tests.
+
+def test_sqlite_file_connections_are_tuned(tmp_path, monkeypatch):
+    """ File-backed SQLite connections should use WAL and the configured pragmas. """
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "1234")
+    monkeypatch.setenv("SQLITE_CACHE_SIZE_KB", "2048")
+    app = create_app()
+    with app.app_context():
+        with db.engine.connect() as connection:
+            def pragma(name):
+                return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1 # NORMAL
+            assert pragma("busy_timeout") == 1234
+            assert pragma("cache_size") == -2048
+            assert pragma("mmap_size") == 256 * 1024 * 1024
+            assert pragma("foreign_keys") == 1
+
+def test_sqlite_memory_connections_enforce_foreign_keys(flask_app):
+    """ In-memory SQLite (the test database) should skip WAL but still enforce foreign keys. """
+    with db.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "memory"
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
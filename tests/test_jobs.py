@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# tests/test_jobs.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for the background job queue and attachment previews.
+"""
+
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+
+from app.jobs import enqueue, job_handler, run_pending, claim_next_job, job_stats, prune_jobs, HANDLERS
+from app.models import Attachments, Jobs, Meetings
+from app.previews import queue_preview, thumbnail_name
+from tests.conftest import app as flask_app, db  # Import the app fixture for context in tests.
+
+def test_run_pending_records_success_and_retries_failures(flask_app):
+    """ Jobs should record success, and failures should retry with backoff. """
+    flask_app.config["JOB_MAX_ATTEMPTS"] = 2
+    flask_app.config["JOB_RETRY_DELAY"] = 60
+    calls = []
+
+    @job_handler("test_record")
+    def record(value):
+        calls.append(value)
+
+    @job_handler("test_fail")
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        ok = enqueue("test_record", value = 7)
+        bad = enqueue("test_fail")
+        db.session.commit()
+
+        assert run_pending() == 2
+        assert calls == [7]
+        assert db.session.get(Jobs, ok.id).status == "done"
+        retrying = db.session.get(Jobs, bad.id)
+        assert retrying.status == "queued"
+        assert retrying.last_error == "boom"
+        assert retrying.attempts == 1
+        assert retrying.run_after > datetime.now() + timedelta(seconds = 50)
+        # Not due again until the backoff has passed.
+        assert run_pending() == 0
+
+        retrying.run_after = datetime.now()
+        db.session.commit()
+        assert run_pending() == 1
+        failed = db.session.get(Jobs, bad.id)
+        assert failed.status == "failed"
+        assert failed.attempts == 2
+
+        summary = job_stats(datetime.now() - timedelta(hours = 1))
+        assert summary["test_record"]["done"] == 1
+        assert summary["test_record"]["finished"] == 1
+        assert summary["test_fail"]["failed"] == 1
+        assert summary["test_fail"]["wait_p95"] is not None
+
+        result = flask_app.test_cli_runner().invoke(args = ["jobs", "stats"])
+        assert "test_record" in result.output and "test_fail" in result.output
+    finally:
+        HANDLERS.pop("test_record")
+        HANDLERS.pop("test_fail")
+
+def test_claim_next_job_order_and_expired_lease(flask_app):
+    """ Delayed jobs should wait, and jobs abandoned by a crashed worker should be reclaimed. """
+    later = enqueue("test_later", run_after = datetime.now() + timedelta(hours = 1))
+    abandoned = enqueue("test_abandoned")
+    db.session.commit()
+
+    job = claim_next_job()
+    assert job.id == abandoned.id
+    assert job.status == "running" and job.attempts == 1
+    assert claim_next_job() is None
+
+    # The worker died mid-job; once its lease expires another worker retries it.
+    job.started_at = datetime.now() - timedelta(seconds = flask_app.config["JOB_LEASE_SECONDS"] + 1)
+    db.session.commit()
+    reclaimed = claim_next_job()
+    assert reclaimed.id == abandoned.id
+    assert reclaimed.attempts == 2
+    assert db.session.get(Jobs, later.id).status == "queued"
+
+def test_abandoned_final_attempt_is_marked_failed(flask_app):
+    """ A job whose worker crashed during its last attempt should fail instead of staying running. """
+    job = enqueue("test_abandoned")
+    db.session.commit()
+    job.status = "running"
+    job.attempts = flask_app.config["JOB_MAX_ATTEMPTS"]
+    job.started_at = datetime.now() - timedelta(seconds = flask_app.config["JOB_LEASE_SECONDS"] + 1)
+    db.session.commit()
+
+    assert claim_next_job() is None
+    db.session.refresh(job)
+    assert job.status == "failed"
+    assert job.finished_at is not None and job.last_error
+    assert job_stats(datetime.now() - timedelta(hours = 1))["test_abandoned"]["running"] == 0
+
+def test_prune_jobs_keeps_recent_and_pending_jobs(flask_app):
+    """ Only done and failed jobs finished before the retention period should be deleted. """
+    flask_app.config["JOB_RETENTION_HOURS"] = 24
+    now = datetime.now()
+    old = now - timedelta(hours = 25)
+    jobs = {
+        "old_done": Jobs(name = "test_prune", status = "done", finished_at = old),
+        "old_failed": Jobs(name = "test_prune", status = "failed", finished_at = old),
+        "recent_done": Jobs(name = "test_prune", status = "done", finished_at = now),
+        "queued": Jobs(name = "test_prune", status = "queued", run_after = old),
+        "running": Jobs(name = "test_prune", status = "running", started_at = old, finished_at = old),
+    }
+    db.session.add_all(jobs.values())
+    db.session.commit()
+    ids = {label: job.id for label, job in jobs.items()}
+
+    assert prune_jobs(now) == 2
+    remaining = {job.id for job in Jobs.query.all()}
+    assert remaining == {ids["recent_done"], ids["queued"], ids["running"]}
+
+    result = flask_app.test_cli_runner().invoke(args = ["jobs", "prune", "--hours", "0"])
+    assert "Pruned 1 finished job(s)." in result.output
+    assert db.session.get(Jobs, ids["recent_done"]) is None
+
+def test_attachment_preview_job(flask_app, tmp_path):
+    """ Image attachments should get a shared thumbnail once the worker runs. """
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 800), "red").save(buffer, format="PNG")
+    digest = hashlib.sha256(buffer.getvalue()).hexdigest()
+    path = tmp_path / digest
+    path.write_bytes(buffer.getvalue())
+
+    meeting = Meetings(state = "ended", title = "Preview Meeting", description = "", host = "admin", event_start = datetime.now())
+    db.session.add(meeting)
+    db.session.flush()
+    attachment = Attachments(meeting = meeting.id, filename = "photo.png", filepath = str(path), content_hash = digest)
+    db.session.add(attachment)
+    db.session.flush()
+    queue_preview(attachment)
+    db.session.commit()
+
+    job = Jobs.query.one()
+    assert job.name == "attachment_preview"
+    assert json.loads(job.payload) == {"attachment_id": attachment.id}
+    assert attachment.thumbnail_url is None
+
+    result = flask_app.test_cli_runner().invoke(args = ["jobs", "worker", "--once"])
+    assert "Ran 1 job(s)." in result.output
+    db.session.refresh(attachment)
+    assert attachment.thumbnail == thumbnail_name(digest)
+    with Image.open(tmp_path / "thumbnails" / attachment.thumbnail) as thumbnail:
+        assert max(thumbnail.size) == 320
+
+    # Identical content reuses the existing preview without another job.
+    copy = Attachments(meeting = meeting.id, filename = "copy.png", filepath = str(path), content_hash = digest)
+    db.session.add(copy)
+    db.session.flush()
+    queue_preview(copy)
+    db.session.commit()
+    assert copy.thumbnail == attachment.thumbnail
+    assert Jobs.query.count() == 1
+
+    # Previews are served with long-lived cache headers.
+    response = flask_app.test_client().get(attachment.thumbnail_url)
+    assert response.status_code == 200
+    assert "immutable" in response.headers["Cache-Control"]
+    response.close()
+    assert os.listdir(tmp_path / "thumbnails") == [attachment.thumbnail]
+
+def test_pdf_preview_job(flask_app, tmp_path):
+    """ PDF attachments should get a thumbnail of their first page when PyMuPDF is installed. """
+    pymupdf = pytest.importorskip("pymupdf")
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    with pymupdf.open() as document:
+        document.new_page(width = 612, height = 792).insert_text((72, 72), "Agenda")
+        data = document.tobytes()
+    digest = hashlib.sha256(data).hexdigest()
+    path = tmp_path / digest
+    path.write_bytes(data)
+
+    meeting = Meetings(state = "ended", title = "PDF Meeting", description = "", host = "admin", event_start = datetime.now())
+    db.session.add(meeting)
+    db.session.flush()
+    attachment = Attachments(meeting = meeting.id, filename = "agenda.pdf", filepath = str(path), content_hash = digest)
+    db.session.add(attachment)
+    db.session.flush()
+    queue_preview(attachment)
+    db.session.commit()
+
+    assert run_pending() == 1
+    db.session.refresh(attachment)
+    assert attachment.thumbnail == thumbnail_name(digest)
+    with Image.open(tmp_path / "thumbnails" / attachment.thumbnail) as thumbnail:
+        assert max(thumbnail.size) == 320
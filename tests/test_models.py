@@ -4,7 +4,7 @@
 """
 Project Name: ACM-Meeting-Records
 Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
-Last Modified: 6/5/2026
+Last Modified: 10/19/2026
 
 File Purpose: Pytest for model functions.
 """
@@ -14,7 +14,8 @@ import time
 import pyotp
 import pytest
 
-from app.models import Users, RecoveryCodes, Meetings, Attendees, Minutes, Attachments, Poll, PollQuestion, PollFreeResponse, PollOption, PollVoter
+from app.extensions import db
+from app.models import Users, UserPrincipal, RecoveryCodes, Meetings, Attendees, Minutes, Attachments, Poll, PollQuestion, PollFreeResponse, PollOption, PollVoter
 from tests.conftest import app as flask_app  # Import the app fixture for context in tests.
 
 def test_user_set_password_not_store_password_in_plaintext(flask_app):
@@ -93,6 +94,31 @@ def test_user_to_dict(flask_app):
         assert user_dict["role"] == "member" and user_dict["role"] == user.role
         assert user_dict["id"] == 1 and user_dict["id"] == user.id
 
+def test_user_principal_load_and_invalidate(flask_app):
+    """ Test the UserPrincipal cache for the Flask-Login user loader. """
+    with flask_app.app_context():
+        user = Users(username="testuser", role="user", activated=True)
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+
+        principal = UserPrincipal.load(user.id, ttl=60)
+        assert principal.username == "testuser"
+        assert principal.role == "user"
+        assert principal.get_id() == str(user.id)
+
+        # Later loads are served from the cache, even if the row changes.
+        user.role = "admin"
+        db.session.commit()
+        assert UserPrincipal.load(user.id, ttl=60).role == "user"
+
+        # Invalidation forces the next load to read the users table.
+        UserPrincipal.invalidate(user.id)
+        assert UserPrincipal.load(user.id, ttl=60).role == "admin"
+
+        # Missing users are not cached.
+        assert UserPrincipal.load(9999, ttl=60) is None
+
 def test_recovery_code_generation_and_checking(flask_app):
     """ Test the RecoveryCodes model. """
     with flask_app.app_context():
@@ -195,4 +221,22 @@ def test_poll_relationships(flask_app):
         assert poll.questions == [question]
         assert question.free_responses == [free_response]
         assert question.options == [option]
-        assert option.votes == 1
\ No newline at end of file
+        assert option.votes == 1
+
+def test_meeting_delete_cascades_to_children(flask_app):
+    """ Deleting a meeting row should remove its attendees, minutes, and attachments in the database. """
+    with flask_app.app_context():
+        meeting = Meetings(id=1, state="ended", title="Test Meeting", description="", host="testuser")
+        meeting.attendees.append(Attendees(username="testuser"))
+        meeting.minutes.append(Minutes(notes="Notes", username_by="testuser"))
+        meeting.attachments.append(Attachments(filename="a.pdf", filepath="/tmp/a.pdf"))
+        db.session.add(meeting)
+        db.session.commit()
+        assert Attendees.query.one().meeting == 1
+
+        # A bulk delete bypasses the ORM, so the children can only go by ON DELETE CASCADE.
+        Meetings.query.filter_by(id=1).delete()
+        db.session.commit()
+        assert Attendees.query.count() == 0
+        assert Minutes.query.count() == 0
+        assert Attachments.query.count() == 0
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# tests/test_replica.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for read replica routing, using two SQLite files.
+"""
+
+import pytest
+from flask import g
+from sqlalchemy import select, text
+
+from app import create_app, db
+from app.models import Attendees, Meetings, Users
+from app.utils import sha_hash
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """ Create an app whose primary and replica are separate SQLite files. """
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv("SQLALCHEMY_REPLICA_URI", f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setenv("SECRET_KEY", "replica-test")
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    yield app
+    # The shared db object registers metadata per bind; forget the replica for later apps.
+    db.metadatas.pop("replica", None)
+
+def test_get_requests_read_from_replica_until_user_writes(replica_app):
+    """ GET routes should use the replica, except for a user who just wrote to the primary. """
+    app = replica_app
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines["replica"])
+        user = Users(username="member", role="member", activated=True)
+        user.set_password("password")
+        db.session.add(user)
+        db.session.add(Meetings(id=1, state="active", title="Primary Title", description="",
+                                host="admin", code_hash=sha_hash("CODE42")))
+        db.session.commit()
+        # The replica lags behind: same rows, but an older meeting title.
+        with db.engines["replica"].begin() as connection:
+            connection.execute(Users.__table__.insert(), [{
+                "id": user.id, "username": user.username, "password": user.password,
+                "role": "member", "activated": True,
+            }])
+            connection.execute(Meetings.__table__.insert(), [{
+                "id": 1, "state": "active", "title": "Replica Title", "description": "",
+                "host": "admin", "code_hash": sha_hash("CODE42"),
+            }])
+
+    client = app.test_client()
+    assert "Replica Title" in client.get("/event/1/").get_data(as_text=True)
+    assert client.get("/api/event/attendees/1/").json == []
+
+    # Writes (and POST requests) go to the primary.
+    client.post("/login/", data={"username": "member", "password": "password"})
+    client.post("/event/check-in/1/", data={"code": "CODE42"})
+    with app.app_context():
+        assert Attendees.query.count() == 1
+        with db.engines["replica"].connect() as connection:
+            assert connection.execute(Attendees.__table__.select()).all() == []
+
+    # The user who wrote keeps reading from the primary for a few seconds...
+    assert "Primary Title" in client.get("/event/1/").get_data(as_text=True)
+    assert len(client.get("/api/event/attendees/1/").json) == 1
+    # ...while everyone else still reads from the replica.
+    assert "Replica Title" in app.test_client().get("/event/1/").get_data(as_text=True)
+
+    with client.session_transaction() as session:
+        session["primary_until"] = 0
+    assert "Replica Title" in client.get("/event/1/").get_data(as_text=True)
+
+def test_request_reads_from_primary_after_writing(replica_app):
+    """ Once a request writes, its remaining reads should go to the primary; textual statements are not writes. """
+    app = replica_app
+    with app.test_request_context("/event/1/"):
+        g.use_replica = True
+        replica, primary = db.engines["replica"], db.engines[None]
+        assert db.session.get_bind(clause=select(Meetings)) is replica
+        # Textual statements (pragmas, raw SQL) run on the primary without pinning the request.
+        assert db.session.get_bind(clause=text("PRAGMA optimize")) is primary
+        assert not g.get("db_wrote")
+
+        assert db.session.get_bind(clause=Meetings.__table__.update()) is primary
+        assert g.db_wrote
+        assert db.session.get_bind(clause=select(Meetings)) is primary
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# tests/test_startup.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for application startup time and lazily imported modules.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from app import create_app
+from tests.conftest import app as flask_app  # Import the app fixture for context in tests.
+
+# Generous budgets so slow CI machines pass while real regressions still fail.
+CREATE_APP_BUDGET_SECONDS = 0.5
+COLD_START_BUDGET_MS = 5000
+
+def test_create_app_within_budget():
+    """ create_app() itself should stay cheap once its modules are imported. """
+    create_app(True)  # Warm up imports shared with other tests.
+    start = time.perf_counter()
+    create_app(True)
+    assert time.perf_counter() - start < CREATE_APP_BUDGET_SECONDS
+
+def test_web_worker_skips_cli_and_setup_only_modules():
+    """ A fresh web worker should not import Alembic or qrcode until they are needed. """
+    env = dict(os.environ)
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    script = ("import sys\n"
+              "from app import create_app\n"
+              "create_app(True)\n"
+              "print(sorted(name for name in ('alembic', 'flask_migrate', 'qrcode', 'PIL.Image') if name in sys.modules))\n")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+def test_startup_profile_command(flask_app, monkeypatch):
+    """ The startup-profile command should report timings and enforce a budget. """
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
+    runner = flask_app.test_cli_runner()
+    result = runner.invoke(args=["startup-profile", "--top", "5", "--budget-ms", str(COLD_START_BUDGET_MS)])
+    assert result.exit_code == 0, result.output
+    assert "Total startup:" in result.output
+    assert "sqlalchemy" in result.output
+
+    result = runner.invoke(args=["startup-profile", "--budget-ms", "1"])
+    assert result.exit_code != 0
+    assert "over the 1.0 ms budget" in result.output
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# tests/test_storage.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for attachment storage helpers.
+"""
+
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app import commands as commands_module
+from app.cleanup import queue_release
+from app.jobs import run_pending
+from app.models import Attachments, Meetings
+from app.storage import store_upload, store_file, UploadTooLargeError, CHUNK_SIZE
+from tests.conftest import app as flask_app, db  # Import the app fixture for context in tests.
+
+def add_meetings(count):
+    """ Create meetings with ids 1 to count for attachments to belong to. """
+    db.session.add_all([
+        Meetings(id=meeting_id, state="ended", title=f"Meeting {meeting_id}", description="", host="admin")
+        for meeting_id in range(1, count + 1)
+    ])
+    db.session.commit()
+
+def test_store_upload_streams_hashes_and_deduplicates(tmp_path):
+    """ store_upload should write content once under its SHA-256 digest. """
+    content = os.urandom(CHUNK_SIZE * 3 + 17)
+    digest = hashlib.sha256(content).hexdigest()
+
+    size, stored_digest, path = store_upload(FileStorage(io.BytesIO(content), "deck.pptx"), str(tmp_path))
+    assert size == len(content)
+    assert stored_digest == digest
+    assert path == os.path.join(str(tmp_path), digest)
+    with open(path, "rb") as stored_file:
+        assert stored_file.read() == content
+
+    # A second identical upload reuses the stored file and leaves no temporary files.
+    _, _, second_path = store_upload(FileStorage(io.BytesIO(content), "copy.pptx"), str(tmp_path))
+    assert second_path == path
+    assert os.listdir(tmp_path) == [digest]
+
+def test_store_upload_survives_concurrent_release(tmp_path, monkeypatch):
+    """ An upload should still be stored if its existing duplicate is deleted while it finishes. """
+    content = b"released meanwhile"
+    _, _, path = store_upload(FileStorage(io.BytesIO(content), "deck.pdf"), str(tmp_path))
+    # The stored copy is released right after the upload saw it.
+    os.remove(path)
+    monkeypatch.setattr(os.path, "exists", lambda _: True)
+
+    _, _, second_path = store_upload(FileStorage(io.BytesIO(content), "deck.pdf"), str(tmp_path))
+    monkeypatch.undo()
+    assert second_path == path
+    with open(path, "rb") as stored_file:
+        assert stored_file.read() == content
+
+def test_store_upload_rejects_oversized_file(tmp_path):
+    """ Oversized uploads should raise without leaving partial files behind. """
+    with pytest.raises(UploadTooLargeError):
+        store_upload(FileStorage(io.BytesIO(b"x" * 1024), "big.pdf"), str(tmp_path), max_size=512)
+    assert os.listdir(tmp_path) == []
+
+def test_store_file_moves_and_deduplicates(tmp_path):
+    """ store_file should move legacy files into the store and drop duplicates. """
+    first = tmp_path / "meeting-1-deck.pdf"
+    second = tmp_path / "meeting-2-deck.pdf"
+    first.write_bytes(b"same deck")
+    second.write_bytes(b"same deck")
+    digest = hashlib.sha256(b"same deck").hexdigest()
+
+    assert store_file(str(first), str(tmp_path)) == (digest, os.path.join(str(tmp_path), digest), False)
+    assert store_file(str(second), str(tmp_path)) == (digest, os.path.join(str(tmp_path), digest), True)
+    assert os.listdir(tmp_path) == [digest]
+
+def test_migrate_attachments_command(flask_app, tmp_path):
+    """ The attachments migrate command should deduplicate legacy files and report savings. """
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    add_meetings(3)
+    for meeting_id in (1, 2):
+        legacy_path = tmp_path / f"meeting-{meeting_id}-deck.pdf"
+        legacy_path.write_bytes(b"shared slides")
+        db.session.add(Attachments(meeting=meeting_id, filename="deck.pdf", filepath=str(legacy_path)))
+    db.session.add(Attachments(meeting=3, filename="gone.pdf", filepath=str(tmp_path / "gone.pdf")))
+    db.session.commit()
+
+    result = flask_app.test_cli_runner().invoke(args=["attachments", "migrate"])
+    assert result.exit_code == 0
+    assert "Migrated 2 attachment(s), removed 1 duplicate file(s), saved 13 bytes. 1 file(s) missing." in result.output
+
+    digest = hashlib.sha256(b"shared slides").hexdigest()
+    assert os.listdir(tmp_path) == [digest]
+    migrated = Attachments.query.filter(Attachments.meeting.in_([1, 2])).all()
+    assert {attachment.filepath for attachment in migrated} == {os.path.join(str(tmp_path), digest)}
+    assert {attachment.content_hash for attachment in migrated} == {digest}
+
+def test_queued_release_keeps_reuploaded_file(flask_app, tmp_path):
+    """ A file uploaded again after its removal was queued should survive the job. """
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    _, _, path = store_upload(FileStorage(io.BytesIO(b"again"), "again.pdf"), str(tmp_path))
+    queue_release(path)
+    db.session.commit()
+    time.sleep(0.01)
+    store_upload(FileStorage(io.BytesIO(b"again"), "again.pdf"), str(tmp_path))
+
+    assert run_pending() == 1
+    assert os.path.exists(path)
+
+def test_scan_orphans_command(flask_app, tmp_path):
+    """ The attachments scan-orphans command should reconcile the upload folder with the table. """
+    flask_app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    old = time.time() - 7200
+    kept = tmp_path / ("a" * 64)
+    orphan = tmp_path / ("b" * 64)
+    recent = tmp_path / ("c" * 64)
+    temporary = tmp_path / ".upload-123"
+    (tmp_path / "thumbnails").mkdir()
+    preview = tmp_path / "thumbnails" / f"{'a' * 64}.png"
+    stale_preview = tmp_path / "thumbnails" / f"{'b' * 64}.png"
+    for path in (kept, orphan, recent, temporary, preview, stale_preview):
+        path.write_bytes(b"data")
+        if path != recent:
+            os.utime(path, (old, old))
+    add_meetings(2)
+    db.session.add(Attachments(meeting=1, filename="kept.pdf", filepath=str(kept), thumbnail=preview.name))
+    missing = Attachments(meeting=2, filename="gone.pdf", filepath=str(tmp_path / ("d" * 64)))
+    db.session.add(missing)
+    db.session.commit()
+
+    result = flask_app.test_cli_runner().invoke(args=["attachments", "scan-orphans"])
+    assert result.exit_code == 0
+    assert f"Missing file for attachment {missing.id}." in result.output
+    assert "Found 2 orphaned file(s) totalling 8 bytes. 1 attachment(s) missing their file." in result.output
+    assert orphan.exists() and stale_preview.exists()
+
+    result = flask_app.test_cli_runner().invoke(args=["attachments", "scan-orphans", "--delete"])
+    assert "Deleted 2 orphaned file(s)" in result.output
+    assert not orphan.exists() and not stale_preview.exists()
+    assert kept.exists() and recent.exists() and temporary.exists() and preview.exists()
+
+def test_scan_orphans_delete_skips_files_removed_meanwhile(flask_app, tmp_path, monkeypatch):
+    """ scan-orphans --delete should carry on when an orphan disappears before it is deleted. """
+    orphan = tmp_path / ("b" * 64)
+    orphan.write_bytes(b"data")
+    vanished = str(tmp_path / ("e" * 64))
+    monkeypatch.setattr(commands_module, "find_orphans",
+                        lambda min_age: ([(vanished, 4), (str(orphan), 4)], []))
+
+    result = flask_app.test_cli_runner().invoke(args=["attachments", "scan-orphans", "--delete"])
+    assert result.exit_code == 0
+    assert "Deleted 1 orphaned file(s) totalling 4 bytes." in result.output
+    assert not orphan.exists()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# tests/test_templates.py
+
+"""
+Project Name: ACM-Meeting-Records
+Project Author(s): Joseph Lefkovitz (github.com/lefkovitz)
+Last Modified: 10/19/2026
+
+File Purpose: Pytest for the precompiled template bytecode cache.
+"""
+
+import os
+
+from app import create_app, db
+
+def test_precompile_templates_fills_bytecode_cache(tmp_path, monkeypatch):
+    """ Precompiled templates should be loaded from the cache without compiling again. """
+    cache_dir = tmp_path / "jinja"
+    monkeypatch.setenv("TEMPLATE_CACHE_DIR", str(cache_dir))
+    app = create_app(True)
+    assert app.jinja_env.auto_reload is False
+
+    result = app.test_cli_runner().invoke(args=["templates", "precompile"])
+    assert result.exit_code == 0, result.output
+    compiled = len(app.jinja_env.list_templates(extensions=["html"]))
+    assert f"Compiled {compiled} template(s)" in result.output
+    assert len(os.listdir(cache_dir)) == compiled
+
+    # A new worker renders pages from the cached bytecode instead of compiling the source.
+    worker = create_app(True)
+    def fail_compile(*args, **kwargs):
+        raise AssertionError("template should come from the bytecode cache")
+    monkeypatch.setattr(worker.jinja_env, "compile", fail_compile)
+    with worker.app_context():
+        db.create_all()
+        response = worker.test_client().get("/events/")
+        assert response.status_code == 200
+        db.drop_all()
+
+def test_precompile_templates_requires_cache_dir(monkeypatch):
+    """ Precompiling without a cache directory should fail with a helpful message. """
+    monkeypatch.delenv("TEMPLATE_CACHE_DIR", raising=False)
+    result = create_app(True).test_cli_runner().invoke(args=["templates", "precompile"])
+    assert result.exit_code != 0
+    assert "Set TEMPLATE_CACHE_DIR" in result.output